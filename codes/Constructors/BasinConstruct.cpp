@@ -27,6 +27,18 @@
 
   _sortedGrid = ctrl._sortedGrid;
 
+  /* State arena */
+  int n_state = 0;
+  n_state += 9;
+  if (ctrl.opt_tracking_isotope == 1 or ctrl.opt_tracking_age == 1 or ctrl.opt_nitrogen_sim == 1){
+    n_state += 9;
+  }
+  if (ctrl.opt_nitrogen_sim == 1){
+    n_state += 21;
+  }
+  _states = new state_arena(n_state, _sortedGrid.size);
+  /* end of State arena */
+
   /* GIS */
   _chnwidth = new svector(ctrl.path_BasinFolder + ctrl.fn__chnwidth, _rowNum, _colNum, _sortedGrid);
   _chndepth = new svector(ctrl.path_BasinFolder + ctrl.fn__chndepth, _rowNum, _colNum, _sortedGrid);
@@ -66,25 +78,25 @@
   /* end of GroundTs */
 
   /* Storages */
-  _I = new svector(ctrl.path_BasinFolder + ctrl.fn__I, _rowNum, _colNum, _sortedGrid);
-  _snow = new svector(ctrl.path_BasinFolder + ctrl.fn__snow, _rowNum, _colNum, _sortedGrid);
-  _pond = new svector(ctrl.path_BasinFolder + ctrl.fn__pond, _rowNum, _colNum, _sortedGrid);
-  _theta1 = new svector(ctrl.path_BasinFolder + ctrl.fn__theta1, _rowNum, _colNum, _sortedGrid);
-  _theta2 = new svector(ctrl.path_BasinFolder + ctrl.fn__theta2, _rowNum, _colNum, _sortedGrid);
-  _theta3 = new svector(ctrl.path_BasinFolder + ctrl.fn__theta3, _rowNum, _colNum, _sortedGrid);
-  _vadose = new svector(ctrl.path_BasinFolder + ctrl.fn__vadose, _rowNum, _colNum, _sortedGrid);
-  _GW = new svector(ctrl.path_BasinFolder + ctrl.fn__GW, _rowNum, _colNum, _sortedGrid);
-  _chanS = new svector(_sortedGrid.size);
+  _I = new svector(ctrl.path_BasinFolder + ctrl.fn__I, _rowNum, _colNum, _sortedGrid, _states->next());
+  _snow = new svector(ctrl.path_BasinFolder + ctrl.fn__snow, _rowNum, _colNum, _sortedGrid, _states->next());
+  _pond = new svector(ctrl.path_BasinFolder + ctrl.fn__pond, _rowNum, _colNum, _sortedGrid, _states->next());
+  _theta1 = new svector(ctrl.path_BasinFolder + ctrl.fn__theta1, _rowNum, _colNum, _sortedGrid, _states->next());
+  _theta2 = new svector(ctrl.path_BasinFolder + ctrl.fn__theta2, _rowNum, _colNum, _sortedGrid, _states->next());
+  _theta3 = new svector(ctrl.path_BasinFolder + ctrl.fn__theta3, _rowNum, _colNum, _sortedGrid, _states->next());
+  _vadose = new svector(ctrl.path_BasinFolder + ctrl.fn__vadose, _rowNum, _colNum, _sortedGrid, _states->next());
+  _GW = new svector(ctrl.path_BasinFolder + ctrl.fn__GW, _rowNum, _colNum, _sortedGrid, _states->next());
+  _chanS = new svector(_sortedGrid.size, _states->next());
   if (ctrl.opt_tracking_isotope == 1 or ctrl.opt_tracking_age == 1 or ctrl.opt_nitrogen_sim == 1){
-    _I_old = new svector(_sortedGrid.size);
-    _snow_old = new svector(_sortedGrid.size);
-    _pond_old = new svector(_sortedGrid.size);
-    _theta1_old = new svector(_sortedGrid.size);
-    _theta2_old = new svector(_sortedGrid.size);
-    _theta3_old = new svector(_sortedGrid.size);
-    _vadose_old = new svector(_sortedGrid.size);
-    _GW_old = new svector(_sortedGrid.size);
-    _chanS_old = new svector(_sortedGrid.size);
+    _I_old = new svector(_sortedGrid.size, _states->next());
+    _snow_old = new svector(_sortedGrid.size, _states->next());
+    _pond_old = new svector(_sortedGrid.size, _states->next());
+    _theta1_old = new svector(_sortedGrid.size, _states->next());
+    _theta2_old = new svector(_sortedGrid.size, _states->next());
+    _theta3_old = new svector(_sortedGrid.size, _states->next());
+    _vadose_old = new svector(_sortedGrid.size, _states->next());
+    _GW_old = new svector(_sortedGrid.size, _states->next());
+    _chanS_old = new svector(_sortedGrid.size, _states->next());
   }
   /* end of Storages */
 
@@ -127,11 +139,13 @@
   _GWf_out = new svector(_sortedGrid.size);
   _GWf_toChn = new svector(_sortedGrid.size);
   _Q = new svector(ctrl.path_BasinFolder + ctrl.fn__Q, _rowNum, _colNum, _sortedGrid);
+  _states_flux.push_back(_Q);
   _Qupstream = new svector(_sortedGrid.size);
   _Echan = new svector(_sortedGrid.size);
   _tmp = new svector(_sortedGrid.size);
   _snowacc = new svector(_sortedGrid.size);
   _TchanS = new svector(_sortedGrid.size);
+  _states_flux.push_back(_TchanS);
   if (ctrl.opt_reinfil == 1){
     _rinfilt = new svector(_sortedGrid.size);
     _rPerc1 = new svector(_sortedGrid.size);
@@ -150,6 +164,9 @@
     _p_perc2 = new svector(_sortedGrid.size);
     _p_perc3 = new svector(_sortedGrid.size);
   }
+  if (ctrl.opt_routQ == 1){
+    _a_routQ = new svector(_sortedGrid.size);
+  }
   if (ctrl.opt_tracking_isotope == 1 or ctrl.opt_tracking_age == 1 or ctrl.opt_nitrogen_sim == 1){
     _flux_ovf_in_acc = new svector(_sortedGrid.size);
     _flux_interf_in_acc = new svector(_sortedGrid.size);
@@ -160,57 +177,77 @@
 
   /* Tracking */
   if (ctrl.opt_tracking_isotope == 1){
-    _d18o_I = new svector(ctrl.path_BasinFolder + ctrl.fn__d18o_I, _rowNum, _colNum, _sortedGrid);
-    _d18o_snow = new svector(ctrl.path_BasinFolder + ctrl.fn__d18o_snow, _rowNum, _colNum, _sortedGrid);
-    _d18o_pond = new svector(ctrl.path_BasinFolder + ctrl.fn__d18o_pond, _rowNum, _colNum, _sortedGrid);
-    _d18o_layer1 = new svector(ctrl.path_BasinFolder + ctrl.fn__d18o_layer1, _rowNum, _colNum, _sortedGrid);
-    _d18o_layer2 = new svector(ctrl.path_BasinFolder + ctrl.fn__d18o_layer2, _rowNum, _colNum, _sortedGrid);
-    _d18o_layer3 = new svector(ctrl.path_BasinFolder + ctrl.fn__d18o_layer3, _rowNum, _colNum, _sortedGrid);
-    _d18o_vadose = new svector(ctrl.path_BasinFolder + ctrl.fn__d18o_vadose, _rowNum, _colNum, _sortedGrid);
-    _d18o_GW = new svector(ctrl.path_BasinFolder + ctrl.fn__d18o_GW, _rowNum, _colNum, _sortedGrid);
-    _d18o_chanS = new svector(ctrl.path_BasinFolder + ctrl.fn__d18o_chanS, _rowNum, _colNum, _sortedGrid);
-    _age_vadose = new svector(ctrl.path_BasinFolder + ctrl.fn__age_vadose, _rowNum, _colNum, _sortedGrid);
+    _d18o_I = new svector_lp(ctrl.path_BasinFolder + ctrl.fn__d18o_I, _rowNum, _colNum, _sortedGrid);
+    _states_lp.push_back(_d18o_I);
+    _d18o_snow = new svector_lp(ctrl.path_BasinFolder + ctrl.fn__d18o_snow, _rowNum, _colNum, _sortedGrid);
+    _states_lp.push_back(_d18o_snow);
+    _d18o_pond = new svector_lp(ctrl.path_BasinFolder + ctrl.fn__d18o_pond, _rowNum, _colNum, _sortedGrid);
+    _states_lp.push_back(_d18o_pond);
+    _d18o_layer1 = new svector_lp(ctrl.path_BasinFolder + ctrl.fn__d18o_layer1, _rowNum, _colNum, _sortedGrid);
+    _states_lp.push_back(_d18o_layer1);
+    _d18o_layer2 = new svector_lp(ctrl.path_BasinFolder + ctrl.fn__d18o_layer2, _rowNum, _colNum, _sortedGrid);
+    _states_lp.push_back(_d18o_layer2);
+    _d18o_layer3 = new svector_lp(ctrl.path_BasinFolder + ctrl.fn__d18o_layer3, _rowNum, _colNum, _sortedGrid);
+    _states_lp.push_back(_d18o_layer3);
+    _d18o_vadose = new svector_lp(ctrl.path_BasinFolder + ctrl.fn__d18o_vadose, _rowNum, _colNum, _sortedGrid);
+    _states_lp.push_back(_d18o_vadose);
+    _d18o_GW = new svector_lp(ctrl.path_BasinFolder + ctrl.fn__d18o_GW, _rowNum, _colNum, _sortedGrid);
+    _states_lp.push_back(_d18o_GW);
+    _d18o_chanS = new svector_lp(ctrl.path_BasinFolder + ctrl.fn__d18o_chanS, _rowNum, _colNum, _sortedGrid);
+    _states_lp.push_back(_d18o_chanS);
+    _age_vadose = new svector_lp(ctrl.path_BasinFolder + ctrl.fn__age_vadose, _rowNum, _colNum, _sortedGrid);
+    _states_lp.push_back(_age_vadose);
   }
   if (ctrl.opt_tracking_age == 1){
-    _age_I = new svector(ctrl.path_BasinFolder + ctrl.fn__age_I, _rowNum, _colNum, _sortedGrid);
-    _age_snow = new svector(ctrl.path_BasinFolder + ctrl.fn__age_snow, _rowNum, _colNum, _sortedGrid);
-    _age_pond = new svector(ctrl.path_BasinFolder + ctrl.fn__age_pond, _rowNum, _colNum, _sortedGrid);
-    _age_layer1 = new svector(ctrl.path_BasinFolder + ctrl.fn__age_layer1, _rowNum, _colNum, _sortedGrid);
-    _age_layer2 = new svector(ctrl.path_BasinFolder + ctrl.fn__age_layer2, _rowNum, _colNum, _sortedGrid);
-    _age_layer3 = new svector(ctrl.path_BasinFolder + ctrl.fn__age_layer3, _rowNum, _colNum, _sortedGrid);
-    _age_GW = new svector(ctrl.path_BasinFolder + ctrl.fn__age_GW, _rowNum, _colNum, _sortedGrid);
-    _age_chanS = new svector(ctrl.path_BasinFolder + ctrl.fn__age_chanS, _rowNum, _colNum, _sortedGrid);
+    _age_I = new svector_lp(ctrl.path_BasinFolder + ctrl.fn__age_I, _rowNum, _colNum, _sortedGrid);
+    _states_lp.push_back(_age_I);
+    _age_snow = new svector_lp(ctrl.path_BasinFolder + ctrl.fn__age_snow, _rowNum, _colNum, _sortedGrid);
+    _states_lp.push_back(_age_snow);
+    _age_pond = new svector_lp(ctrl.path_BasinFolder + ctrl.fn__age_pond, _rowNum, _colNum, _sortedGrid);
+    _states_lp.push_back(_age_pond);
+    _age_layer1 = new svector_lp(ctrl.path_BasinFolder + ctrl.fn__age_layer1, _rowNum, _colNum, _sortedGrid);
+    _states_lp.push_back(_age_layer1);
+    _age_layer2 = new svector_lp(ctrl.path_BasinFolder + ctrl.fn__age_layer2, _rowNum, _colNum, _sortedGrid);
+    _states_lp.push_back(_age_layer2);
+    _age_layer3 = new svector_lp(ctrl.path_BasinFolder + ctrl.fn__age_layer3, _rowNum, _colNum, _sortedGrid);
+    _states_lp.push_back(_age_layer3);
+    _age_GW = new svector_lp(ctrl.path_BasinFolder + ctrl.fn__age_GW, _rowNum, _colNum, _sortedGrid);
+    _states_lp.push_back(_age_GW);
+    _age_chanS = new svector_lp(ctrl.path_BasinFolder + ctrl.fn__age_chanS, _rowNum, _colNum, _sortedGrid);
+    _states_lp.push_back(_age_chanS);
   }
   /* end of Tracking */
 
   /* Nitrogen */
   if (ctrl.opt_nitrogen_sim == 1){
-    _no3_I = new svector(ctrl.path_BasinFolder + ctrl.fn__no3_I, _rowNum, _colNum, _sortedGrid);
-    _no3_snow = new svector(ctrl.path_BasinFolder + ctrl.fn__no3_snow, _rowNum, _colNum, _sortedGrid);
-    _no3_pond = new svector(ctrl.path_BasinFolder + ctrl.fn__no3_pond, _rowNum, _colNum, _sortedGrid);
-    _no3_layer1 = new svector(ctrl.path_BasinFolder + ctrl.fn__no3_layer1, _rowNum, _colNum, _sortedGrid);
-    _no3_layer2 = new svector(ctrl.path_BasinFolder + ctrl.fn__no3_layer2, _rowNum, _colNum, _sortedGrid);
-    _no3_layer3 = new svector(ctrl.path_BasinFolder + ctrl.fn__no3_layer3, _rowNum, _colNum, _sortedGrid);
-    _no3_vadose = new svector(ctrl.path_BasinFolder + ctrl.fn__no3_vadose, _rowNum, _colNum, _sortedGrid);
-    _no3_GW = new svector(ctrl.path_BasinFolder + ctrl.fn__no3_GW, _rowNum, _colNum, _sortedGrid);
-    _no3_chanS = new svector(ctrl.path_BasinFolder + ctrl.fn__no3_chanS, _rowNum, _colNum, _sortedGrid);
-    _nitrogen_add = new svector(_sortedGrid.size);
-    _plant_uptake = new svector(_sortedGrid.size);
-    _deni_soil = new svector(_sortedGrid.size);
-    _minerl_soil = new svector(_sortedGrid.size);
-    _degrad_soil = new svector(_sortedGrid.size);
-    _deni_river = new svector(_sortedGrid.size);
-    _humusN1 = new svector(ctrl.path_BasinFolder + ctrl.fn__humusN1, _rowNum, _colNum, _sortedGrid);
-    _humusN2 = new svector(ctrl.path_BasinFolder + ctrl.fn__humusN2, _rowNum, _colNum, _sortedGrid);
-    _humusN3 = new svector(ctrl.path_BasinFolder + ctrl.fn__humusN3, _rowNum, _colNum, _sortedGrid);
-    _fastN1 = new svector(ctrl.path_BasinFolder + ctrl.fn__fastN1, _rowNum, _colNum, _sortedGrid);
-    _fastN2 = new svector(ctrl.path_BasinFolder + ctrl.fn__fastN2, _rowNum, _colNum, _sortedGrid);
-    _fastN3 = new svector(ctrl.path_BasinFolder + ctrl.fn__fastN3, _rowNum, _colNum, _sortedGrid);
+    _no3_I = new svector(ctrl.path_BasinFolder + ctrl.fn__no3_I, _rowNum, _colNum, _sortedGrid, _states->next());
+    _no3_snow = new svector(ctrl.path_BasinFolder + ctrl.fn__no3_snow, _rowNum, _colNum, _sortedGrid, _states->next());
+    _no3_pond = new svector(ctrl.path_BasinFolder + ctrl.fn__no3_pond, _rowNum, _colNum, _sortedGrid, _states->next());
+    _no3_layer1 = new svector(ctrl.path_BasinFolder + ctrl.fn__no3_layer1, _rowNum, _colNum, _sortedGrid, _states->next());
+    _no3_layer2 = new svector(ctrl.path_BasinFolder + ctrl.fn__no3_layer2, _rowNum, _colNum, _sortedGrid, _states->next());
+    _no3_layer3 = new svector(ctrl.path_BasinFolder + ctrl.fn__no3_layer3, _rowNum, _colNum, _sortedGrid, _states->next());
+    _no3_vadose = new svector(ctrl.path_BasinFolder + ctrl.fn__no3_vadose, _rowNum, _colNum, _sortedGrid, _states->next());
+    _no3_GW = new svector(ctrl.path_BasinFolder + ctrl.fn__no3_GW, _rowNum, _colNum, _sortedGrid, _states->next());
+    _no3_chanS = new svector(ctrl.path_BasinFolder + ctrl.fn__no3_chanS, _rowNum, _colNum, _sortedGrid, _states->next());
+    _nitrogen_add = new svector(_sortedGrid.size, _states->next());
+    _plant_uptake = new svector(_sortedGrid.size, _states->next());
+    _deni_soil = new svector(_sortedGrid.size, _states->next());
+    _minerl_soil = new svector(_sortedGrid.size, _states->next());
+    _degrad_soil = new svector(_sortedGrid.size, _states->next());
+    _deni_river = new svector(_sortedGrid.size, _states->next());
+    _humusN1 = new svector(ctrl.path_BasinFolder + ctrl.fn__humusN1, _rowNum, _colNum, _sortedGrid, _states->next());
+    _humusN2 = new svector(ctrl.path_BasinFolder + ctrl.fn__humusN2, _rowNum, _colNum, _sortedGrid, _states->next());
+    _humusN3 = new svector(ctrl.path_BasinFolder + ctrl.fn__humusN3, _rowNum, _colNum, _sortedGrid, _states->next());
+    _fastN1 = new svector(ctrl.path_BasinFolder + ctrl.fn__fastN1, _rowNum, _colNum, _sortedGrid, _states->next());
+    _fastN2 = new svector(ctrl.path_BasinFolder + ctrl.fn__fastN2, _rowNum, _colNum, _sortedGrid, _states->next());
+    _fastN3 = new svector(ctrl.path_BasinFolder + ctrl.fn__fastN3, _rowNum, _colNum, _sortedGrid, _states->next());
   }
   /* end of Nitrogen */
 
   _slope->higherthan(0.01);
 
+  Pair_states(ctrl);
+
   if (ctrl.opt_groundTs_input_format == 1){
     open_groundTs(ctrl);
     read_groundTs(ctrl);
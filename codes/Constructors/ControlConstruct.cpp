@@ -33,6 +33,13 @@ Control::Control(){
   _sortedGrid = SortGridLDD();
   
   _Gauge_to_Report = new svector(path_BasinFolder + fn__Gauge_to_Report, _rowNum, _colNum, _sortedGrid);
+  // Only simulate the cells upstream of the gauges; all svectors are then allocated on the pruned grid
+  if (opt_gauge_pruning == 1){
+    PruneGridGauge(_sortedGrid, *_Gauge_to_Report);
+    delete _Gauge_to_Report;
+    _Gauge_to_Report = new svector(path_BasinFolder + fn__Gauge_to_Report, _rowNum, _colNum, _sortedGrid);
+  }
+  SortGridLevel(_sortedGrid);
   _Tsmask = sortTSmask();
 
   
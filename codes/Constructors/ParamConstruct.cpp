@@ -29,6 +29,7 @@ Param::Param(Control &ctrl){
   sort_root_fraction_OK = 0;  
   sort_plant_uptake_OK = 0;  // The plant uptake only needs to be calculated once (or once within each change)
   sort_nitrogen_addition_OK = 0;  // The nitrogen addtion only needs to be calculated once (or once within each change)
+  sort_routQ_coeff_OK = 0;  // The Kinematic Wave coefficients only need to be calculated once (or once within each change)
 
   string fname = "param.ini";
   /* Parameters */
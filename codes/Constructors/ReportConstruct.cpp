@@ -25,7 +25,10 @@ Report::Report(Control &ctrl){
     _nodata = ctrl._nodata;
 
     advance_report = 0;
+    report_buffer = max(1, ctrl.Report_buffer);
+    map_template.assign(_rowNum*_colNum, _nodata);
 
-    Report_create_maps(ctrl);
+    // No map accumulation in the calibration profile
+    if (ctrl.opt_report_profile == 0) Report_create_maps(ctrl);
     
 }
\ No newline at end of file
@@ -145,6 +145,9 @@ int Basin::dtor(Control &ctrl){
     if(_p_perc2) delete _p_perc2;
     if(_p_perc3) delete _p_perc3;
   }
+  if (ctrl.opt_routQ == 1){
+    if(_a_routQ) delete _a_routQ;
+  }
   if (ctrl.opt_tracking_isotope == 1 or ctrl.opt_tracking_age == 1 or ctrl.opt_nitrogen_sim == 1){
     if(_flux_ovf_in_acc) delete _flux_ovf_in_acc;
     if(_flux_interf_in_acc) delete _flux_interf_in_acc;
@@ -204,5 +207,8 @@ int Basin::dtor(Control &ctrl){
   }
   /* end of Nitrogen */
 
+  // Storages, Tracking and Nitrogen svectors are views into the state arena
+  if(_states) delete _states;
+
   return EXIT_SUCCESS;
 }
\ No newline at end of file
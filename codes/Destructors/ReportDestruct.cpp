@@ -21,6 +21,8 @@ Report::~Report(){}
 
 int Report::dtor(Control &ctrl){
 
+  // Write the records still held in the buffers
+  report_flush();
 
   /* Report */
   if (of__I.is_open())  of__I.close();
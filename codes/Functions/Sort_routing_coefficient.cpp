@@ -0,0 +1,39 @@
+/***************************************************************
+* Generic Ecohydrological Model (GEM), a spatial-distributed module-based ecohydrological models
+* for multiscale hydrological, isotopic, and water quality simulations
+
+* Copyright (c) 2025   Songjun Wu <songjun.wu@igb-berlin.de / songjun-wu@outlook.com>
+
+  * GEM is a free software under the terms of GNU GEneral Public License version 3,
+  * Resitributon and modification are allowed under proper aknowledgement.
+
+* Contributors: Songjun Wu       Leibniz Institute of Freshwater Ecology and Inland Fisheries (IGB)
+
+* Sort_routing_coefficient.cpp
+  * Created  on: 30.02.2025
+  * Modified on: 19.10.2026
+***************************************************************/
+
+
+#include "Basin.h"
+
+int Basin::Sort_routing_coefficient(Control &ctrl, Param &par) {
+
+    // Channel geometry, slope and Manning's N only change with parameterisation
+    if (par.sort_routQ_coeff_OK == 0){
+
+        #pragma omp parallel for
+        for (int j = 0; j < _sortedGrid.size; j++) {
+            double chnwidth = _chnwidth->val[j];
+            if (chnwidth > 0){
+                // Here the variable a = pow(1/a, 1/m) of the Manning's equation (see Routing_Q_1)
+                _a_routQ->val[j] = pow(pow(chnwidth,0.67)*par._Manningn->val[j]/pow(_slope->val[j], 0.5), 0.6); // Wetted perimeter approximated with channel width
+            } else {
+                _a_routQ->val[j] = 0;
+            }
+        }
+        par.sort_routQ_coeff_OK = 1;
+
+    }
+    return EXIT_SUCCESS;
+}
@@ -63,6 +63,11 @@ int Basin::Initialisation(Control &ctrl, Param &par, Atmosphere &atm){
       _TchanS->equals(*atm._Ta);
     }
 
+    // PET is reduced by canopy evaporation until the next climate input, so it is carried over in the checkpoint
+    if (ctrl.opt_canopy_evap==1){
+      _states_flux.push_back(atm._PET);
+    }
+
     // Initilisation of channel storage
     double sqrtS, Manningn, a, Q, chnwidth;
 
@@ -45,6 +45,7 @@ int Basin::Routing(Control &ctrl, Param &par){
     }
 
     if (ctrl.opt_routQ==1) {
+        Sort_routing_coefficient(ctrl, par);
         Routing_Q_1(ctrl, par);
     }
 
@@ -60,4 +61,16 @@ int Basin::Routing(Control &ctrl, Param &par){
 
     
     return EXIT_SUCCESS;
+}
+
+
+double Basin::Gather_upstream(const svector &sv_out, int j){
+    /* Pull the lateral inflow of cell j from its upstream cells.
+       Upstream cells are visited in ascending order, which reproduces the summation order of the serial sweep. */
+
+    double inflow = 0;
+    for (int k = _sortedGrid.from_start[j]; k < _sortedGrid.from_start[j+1]; k++) {
+        inflow += sv_out.val[_sortedGrid.from_cell[k]];
+    }
+    return inflow;
 }
\ No newline at end of file
@@ -19,7 +19,34 @@
 
 int Basin::Routing_GWflow_1(Control &ctrl, Param &par){
 
-    int from_j;
+    if (ctrl.opt_parallel_routing == 1){
+        // Level-scheduled sweep; cells within one level do not drain into each other
+        for (int l = 0; l < _sortedGrid.n_level; l++) {
+            int start = _sortedGrid.level_start[l];
+            int end = _sortedGrid.level_start[l+1];
+            #pragma omp parallel for schedule(static) if(end - start > 256)
+            for (int k = start; k < end; k++) {
+                int j = _sortedGrid.level_cell[k];
+                _GWf_in->val[j] = Gather_upstream(*_GWf_out, j);  // GW inflow from upstream cells [m]
+                Routing_GWflow_1_cell(ctrl, par, j);
+            }
+        }
+
+    } else {
+        for (unsigned int j = 0; j < _sortedGrid.row.size(); j++) {
+            Routing_GWflow_1_cell(ctrl, par, j);
+            if (_sortedGrid.lat_ok[j] == 1){   // If there is a downstream cell
+                _GWf_in->val[_sortedGrid.to_cell[j]] += _GWf_out->val[j];
+            }
+        }
+    }
+
+    return EXIT_SUCCESS;
+}
+
+
+int Basin::Routing_GWflow_1_cell(Control &ctrl, Param &par, int j){
+
     double GWflow_in; // GW inputs from upstream cell
     double GWflow_to_go; // Available water for GWflow
     double GWflow_out;  // Output of GWflow to downstream cell (terrestrial only)
@@ -27,66 +54,51 @@ int Basin::Routing_GWflow_1(Control &ctrl, Param &par){
     double GWflow_toTrestrial; // Output of GWflow to downstream cell (terrestrial only)
 
     double dx = ctrl._dx;
-    double dx_square = dx * dx;
     double dtdx = ctrl.Simul_tstep / dx;
     double alpha = 0;
-    double Ks3 = 0;
     double chnlength;
 
+    chnlength = _chnlength->val[j];
+    GWflow_in = _GWf_in->val[j];
+    GWflow_toChn = 0;
+    GWflow_out = 0;
+    GWflow_toTrestrial = 0;
 
+    // Available GWflowflow = GWflowflow from upstream + GW storage
+    // Should GWflow_in be included here, or after stream recharge?
+    GWflow_to_go = GWflow_in + _GW->val[j];
 
-    for (unsigned int j = 0; j < _sortedGrid.row.size(); j++) {
-
-        chnlength = _chnlength->val[j];
-        GWflow_in = _GWf_in->val[j];
-        GWflow_toChn = 0;
-        GWflow_out = 0;
-        GWflow_toTrestrial = 0;
-        
-    
-        from_j = _sortedGrid.to_cell[j];
-
-        // Available GWflowflow = GWflowflow from upstream + GW storage
-        // Should GWflow_in be included here, or after stream recharge?
-        GWflow_to_go = GWflow_in + _GW->val[j];
-
-              
-        if (GWflow_to_go > roundoffERR)  {
-
-            Ks3 = _Ks3->val[j];  // [m/s]
-            // GWflow to channel
-            if (chnlength > 0){  // If there is channel in this grid cell
-                // Here Ks3 is not used because GW routing should be independent from soil proporties
-                GWflow_toChn = GWflow_to_go * par._Ks_GW->val[j] * (1 - exp(-1 * par._GWfExp->val[j] * GWflow_to_go)) * par._lat_to_Chn_GW->val[j];  // [m2/s]
-                GWflow_toChn *= dtdx; // Store GWflow to channel in [m]
-                GWflow_toChn *= (chnlength/dx); // Adjusted with channel length; [m]
-                GWflow_toChn = min(GWflow_toChn, GWflow_to_go);  // Cannot exceed water to go
-                GWflow_to_go -=  GWflow_toChn;    // [m]
-            }
+          
+    if (GWflow_to_go > roundoffERR)  {
 
-            // GWflow to downstream grid
-            // Linear approximation of Kinematic wave approach
-            // Assumption: Q = head * alpha
+        // GWflow to channel
+        if (chnlength > 0){  // If there is channel in this grid cell
             // Here Ks3 is not used because GW routing should be independent from soil proporties
-            alpha = par._Ks_GW->val[j];  // [m/s]
-            //alpha = Ks3 * sin(atan(_slope->val[j])) * par._wGWf->val[j];  // [m/s]
-            GWflow_toTrestrial = GWflow_to_go / (1 + alpha * dtdx) * alpha; // qx+1 = hx+1[m] * alpha; [m2/s]
-            GWflow_toTrestrial *= dtdx; // Store qx+1 in m
-            GWflow_toTrestrial = min(GWflow_toTrestrial, GWflow_to_go);  // Cannot exceed water to go
-            GWflow_to_go -= GWflow_toTrestrial; // [m]
-            GWflow_out += GWflow_toTrestrial;  // [m]
-
-            // Remaining water = GW storage
-            _GW->val[j] = GWflow_to_go; // GWflow_to_go = _GW->val[j] + GWflow_in - GWflow_toChn - GWflow_toTrestrial
-
-            if (_sortedGrid.lat_ok[j] == 1){   // If there is a downstream cell
-                _GWf_in->val[from_j] += GWflow_toTrestrial;
-            }
+            GWflow_toChn = GWflow_to_go * par._Ks_GW->val[j] * (1 - exp(-1 * par._GWfExp->val[j] * GWflow_to_go)) * par._lat_to_Chn_GW->val[j];  // [m2/s]
+            GWflow_toChn *= dtdx; // Store GWflow to channel in [m]
+            GWflow_toChn *= (chnlength/dx); // Adjusted with channel length; [m]
+            GWflow_toChn = min(GWflow_toChn, GWflow_to_go);  // Cannot exceed water to go
+            GWflow_to_go -=  GWflow_toChn;    // [m]
         }
-     
-        _GWf_toChn->val[j] = GWflow_toChn;  // GWflow to channel; [m]
-        _GWf_out->val[j] = GWflow_toTrestrial;  // GWflow sum (to channel and to downstream territrial cell); [m]
 
+        // GWflow to downstream grid
+        // Linear approximation of Kinematic wave approach
+        // Assumption: Q = head * alpha
+        // Here Ks3 is not used because GW routing should be independent from soil proporties
+        alpha = par._Ks_GW->val[j];  // [m/s]
+        //alpha = Ks3 * sin(atan(_slope->val[j])) * par._wGWf->val[j];  // [m/s]
+        GWflow_toTrestrial = GWflow_to_go / (1 + alpha * dtdx) * alpha; // qx+1 = hx+1[m] * alpha; [m2/s]
+        GWflow_toTrestrial *= dtdx; // Store qx+1 in m
+        GWflow_toTrestrial = min(GWflow_toTrestrial, GWflow_to_go);  // Cannot exceed water to go
+        GWflow_to_go -= GWflow_toTrestrial; // [m]
+        GWflow_out += GWflow_toTrestrial;  // [m]
+
+        // Remaining water = GW storage
+        _GW->val[j] = GWflow_to_go; // GWflow_to_go = _GW->val[j] + GWflow_in - GWflow_toChn - GWflow_toTrestrial
     }
+ 
+    _GWf_toChn->val[j] = GWflow_toChn;  // GWflow to channel; [m]
+    _GWf_out->val[j] = GWflow_toTrestrial;  // GWflow to downstream territrial cell; routed by Routing_GWflow_1 [m]
+
     return EXIT_SUCCESS;
 }
\ No newline at end of file
@@ -19,10 +19,11 @@
 
 int Basin::Routing_Q_1(Control &ctrl, Param &par){
 
-    int from_j, count;
+    int from_j, n_sub;
     double chnwidth, chnlength, Qall, Qupstream;
-    double sqrtS, Manningn, a;
-    double avQ, abQ, Qk, Qk1, fQj1i1, dfQj1i1, C;  // Variables used in Kinematic water solver
+    double a;
+    double Qk1, C;  // Variables used in Kinematic water solver
+    double S, Slat, Qsum, dts, dtdxs, celerity, courant;  // Variables used in adaptive sub-stepping
     
 
     double dx = ctrl._dx;
@@ -48,41 +49,43 @@ int Basin::Routing_Q_1(Control &ctrl, Param &par){
             
             if (Qall + Qupstream > 0){
 
-                sqrtS = pow(_slope->val[j], 0.5);
-
-                //Manningn = par._Manningn->val[j] * chnlength;  // Manning's N scaled with channel length
-                Manningn = par._Manningn->val[j];
-
                 // The Manning's equation: Q = a * pow(A, m)
                 // For rectangle: a = sqrtS / n / pow(chnwidth,0.67); m = 5/3
                 // To estimate A from Q, we need : A = pow(1/a, 1/m) * pow(Q, m/1)
-                // Here the variable a = pow(1/a, 1/m) where 1/m = 0.6
-                a = pow(pow(chnwidth,0.67)*Manningn/sqrtS, 0.6); // Wetted perimeter approximated with channel width
-
-                //initial guess
-                avQ = 0.5*(Qupstream);
-                if (avQ==0) abQ=0;
-                else abQ = a*0.6*pow(avQ, 0.6-1);
-
-                Qk1 = ((dtdx*Qupstream) + dt*Qall)/(dtdx+abQ);
+                // Here the variable a = pow(1/a, 1/m) where 1/m = 0.6, precomputed in Sort_routing_coefficient
+                a = _a_routQ->val[j];
 
                 C =  dtdx * Qupstream + dt*Qall;
-                
-                count = 0;
-                do{
-                    Qk=Qk1;
-                    fQj1i1 = dtdx*Qk+a*powl(Qk, 0.6)-C;
-                    dfQj1i1 = dtdx+a*0.6*powl(Qk, 0.6-1);
-                    Qk1 = Qk - (fQj1i1/dfQj1i1);
-                    if (Qk1 <=0){// if NR cannot converge then get some of the available water out and exit the loop
-                        Qk1 = 0.61803*((dtdx*Qupstream) + dt*Qall)/(dtdx+abQ);
-                        break;
+                Qk1 = Kinematic_wave(a, dtdx, Qupstream, C);
+
+                // Number of sub-steps from the Courant number of the reach (celerity dQ/dA = pow(Q, 0.4) / (0.6 * a))
+                n_sub = 1;
+                if (ctrl.opt_routQ_substep == 1){
+                    celerity = pow(std::max(Qk1, _Q->val[j]), 0.4) / (0.6 * a);
+                    courant = celerity * dtdx;
+                    n_sub = std::min(int(ceil(courant)), 100);
+                }
+
+                if (n_sub <= 1){
+                    _chanS->val[j] = std::max(0.0,(Qupstream+Qall*_dx  - Qk1)*dt) / dx_square;  // Channel storage [m]
+                    _Q->val[j] = Qk1; // Discharge [m3/s]
+                } else {
+                    // Channel storage carried through the sub-steps; upstream inflow and lateral inflow are evenly spread
+                    dts = dt / n_sub;
+                    dtdxs = dts / dx;
+                    S = _chanS->val[j];  // [m]
+                    Slat = (_ovf_toChn->val[j] + _interf_toChn->val[j] + _GWf_toChn->val[j]) / n_sub;  // [m] per sub-step
+                    Qsum = 0;
+                    for (int k = 0; k < n_sub; k++){
+                        C = dtdxs * Qupstream + (S + Slat) * dx;
+                        Qk1 = Kinematic_wave(a, dtdxs, Qupstream, C);
+                        S = std::max(0.0, (Qupstream - Qk1) * dts + (S + Slat) * dx_square) / dx_square;
+                        Qsum += Qk1;
                     }
-                    count++;
-                }while(fabs(fQj1i1)>0.00001 && count < 50);
-                
-                _chanS->val[j] = std::max(0.0,(Qupstream+Qall*_dx  - Qk1)*dt) / dx_square;  // Channel storage [m]
-                _Q->val[j] = Qk1; // Discharge [m3/s]
+                    Qk1 = Qsum / n_sub;  // Mean outflow over the time step [m3/s]
+                    _chanS->val[j] = S;  // Channel storage [m]
+                    _Q->val[j] = Qk1; // Discharge [m3/s]
+                }
                 
                 if (_sortedGrid.lat_ok[j] == 1){
                     _Qupstream->val[from_j] += Qk1;  // Discharge inflow [m3/s]
@@ -94,4 +97,33 @@ int Basin::Routing_Q_1(Control &ctrl, Param &par){
     }
 
     return EXIT_SUCCESS;
-}
\ No newline at end of file
+}
+
+
+double Basin::Kinematic_wave(double a, double dtdx, double Qupstream, double C){
+    /* Newton-Raphson solution of dtdx * Q + a * pow(Q, 0.6) = C */
+    int count;
+    double avQ, abQ, Qk, Qk1, fQj1i1, dfQj1i1;
+
+    //initial guess
+    avQ = 0.5*(Qupstream);
+    if (avQ==0) abQ=0;
+    else abQ = a*0.6*pow(avQ, 0.6-1);
+
+    Qk1 = C/(dtdx+abQ);
+
+    count = 0;
+    do{
+        Qk=Qk1;
+        fQj1i1 = dtdx*Qk+a*powl(Qk, 0.6)-C;
+        dfQj1i1 = dtdx+a*0.6*powl(Qk, 0.6-1);
+        Qk1 = Qk - (fQj1i1/dfQj1i1);
+        if (Qk1 <=0){// if NR cannot converge then get some of the available water out and exit the loop
+            Qk1 = 0.61803*C/(dtdx+abQ);
+            break;
+        }
+        count++;
+    }while(fabs(fQj1i1)>0.00001 && count < 50);
+
+    return Qk1;
+}
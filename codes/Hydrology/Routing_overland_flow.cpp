@@ -19,55 +19,73 @@
 
 int Basin::Routing_ovf_1(Control &ctrl, Param &par){
 
-    int from_j;
-    double dx = ctrl._dx;
-    double proportion_ovf_toChn;
-    double ovf_to_go = 0;
-    double chnlength, chnwidth;
+    if (ctrl.opt_parallel_routing == 1){
+        // Level-scheduled sweep; cells within one level do not drain into each other
+        for (int l = 0; l < _sortedGrid.n_level; l++) {
+            int start = _sortedGrid.level_start[l];
+            int end = _sortedGrid.level_start[l+1];
+            #pragma omp parallel for schedule(static) if(end - start > 256)
+            for (int k = start; k < end; k++) {
+                int j = _sortedGrid.level_cell[k];
+                _ovf_in->val[j] = Gather_upstream(*_ovf_out, j);  // Overland inflow from upstream cells [m]
+                Routing_ovf_1_cell(ctrl, par, j);
+            }
+        }
 
-    for (unsigned int j = 0; j < _sortedGrid.row.size(); j++) {
+    } else {
+        for (unsigned int j = 0; j < _sortedGrid.row.size(); j++) {
+            Routing_ovf_1_cell(ctrl, par, j);
+            if (_sortedGrid.lat_ok[j] == 1){  // If there is a downstream cell
+                _ovf_in->val[_sortedGrid.to_cell[j]] += _ovf_out->val[j]; // [m]
+            }
+        }
+    }
 
-        chnwidth = _chnwidth->val[j];
-        chnlength = _chnlength->val[j];
-        from_j = _sortedGrid.to_cell[j];
+    return EXIT_SUCCESS;
+}
 
-        ovf_to_go = _ovf_in->val[j] + _pond->val[j];  // Available surface water = ponding water + overland inflow from upstream cells
-        
-        // Reinfiltration if activated
-        if (ctrl.opt_reinfil==1 and ovf_to_go>roundoffERR){
-            if (ctrl.opt_infil == 1){ // Reinfiltration
-                Reinfiltration_1(ctrl,par, j, _rinfilt->val[j], _theta1->val[j], ovf_to_go);
-            }
 
-            if (ctrl.opt_percolation == 1){ // Repercolation and Re GW recharge
-                Repercolation_1(ctrl, par, j, _theta1->val[j], _theta2->val[j], _theta3->val[j], _vadose->val[j],  _rPerc1->val[j], _rPerc2->val[j], _rPerc3->val[j]);
-                ReGWrecharge_1(ctrl, par, j, _vadose->val[j], _GW->val[j], _Perc_vadose->val[j]);
-            } else if (ctrl.opt_percolation == 2){
-                Repercolation_2(ctrl, par, j, _theta1->val[j], _theta2->val[j], _theta3->val[j], _vadose->val[j],  _rPerc1->val[j], _rPerc2->val[j], _rPerc3->val[j]);
-                ReGWrecharge_2(ctrl, par, j, _vadose->val[j], _GW->val[j], _Perc_vadose->val[j]);
-            } else if (ctrl.opt_percolation == 3){
-                Repercolation_3(ctrl, par, j, _theta1->val[j], _theta2->val[j], _theta3->val[j], _vadose->val[j],  _rPerc1->val[j], _rPerc2->val[j], _rPerc3->val[j]);
-                ReGWrecharge_2(ctrl, par, j, _vadose->val[j], _GW->val[j], _Perc_vadose->val[j]);  // todo
-            }
+int Basin::Routing_ovf_1_cell(Control &ctrl, Param &par, int j){
 
-        }
-        
+    double dx = ctrl._dx;
+    double proportion_ovf_toChn;
+    double ovf_to_go = 0;
+    double chnlength, chnwidth;
 
-        if (chnwidth > 0){  // If there is channel in this grid cell
-            proportion_ovf_toChn = min(par._pOvf_toChn->val[j] * chnlength / dx , 1.0);  // The proportion of overland flow that routes into river              
-            _ovf_toChn->val[j] = ovf_to_go * proportion_ovf_toChn; // [m]
-            ovf_to_go -= _ovf_toChn->val[j];
+    chnwidth = _chnwidth->val[j];
+    chnlength = _chnlength->val[j];
+
+    ovf_to_go = _ovf_in->val[j] + _pond->val[j];  // Available surface water = ponding water + overland inflow from upstream cells
+    
+    // Reinfiltration if activated
+    if (ctrl.opt_reinfil==1 and ovf_to_go>roundoffERR){
+        if (ctrl.opt_infil == 1){ // Reinfiltration
+            Reinfiltration_1(ctrl,par, j, _rinfilt->val[j], _theta1->val[j], ovf_to_go);
         }
 
-        // Terrestrial grid cell
-        _ovf_out->val[j] = ovf_to_go;  // To downstream terrestrial cell
-        if (_sortedGrid.lat_ok[j] == 1){  // If there is a downstream cell
-            _ovf_in->val[from_j] += ovf_to_go; // [m]
+        if (ctrl.opt_percolation == 1){ // Repercolation and Re GW recharge
+            Repercolation_1(ctrl, par, j, _theta1->val[j], _theta2->val[j], _theta3->val[j], _vadose->val[j],  _rPerc1->val[j], _rPerc2->val[j], _rPerc3->val[j]);
+            ReGWrecharge_1(ctrl, par, j, _vadose->val[j], _GW->val[j], _Perc_vadose->val[j]);
+        } else if (ctrl.opt_percolation == 2){
+            Repercolation_2(ctrl, par, j, _theta1->val[j], _theta2->val[j], _theta3->val[j], _vadose->val[j],  _rPerc1->val[j], _rPerc2->val[j], _rPerc3->val[j]);
+            ReGWrecharge_2(ctrl, par, j, _vadose->val[j], _GW->val[j], _Perc_vadose->val[j]);
+        } else if (ctrl.opt_percolation == 3){
+            Repercolation_3(ctrl, par, j, _theta1->val[j], _theta2->val[j], _theta3->val[j], _vadose->val[j],  _rPerc1->val[j], _rPerc2->val[j], _rPerc3->val[j]);
+            ReGWrecharge_2(ctrl, par, j, _vadose->val[j], _GW->val[j], _Perc_vadose->val[j]);  // todo
         }
-        _pond->val[j] = 0;  // All ponding water has routed to downstream cell
 
-             
-        }        
+    }
     
+
+    if (chnwidth > 0){  // If there is channel in this grid cell
+        proportion_ovf_toChn = min(par._pOvf_toChn->val[j] * chnlength / dx , 1.0);  // The proportion of overland flow that routes into river              
+        _ovf_toChn->val[j] = ovf_to_go * proportion_ovf_toChn; // [m]
+        ovf_to_go -= _ovf_toChn->val[j];
+    }
+
+    // Terrestrial grid cell
+    _ovf_out->val[j] = ovf_to_go;  // To downstream terrestrial cell; routed by Routing_ovf_1
+    _pond->val[j] = 0;  // All ponding water has routed to downstream cell
+
     return EXIT_SUCCESS;
 }
\ No newline at end of file
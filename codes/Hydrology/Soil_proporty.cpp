@@ -260,20 +260,29 @@ int Basin::Soil_proporty(Control &ctrl, Param &par){
         double bclamda = par._BClambda->val[j];
         double psiAE = par._psiAE->val[j];
 
+        // Exponential decay at the layer boundaries (each term is shared by two adjacent layers)
+        double eKs1 = exp(-depth1 / KKs);
+        double eKs12 = exp(-(depth1+depth2) / KKs);
+        double eKs123 = exp(-(depth1+depth2+depth3) / KKs);
+        double eKsat1 = exp(-depth1 / Ksat);
+        double eKsat12 = exp(-(depth1+depth2) / Ksat);
+        double eKsat123 = exp(-(depth1+depth2+depth3) / Ksat);
+        double fFC = pow(psiAE / 3.36, 1 / bclamda);
+
         // Hydraulic conductivity decreases with depth
-        _Ks1->val[j] = KKs * Ks0 * (1 - exp(-depth1 / KKs)) / depth1;
-        _Ks2->val[j] = KKs * Ks0 * (exp(-depth1 / KKs) - exp(-(depth1+depth2) / KKs)) / depth2;
-        _Ks3->val[j] = KKs * Ks0 * (exp(-(depth1+depth2) / KKs) - exp(-(depth1+depth2+depth3) / KKs)) / depth3;
+        _Ks1->val[j] = KKs * Ks0 * (1 - eKs1) / depth1;
+        _Ks2->val[j] = KKs * Ks0 * (eKs1 - eKs12) / depth2;
+        _Ks3->val[j] = KKs * Ks0 * (eKs12 - eKs123) / depth3;
 
         // Saturated moisture content decreases with depth
-        _thetaS1->val[j] = Ksat * thetaS0 * (1 - exp(-depth1 / Ksat)) / depth1;
-        _thetaS2->val[j] = Ksat * thetaS0 * (exp(-depth1 / Ksat) - exp(-(depth1+depth2) / Ksat)) / depth2;
-        _thetaS3->val[j] = Ksat * thetaS0 * (exp(-(depth1+depth2) / Ksat) - exp(-(depth1+depth2+depth3) / Ksat)) / depth3;
+        _thetaS1->val[j] = Ksat * thetaS0 * (1 - eKsat1) / depth1;
+        _thetaS2->val[j] = Ksat * thetaS0 * (eKsat1 - eKsat12) / depth2;
+        _thetaS3->val[j] = Ksat * thetaS0 * (eKsat12 - eKsat123) / depth3;
 
         // Field capacity
-        _thetaFC1->val[j] = pow(psiAE / 3.36, 1 / bclamda) * (_thetaS1->val[j] - thetaWP0) + thetaWP0;
-        _thetaFC2->val[j] = pow(psiAE / 3.36, 1 / bclamda) * (_thetaS2->val[j] - thetaWP0) + thetaWP0;
-        _thetaFC3->val[j] = pow(psiAE / 3.36, 1 / bclamda) * (_thetaS3->val[j] - thetaWP0) + thetaWP0;
+        _thetaFC1->val[j] = fFC * (_thetaS1->val[j] - thetaWP0) + thetaWP0;
+        _thetaFC2->val[j] = fFC * (_thetaS2->val[j] - thetaWP0) + thetaWP0;
+        _thetaFC3->val[j] = fFC * (_thetaS3->val[j] - thetaWP0) + thetaWP0;
     }
     } 
 
@@ -36,6 +36,13 @@ int Basin::Solve_canopy(Control &ctrl, Param &par, Atmosphere &atm) {
     }
     
     // Tracking
+    if (ctrl.opt_fused_tracking==1){
+        if (ctrl.opt_tracking_isotope==1 or ctrl.opt_tracking_age==1 or ctrl.opt_nitrogen_sim==1){
+            Mixing_canopy_fused(ctrl, atm);  // d18o, age and no3 change due to canopy mixing
+        }
+        return EXIT_SUCCESS;
+    }
+
     if (ctrl.opt_tracking_isotope==1 or ctrl.opt_tracking_age==1){
         Mixing_canopy_tracking(ctrl, atm);  // d18o change due to canopy mixing and evaporation
     }
@@ -63,16 +63,29 @@ int Basin::Solve_soil_profile(Control &ctrl, Param &par, Atmosphere &atm){
 
     
     // Tracking
-    if (ctrl.opt_tracking_isotope==1 or ctrl.opt_tracking_age==1){
-        Mixing_soil_profile_tracking(ctrl, atm, par);  // d18o change due to canopy mixing and evaporation
-        Mixing_vadose_tracking(ctrl, atm);  // Vadose storage mixing
-        Mixing_GW_tracking(ctrl, atm);  // GW storage mixing
-    }
-
-    if (ctrl.opt_nitrogen_sim==1){
-        Solve_soil_profile_nitrogen(ctrl, atm, par);
-        Solve_vadose_nitrogen(ctrl, atm);
-        Solve_GW_nitrogen(ctrl, atm);
+    if (ctrl.opt_fused_tracking==1){
+        // Soil layers (fractionation and nitrogen transformations) first, then vadose and GW mixing of all solutes in one pass
+        if (ctrl.opt_tracking_isotope==1 or ctrl.opt_tracking_age==1){
+            Mixing_soil_profile_tracking(ctrl, atm, par);
+        }
+        if (ctrl.opt_nitrogen_sim==1){
+            Solve_soil_profile_nitrogen(ctrl, atm, par);
+        }
+        if (ctrl.opt_tracking_isotope==1 or ctrl.opt_tracking_age==1 or ctrl.opt_nitrogen_sim==1){
+            Mixing_vadose_GW_fused(ctrl, atm);
+        }
+    } else {
+        if (ctrl.opt_tracking_isotope==1 or ctrl.opt_tracking_age==1){
+            Mixing_soil_profile_tracking(ctrl, atm, par);  // d18o change due to canopy mixing and evaporation
+            Mixing_vadose_tracking(ctrl, atm);  // Vadose storage mixing
+            Mixing_GW_tracking(ctrl, atm);  // GW storage mixing
+        }
+
+        if (ctrl.opt_nitrogen_sim==1){
+            Solve_soil_profile_nitrogen(ctrl, atm, par);
+            Solve_vadose_nitrogen(ctrl, atm);
+            Solve_GW_nitrogen(ctrl, atm);
+        }
     }
 
 
@@ -30,12 +30,18 @@ int Basin::Solve_surface(Control &ctrl, Param &par, Atmosphere &atm){
         Irrigation(ctrl, par);
     }
 
-    if (ctrl.opt_tracking_isotope==1 or ctrl.opt_tracking_age==1){
-        Mixing_surface_tracking(ctrl, atm, par);
-    }
+    if (ctrl.opt_fused_tracking==1){
+        if (ctrl.opt_tracking_isotope==1 or ctrl.opt_tracking_age==1 or ctrl.opt_nitrogen_sim==1){
+            Mixing_surface_fused(ctrl, atm, par);
+        }
+    } else {
+        if (ctrl.opt_tracking_isotope==1 or ctrl.opt_tracking_age==1){
+            Mixing_surface_tracking(ctrl, atm, par);
+        }
 
-    if (ctrl.opt_nitrogen_sim==1){
-        Solve_surface_nitrogen(ctrl, atm, par);
+        if (ctrl.opt_nitrogen_sim==1){
+            Solve_surface_nitrogen(ctrl, atm, par);
+        }
     }
 
     return EXIT_SUCCESS;
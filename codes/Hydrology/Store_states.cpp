@@ -16,9 +16,16 @@
 
 
 #include "Basin.h"
+#include <cstring>
 
 
 int Basin::Store_states() {
+
+    // One block copy if the storages and their _old twins are contiguous in the state arena
+    if (_states_pair_length > 0){
+        memcpy(_I_old->val, _I->val, sizeof(double) * _states_pair_length);
+        return EXIT_SUCCESS;
+    }
     
     _I_old->equals(*_I);
     _snow_old->equals(*_snow);
@@ -31,4 +38,29 @@ int Basin::Store_states() {
     _chanS_old->equals(*_chanS);
 
     return EXIT_SUCCESS;
-}
\ No newline at end of file
+}
+
+
+int Basin::Pair_states(Control &ctrl) {
+
+    svector *current[9] = {_I, _snow, _pond, _theta1, _theta2, _theta3, _vadose, _GW, _chanS};
+    svector *old[9];
+    int stride = _states->stride;
+
+    _states_pair_length = 0;
+    if (ctrl.opt_tracking_isotope==1 or ctrl.opt_tracking_age==1 or ctrl.opt_nitrogen_sim==1){
+        old[0] = _I_old; old[1] = _snow_old; old[2] = _pond_old;
+        old[3] = _theta1_old; old[4] = _theta2_old; old[5] = _theta3_old;
+        old[6] = _vadose_old; old[7] = _GW_old; old[8] = _chanS_old;
+
+        for (int k = 0; k < 9; k++){
+            if (current[k]->val != _I->val + (size_t)k * stride or old[k]->val != _I_old->val + (size_t)k * stride){
+                return EXIT_SUCCESS;
+            }
+        }
+        // The last field is not padded beyond the number of cells
+        _states_pair_length = (size_t)8 * stride + _sortedGrid.size;
+    }
+
+    return EXIT_SUCCESS;
+}
@@ -0,0 +1,82 @@
+/***************************************************************
+* Generic Ecohydrological Model (GEM), a spatial-distributed module-based ecohydrological models
+* for multiscale hydrological, isotopic, and water quality simulations
+
+* Copyright (c) 2025   Songjun Wu <songjun.wu@igb-berlin.de / songjun-wu@outlook.com>
+
+  * GEM is a free software under the terms of GNU GEneral Public License version 3,
+  * Resitributon and modification are allowed under proper aknowledgement.
+
+* Contributors: Songjun Wu       Leibniz Institute of Freshwater Ecology and Inland Fisheries (IGB)
+
+* checkpoint.cpp
+  * Created  on: 30.02.2025
+  * Modified on: 19.10.2026
+***************************************************************/
+
+
+#include "Basin.h"
+
+/* Checkpoint file (binary):
+   header (int32): current_ts, number of cells, number of arena fields, number of low-precision fields, sizeof(real_lp), number of carried fluxes
+   then the arena fields (double, size values each), the low-precision fields (real_lp, size values each)
+   and the fluxes carried over to the next time step (double, size values each) in construction order */
+
+int Basin::Save_checkpoint(Control &ctrl){
+  ofstream ofHandle;
+  int header[6] = {ctrl.current_ts, _states->size, _states->n_used, (int)_states_lp.size(), (int)sizeof(real_lp), (int)_states_flux.size()};
+
+  ofHandle.open(ctrl.fn_checkpoint, ios::binary);
+  if (!ofHandle.good()){
+    throw runtime_error("file not found    :" + ctrl.fn_checkpoint);
+  }
+  ofHandle.write((char *)header, sizeof(header));
+  for (int k = 0; k < _states->n_used; k++){
+    ofHandle.write((char *)(_states->data + (size_t)k * _states->stride), sizeof(double) * _states->size);
+  }
+  for (unsigned int k = 0; k < _states_lp.size(); k++){
+    ofHandle.write((char *)_states_lp[k]->val, sizeof(real_lp) * _states_lp[k]->size);
+  }
+  for (unsigned int k = 0; k < _states_flux.size(); k++){
+    ofHandle.write((char *)_states_flux[k]->val, sizeof(double) * _states_flux[k]->size);
+  }
+  ofHandle.close();
+
+  return EXIT_SUCCESS;
+}
+
+
+int Basin::Load_checkpoint(Control &ctrl){
+  ifstream ifHandle;
+  int header[6];
+
+  ifHandle.open(ctrl.fn_checkpoint, ios::binary);
+  if (!ifHandle.good()){
+    throw runtime_error("file not found    :" + ctrl.fn_checkpoint);
+  }
+  ifHandle.read((char *)header, sizeof(header));
+
+  // The checkpoint should come from the same catchment, options and precision
+  if (header[0] != ctrl.current_ts){
+    throw runtime_error("checkpoint time does not match Checkpoint_time    :" + ctrl.fn_checkpoint);
+  }
+  if (header[1] != _states->size or header[2] != _states->n_used or header[3] != (int)_states_lp.size() or header[4] != (int)sizeof(real_lp) or header[5] != (int)_states_flux.size()){
+    throw runtime_error("checkpoint does not match the model configuration    :" + ctrl.fn_checkpoint);
+  }
+
+  for (int k = 0; k < _states->n_used; k++){
+    ifHandle.read((char *)(_states->data + (size_t)k * _states->stride), sizeof(double) * _states->size);
+  }
+  for (unsigned int k = 0; k < _states_lp.size(); k++){
+    ifHandle.read((char *)_states_lp[k]->val, sizeof(real_lp) * _states_lp[k]->size);
+  }
+  for (unsigned int k = 0; k < _states_flux.size(); k++){
+    ifHandle.read((char *)_states_flux[k]->val, sizeof(double) * _states_flux[k]->size);
+  }
+  if (!ifHandle.good()){
+    throw runtime_error("checkpoint is incomplete    :" + ctrl.fn_checkpoint);
+  }
+  ifHandle.close();
+
+  return EXIT_SUCCESS;
+}
@@ -47,7 +47,10 @@ int Control::ReadConfigFile(string fname){
   readInto(Ground_input_tstep, "Ground_input_tstep", lines);  
   readInto(Report_interval, "Report_interval", lines);
   readInto(Update_interval, "Update_interval", lines);
+  readInto(Report_buffer, "Report_buffer", lines);
   readInto(num_category, "num_category", lines);
+  readInto(Checkpoint_time, "Checkpoint_time", lines);
+  readInto(fn_checkpoint, "Checkpoint_file", lines);
   /* end of Settings */
 
   /* Options */
@@ -77,6 +80,14 @@ int Control::ReadConfigFile(string fname){
   readInto(opt_baseflow_mixing, "opt_baseflow_mixing", lines);
   readInto(opt_init_no3, "opt_init_no3", lines);
   readInto(opt_fert_input, "opt_fert_input", lines);
+  readInto(opt_parallel_routing, "opt_parallel_routing", lines);
+  readInto(opt_landuse_preload, "opt_landuse_preload", lines);
+  readInto(opt_report_map_format, "opt_report_map_format", lines);
+  readInto(opt_checkpoint, "opt_checkpoint", lines);
+  readInto(opt_report_profile, "opt_report_profile", lines);
+  readInto(opt_gauge_pruning, "opt_gauge_pruning", lines);
+  readInto(opt_routQ_substep, "opt_routQ_substep", lines);
+  readInto(opt_fused_tracking, "opt_fused_tracking", lines);
   /* end of Options */
 
   /* GIS */
@@ -302,6 +313,11 @@ int Control::ReadConfigFile(string fname){
   readInto(report__deni_river, "report_deni_river", lines);
   /* end of Report */
 
+  // The checkpoint is taken at the end of a time step, so Checkpoint_time has to be reached within the simulation
+  if (opt_checkpoint > 0 and (Checkpoint_time <= 0 or Checkpoint_time % Simul_tstep != 0 or Checkpoint_time >= Simul_end)){
+    throw runtime_error(string("Checkpoint_time should be a multiple of Simul_tstep within (0, Simul_end): ") + to_string(Checkpoint_time));
+  }
+
   return EXIT_SUCCESS;
 }
 
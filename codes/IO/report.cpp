@@ -416,6 +416,11 @@ int Report::Report_Initialisation(Control &ctrl){
   else if (ctrl.report__deni_river==2)  report_create(ctrl.path_ResultsFolder+"deni_river_map.bin", of__deni_river);
 
   /* end of Init Report */
+
+  // Compact map reports only hold the active cells; their raster positions are written once
+  // (an index left by an earlier compact run is removed, so that it is not mistaken for the layout of full maps)
+  if (ctrl.opt_report_map_format == 1) report_map_index(ctrl);
+  else remove((ctrl.path_ResultsFolder+"map_index.bin").c_str());
   return EXIT_SUCCESS;
 }
 
@@ -603,36 +608,116 @@ int Report::report_create(string fname, ofstream &ofHandle){
     }
 
 
-int Report::reportTS(Control &ctrl, const svector *input, ofstream &ofHandle){
+template<typename T>
+int Report::reportTS(Control &ctrl, const svector_t<T> *input, ofstream &ofHandle){
   int length = ctrl._Tsmask.cell.size();
-  double outdata[length];
-  string filename;
+  vector<double> &outdata = buffered[&ofHandle];
+
   for (int i = 0; i<length; i++){
-      outdata[i] = input->val[ctrl._Tsmask.cell[i]];
+      outdata.push_back(input->val[ctrl._Tsmask.cell[i]]);
   }
-  
-  ofHandle.write((char*)&outdata, sizeof(double)*length);
 
+  report_write(ofHandle, outdata, length);
   return EXIT_SUCCESS;
   }
 
+template int Report::reportTS<double>(Control &ctrl, const svector_t<double> *input, ofstream &ofHandle);
+template int Report::reportTS<float>(Control &ctrl, const svector_t<float> *input, ofstream &ofHandle);
+
 
 int Report::reportMap(Control &ctrl, const svector *input, sortedGrid _sortedGrid, ofstream &ofHandle){
   int r, c;
-  int _rowNum = ctrl._rowNum;
   int _colNum = ctrl._colNum;
-  double outdata[_rowNum*_colNum];
-  string filename;
-
-  for(int i = 0; i < _rowNum*_colNum; i++){
-      outdata[i] = ctrl._nodata;
+  vector<double> &outdata = buffered[&ofHandle];
+  size_t offset = outdata.size();
+
+  if (ctrl.opt_report_map_format == 1){
+    // Active cells only, in the order of the sorted grid
+    for(int j = 0; j < _sortedGrid.size; j++){
+      outdata.push_back(input->val[j] / advance_report * ctrl.Simul_tstep);
+      input->val[j] = 0.0;  // reset accumulated maps
+    }
+    report_write(ofHandle, outdata, _sortedGrid.size);
+    return EXIT_SUCCESS;
   }
+
+  outdata.insert(outdata.end(), map_template.begin(), map_template.end());
   for(int j = 0; j < _sortedGrid.size; j++){
     r = _sortedGrid.row[j];
     c = _sortedGrid.col[j];
-    outdata[r*_colNum + c] = input->val[j] / advance_report * ctrl.Simul_tstep;
+    outdata[offset + r*_colNum + c] = input->val[j] / advance_report * ctrl.Simul_tstep;
     input->val[j] = 0.0;  // reset accumulated maps
-  }  
-  ofHandle.write((char*)&outdata, sizeof(double)*_rowNum*_colNum);
+  }
+
+  report_write(ofHandle, outdata, map_template.size());
+  return EXIT_SUCCESS;
+  }
+
+
+int Report::report_map_index(Control &ctrl){
+  /* map_index.bin (int32): rowNum, colNum, number of cells, then the flat raster index (row * colNum + col) of each cell */
+  ofstream ofHandle;
+  vector<int32_t> outdata;
+
+  outdata.push_back(ctrl._rowNum);
+  outdata.push_back(ctrl._colNum);
+  outdata.push_back(ctrl._sortedGrid.size);
+  for(int j = 0; j < ctrl._sortedGrid.size; j++){
+    outdata.push_back(ctrl._sortedGrid.row[j] * ctrl._colNum + ctrl._sortedGrid.col[j]);
+  }
+
+  ofHandle.open(ctrl.path_ResultsFolder+"map_index.bin", ios::binary|ios::trunc);
+  if (!ofHandle.good()){
+    throw runtime_error("file not found    :" + ctrl.path_ResultsFolder+"map_index.bin");
+  }
+  ofHandle.write((char*)outdata.data(), sizeof(int32_t)*outdata.size());
+  ofHandle.close();
+  return EXIT_SUCCESS;
+  }
+
+
+int Report::report_write(ofstream &ofHandle, vector<double> &outdata, int length){
+  // Reserve the buffer once; the capacity is kept after each write
+  if (outdata.capacity() < (size_t)report_buffer*length){
+    outdata.reserve((size_t)report_buffer*length);
+  }
+  if (outdata.size() >= (size_t)report_buffer*length){
+    ofHandle.write((char*)outdata.data(), sizeof(double)*outdata.size());
+    outdata.clear();
+  }
+  return EXIT_SUCCESS;
+  }
+
+
+int Report::report_flush(){
+  for (auto &item : buffered){
+    if (!item.second.empty()){
+      item.first->write((char*)item.second.data(), sizeof(double)*item.second.size());
+      item.second.clear();
+    }
+  }
   return EXIT_SUCCESS;
-  }
\ No newline at end of file
+  }
+
+
+int Report::report_info(Control &ctrl){
+  /* report_info.txt: key = value lines, in the same style as config.ini */
+  ofstream ofHandle;
+
+  ofHandle.open(ctrl.path_ResultsFolder+"report_info.txt", ios::trunc);
+  if (!ofHandle.good()){
+    throw runtime_error("file not found    :" + ctrl.path_ResultsFolder+"report_info.txt");
+  }
+  ofHandle << "# Layout of the GEM reports; all *_TS.bin and *_map.bin files are float64" << endl;
+  ofHandle << "rows = " << ctrl._rowNum << "  # Rows of the raster" << endl;
+  ofHandle << "cols = " << ctrl._colNum << "  # Columns of the raster" << endl;
+  ofHandle << "n_cells = " << ctrl._sortedGrid.size << "  # Active cells (values per map if map_format = 1)" << endl;
+  ofHandle << "n_sites = " << ctrl._Tsmask.cell.size() << "  # Gauges (values per time step in *_TS.bin)" << endl;
+  ofHandle << "map_format = " << ctrl.opt_report_map_format << "  # 0: full raster; 1: active cells in the order of map_index.bin" << endl;
+  ofHandle << "nodata = " << ctrl._nodata << endl;
+  ofHandle << "Simul_start = " << ctrl.Simul_start << endl;
+  ofHandle << "Simul_tstep = " << ctrl.Simul_tstep << endl;
+  ofHandle << "Report_interval = " << ctrl.Report_interval << endl;
+  ofHandle.close();
+  return EXIT_SUCCESS;
+  }
@@ -22,11 +22,18 @@ int Basin::Report_for_cali(Control &ctrl){
   // Only report discharge, in-stream d18o, and in-stream nitrate for calibration
   int length = ctrl._Tsmask.cell.size();
   int idx;
-  for (int i = 0; i<ctrl._Tsmask.cell.size(); i++){
+  // Reserve the whole series once to avoid reallocations along the run
+  if (vector_Q.empty()){
+    size_t n_record = (size_t)(ctrl.Simul_end / ctrl.Simul_tstep + 1) * length;
+    vector_Q.reserve(n_record);
+    if (ctrl.opt_tracking_isotope == 1) vector_d18o_chanS.reserve(n_record);
+    if (ctrl.opt_nitrogen_sim == 1) vector_no3_chanS.reserve(n_record);
+  }
+  for (int i = 0; i<length; i++){
       idx = ctrl._Tsmask.cell[i];
       vector_Q.push_back(_Q->val[idx]);
-      vector_d18o_chanS.push_back(_d18o_chanS->val[idx]);
-      vector_no3_chanS.push_back(_no3_chanS->val[idx]);
+      if (ctrl.opt_tracking_isotope == 1) vector_d18o_chanS.push_back(_d18o_chanS->val[idx]);
+      if (ctrl.opt_nitrogen_sim == 1) vector_no3_chanS.push_back(_no3_chanS->val[idx]);
 
       //if(ctrl.current_ts/86400 == 0) cout << i << "   "<< idx<<"   "<< _sortedGrid.row[idx] << "   "<<_sortedGrid.col[idx] << "   "<< _no3_layer3->val[idx] << endl;  // todo
   }
@@ -37,8 +44,8 @@ int Basin::Report_for_cali(Control &ctrl){
 int Basin::Save_for_cali(Control &ctrl){
   // Save outputs to binary files
   save_vector_to_binary(vector_Q, ctrl.path_ResultsFolder+"discharge_TS.bin");
-  save_vector_to_binary(vector_d18o_chanS, ctrl.path_ResultsFolder+"d18o_chanS_TS.bin");
-  save_vector_to_binary(vector_no3_chanS, ctrl.path_ResultsFolder+"no3_chanS_TS.bin") ;
+  if (ctrl.opt_tracking_isotope == 1) save_vector_to_binary(vector_d18o_chanS, ctrl.path_ResultsFolder+"d18o_chanS_TS.bin");
+  if (ctrl.opt_nitrogen_sim == 1) save_vector_to_binary(vector_no3_chanS, ctrl.path_ResultsFolder+"no3_chanS_TS.bin") ;
 
   return EXIT_SUCCESS;
 }
@@ -16,6 +16,10 @@
 
 
 #include "dataType.h"
+#include <algorithm>
+#include <cstdlib>
+#include <cstring>
+#include <stdexcept>
 
 grid::grid(string fname, int rowNum, int colNum){
   ifstream input;
@@ -44,11 +48,19 @@ grid::grid(string fname, int rowNum, int colNum){
 }
 
 
-svector::svector(string fname , int rowNum, int colNum, sortedGrid _sortedGrid){
+template<typename T>
+svector_t<T>::svector_t(string fname , int rowNum, int colNum, sortedGrid _sortedGrid)
+  : svector_t(fname, rowNum, colNum, _sortedGrid, new T[_sortedGrid.size]){
+  owner = true;
+}
+
+template<typename T>
+svector_t<T>::svector_t(string fname , int rowNum, int colNum, sortedGrid _sortedGrid, T *buffer){
   ifstream input;
   string tags;
   size = _sortedGrid.size;
-  val = new double[size];
+  val = buffer;
+  owner = false;
   grid *temp;
   int r, c;
 
@@ -68,6 +80,9 @@ svector_2d::svector_2d(int num_category, sortedGrid _sortedGrid){
   parameterisation_count = 0;
   sort_PTF = 0;
   sort_perc_travel_time_OK = 0;
+  preload = 0;
+  n_epoch = 0;
+  buffer = NULL;
 
   val = new double*[num_category];
 
@@ -77,101 +92,181 @@ svector_2d::svector_2d(int num_category, sortedGrid _sortedGrid){
 
 }
 
-int svector_2d::update(string fname, int num_category, int rowNum, int colNum, sortedGrid _sortedGrid){
-  ifstream input;
+int svector_2d::open(string fname, int num_category, int rowNum, int colNum, sortedGrid _sortedGrid, int opt_preload){
   int r,c;
   int dim = rowNum*colNum;
 
-  parameterisation_OK = 0;
-  sort_PTF = 0;
-  sort_perc_travel_time_OK = 0;
+  preload = opt_preload;
+  buffer = new double[dim];
+  if_category.resize(num_category);
 
-  double *data=NULL;
-  
   for (int k=0; k<num_category; k++){
-
-    data = new double[dim];
-    input.open((fname+to_string(k)+".bin").c_str(), ios::binary);
-    if (!input.good()){
+    if_category[k].open((fname+to_string(k)+".bin").c_str(), ios::binary);
+    if (!if_category[k].good()){
       throw runtime_error("file not found    :" + fname+to_string(k)+".bin");
     }
-    input.seekg(sizeof(double)*dim*parameterisation_count);
-    input.read((char *)data, sizeof(double)*dim);
+  }
 
-    
+  if (preload == 1){
+    // The number of epochs available in all category files
+    for (int k=0; k<num_category; k++){
+      if_category[k].seekg(0, ios::end);
+      int num_epoch = if_category[k].tellg() / (sizeof(double)*dim);
+      n_epoch = k==0 ? num_epoch : min(n_epoch, num_epoch);
+      if_category[k].seekg(0, ios::beg);
+    }
 
-    for (int j=0; j<size; j++){
-      r = _sortedGrid.row[j];
-      c = _sortedGrid.col[j];
-      val[k][j] = data[r*colNum + c];
-      
+    preloaded.assign(num_category, vector<double>((size_t)n_epoch*size));
+    for (int k=0; k<num_category; k++){
+      for (int e=0; e<n_epoch; e++){
+        if_category[k].read((char *)buffer, sizeof(double)*dim);
+        for (int j=0; j<size; j++){
+          r = _sortedGrid.row[j];
+          c = _sortedGrid.col[j];
+          preloaded[k][(size_t)e*size + j] = buffer[r*colNum + c];
+        }
+      }
+      if_category[k].close();
     }
-    delete data;
-    input.close();
+  }
+
+  return EXIT_SUCCESS;
+}
+
+int svector_2d::update(string fname, int num_category, int rowNum, int colNum, sortedGrid _sortedGrid, int opt_preload){
+  int r,c;
+  int dim = rowNum*colNum;
+
+  parameterisation_OK = 0;
+  sort_PTF = 0;
+  sort_perc_travel_time_OK = 0;
+
+  if (buffer == NULL){
+    open(fname, num_category, rowNum, colNum, _sortedGrid, opt_preload);
+  }
+
+  // Beyond the last epoch in the files, the current fractions are kept
+  for (int k=0; k<num_category; k++){
+    if (preload == 1){
+      if (parameterisation_count < n_epoch){
+        copy(preloaded[k].begin() + (size_t)parameterisation_count*size,
+             preloaded[k].begin() + (size_t)(parameterisation_count+1)*size, val[k]);
+      }
+    } else if (if_category[k].read((char *)buffer, sizeof(double)*dim)){
+      for (int j=0; j<size; j++){
+        r = _sortedGrid.row[j];
+        c = _sortedGrid.col[j];
+        val[k][j] = buffer[r*colNum + c];
+      }
     }
+  }
 
   parameterisation_count += 1;
 
+  sparsify();
+
   return EXIT_SUCCESS;
 }
 
-svector::svector(int length){
+int svector_2d::sparsify(){
+  nz_start.assign(size + 1, 0);
+  nz_category.clear();
+  nz_weight.clear();
+
+  for (int j=0; j<size; j++){
+    for (int k=0; k<n_category; k++){
+      if (val[k][j] != 0){
+        nz_category.push_back(k);
+        nz_weight.push_back(val[k][j]);
+      }
+    }
+    nz_start[j+1] = nz_category.size();
+  }
+  return EXIT_SUCCESS;
+}
+
+template<typename T>
+svector_t<T>::svector_t(int length) : svector_t(length, new T[length]){
+  owner = true;
+}
+
+template<typename T>
+svector_t<T>::svector_t(int length, T *buffer){
   size = length;
-  val = new double[size];
+  val = buffer;
+  owner = false;
 
   for (int j=0; j<size; j++){
     val[j] = 0;
   }
 }
 
-svector::~svector(){
-  delete[] val;
+template<typename T>
+svector_t<T>::~svector_t(){
+  if (owner) delete[] val;
 }
 
-svector_2d::~svector_2d(){
-  for (int k = 0; k < n_category; k++){
-    delete[] val[k];
+state_arena::state_arena(int num_field, int length){
+  size = length;
+  stride = max(8, (length + 7) / 8 * 8);
+  n_field = num_field;
+  n_used = 0;
+
+  data = static_cast<double*>(aligned_alloc(64, sizeof(double) * max(n_field, 1) * stride));
+  if (data == NULL){
+    throw runtime_error("failed to allocate the state arena of " + to_string(n_field) + " fields");
   }
-  delete[] val;
+  reset();
 }
 
-int svector::reset(){
-  for (int j=0; j<size; j++){
-    val[j] = 0;
-  }
-  return EXIT_SUCCESS;
+state_arena::~state_arena(){
+  free(data);
 }
 
-int svector::equals(svector &sv){
-  for (int j=0; j<size; j++){
-      val[j] = sv.val[j];     
+double *state_arena::next(){
+  if (n_used >= n_field){
+    throw runtime_error("state arena is full (" + to_string(n_field) + " fields)");
   }
+  return data + (size_t)stride * n_used++;
+}
+
+size_t state_arena::bytes(){
+  return sizeof(double) * n_field * stride;
+}
+
+int state_arena::reset(){
+  memset(data, 0, bytes());
   return EXIT_SUCCESS;
 }
 
-int svector::plus(svector &sv){
-  for (int j=0; j<size; j++){
-      val[j] += sv.val[j];     
-  }
+int state_arena::snapshot(double *buffer){
+  memcpy(buffer, data, bytes());
   return EXIT_SUCCESS;
 }
 
-int svector::minus(svector &sv){
-  for (int j=0; j<size; j++){
-      val[j] -= sv.val[j];     
-  }
+int state_arena::restore(const double *buffer){
+  memcpy(data, buffer, bytes());
   return EXIT_SUCCESS;
 }
 
-int svector::multiply(svector &sv){
+svector_2d::~svector_2d(){
+  for (int k = 0; k < n_category; k++){
+    delete[] val[k];
+  }
+  delete[] val;
+  delete[] buffer;
+}
 
+template<typename T>
+int svector_t<T>::reset(){
   for (int j=0; j<size; j++){
-      val[j] *= sv.val[j];     
+    val[j] = 0;
   }
   return EXIT_SUCCESS;
 }
 
-int svector::higherthan(double minimum){
+template<typename T>
+int svector_t<T>::higherthan(double minimum){
 
   for (int j=0; j<size; j++){
     if (val[j] < minimum){
@@ -181,6 +276,9 @@ int svector::higherthan(double minimum){
   return EXIT_SUCCESS;
 }
 
+template struct svector_t<double>;
+template struct svector_t<float>;
+
 grid::grid(int rowNum, int colNum){
   nrow = rowNum;
   ncol = colNum;
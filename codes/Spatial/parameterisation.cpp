@@ -19,404 +19,199 @@
 
 int Param::Parameterisation(Control &ctrl){
 
+  // Update the parameterisation due to the changes in land use types
+  param_category->update(ctrl.path_BasinFolder+"category_", ctrl.num_category ,_rowNum, _colNum, _sortedGrid, ctrl.opt_landuse_preload);
+
+  Assign_parameters(ctrl);
+
+  return EXIT_SUCCESS;
+}
+
+int Param::Assign_parameters(Control &ctrl){
+  /* Weight the parameter values of each category with the (sparse) category fractions of each cell.
+     Call it directly after changing the parameter values; the category maps are not re-read. */
+
   // Init flags
   sort_perc_travel_time_OK = 0;  
   sort_root_fraction_OK = 0;  
   sort_plant_uptake_OK = 0;  // The plant uptake only needs to be calculated once (or once within each change)
   sort_nitrogen_addition_OK = 0;  // The nitrogen addtion only needs to be calculated once (or once within each change)
-
-  // Update the parameterisation due to the changes in land use types
-  param_category->update(ctrl.path_BasinFolder+"category_", ctrl.num_category ,_rowNum, _colNum, _sortedGrid);
+  sort_routQ_coeff_OK = 0;  // The Kinematic Wave coefficients only need to be calculated once (or once within each change)
+  param_category->sort_PTF = 0;
+  param_category->sort_perc_travel_time_OK = 0;
 
   /* Parameters */
   int nodata = ctrl._nodata;
 
-
-  _depth3->reset();
-  for (int k=0; k<param_category->n_category; k++){
-    if (depth3[k]!=nodata) {
-      for (unsigned int j = 0; j < _sortedGrid.row.size(); j++) {
-      _depth3->val[j] += param_category->val[k][j] * depth3[k];
-   }}}
-
-  _alpha->reset();
-  for (int k=0; k<param_category->n_category; k++){
-    if (alpha[k]!=nodata) {
-      for (unsigned int j = 0; j < _sortedGrid.row.size(); j++) {
-      _alpha->val[j] += param_category->val[k][j] * alpha[k];
-   }}}
-
-  _irrigation_FC_thres->reset();
-  for (int k=0; k<param_category->n_category; k++){
-    if (irrigation_FC_thres[k]!=nodata) {
-      for (unsigned int j = 0; j < _sortedGrid.row.size(); j++) {
-      _irrigation_FC_thres->val[j] += param_category->val[k][j] * irrigation_FC_thres[k];
-   }}}
-
-  _perc_vadose_coeff->reset();
-  for (int k=0; k<param_category->n_category; k++){
-    if (perc_vadose_coeff[k]!=nodata) {
-      for (unsigned int j = 0; j < _sortedGrid.row.size(); j++) {
-      _perc_vadose_coeff->val[j] += param_category->val[k][j] * perc_vadose_coeff[k];
-   }}}
-
-  _nearsurface_mixing->reset();
-  for (int k=0; k<param_category->n_category; k++){
-    if (nearsurface_mixing[k]!=nodata) {
-      for (unsigned int j = 0; j < _sortedGrid.row.size(); j++) {
-      _nearsurface_mixing->val[j] += param_category->val[k][j] * nearsurface_mixing[k];
-   }}}
-
-  _ratio_to_interf->reset();
-  for (int k=0; k<param_category->n_category; k++){
-    if (ratio_to_interf[k]!=nodata) {
-      for (unsigned int j = 0; j < _sortedGrid.row.size(); j++) {
-      _ratio_to_interf->val[j] += param_category->val[k][j] * ratio_to_interf[k];
-   }}}
-
-  if (ctrl.opt_intecept == 2 or ctrl.opt_evap == 1){
-  
-  _rE->reset();
-    for (int k=0; k<param_category->n_category; k++){
-      if (rE[k]!=nodata) {
-        for (unsigned int j = 0; j < _sortedGrid.row.size(); j++) {
-        _rE->val[j] += param_category->val[k][j] * rE[k];
-     }}}
-
-  }
-
-  if (ctrl.opt_snow == 1){
-  
-  _snow_rain_thre->reset();
-    for (int k=0; k<param_category->n_category; k++){
-      if (snow_rain_thre[k]!=nodata) {
-        for (unsigned int j = 0; j < _sortedGrid.row.size(); j++) {
-        _snow_rain_thre->val[j] += param_category->val[k][j] * snow_rain_thre[k];
-     }}}
-  
-  _deg_day_min->reset();
-    for (int k=0; k<param_category->n_category; k++){
-      if (deg_day_min[k]!=nodata) {
-        for (unsigned int j = 0; j < _sortedGrid.row.size(); j++) {
-        _deg_day_min->val[j] += param_category->val[k][j] * deg_day_min[k];
-     }}}
-  
-  _deg_day_max->reset();
-    for (int k=0; k<param_category->n_category; k++){
-      if (deg_day_max[k]!=nodata) {
-        for (unsigned int j = 0; j < _sortedGrid.row.size(); j++) {
-        _deg_day_max->val[j] += param_category->val[k][j] * deg_day_max[k];
-     }}}
-  
-  _deg_day_increase->reset();
-    for (int k=0; k<param_category->n_category; k++){
-      if (deg_day_increase[k]!=nodata) {
-        for (unsigned int j = 0; j < _sortedGrid.row.size(); j++) {
-        _deg_day_increase->val[j] += param_category->val[k][j] * deg_day_increase[k];
-     }}}
-
-  }
-
-  if (ctrl.opt_pedotransf == 1 or ctrl.opt_pedotransf == 2 or ctrl.opt_pedotransf == 3){
-  
-  _ref_thetaS->reset();
-    for (int k=0; k<param_category->n_category; k++){
-      if (ref_thetaS[k]!=nodata) {
-        for (unsigned int j = 0; j < _sortedGrid.row.size(); j++) {
-        _ref_thetaS->val[j] += param_category->val[k][j] * ref_thetaS[k];
-     }}}
-  
-  _PTF_VG_clay->reset();
-    for (int k=0; k<param_category->n_category; k++){
-      if (PTF_VG_clay[k]!=nodata) {
-        for (unsigned int j = 0; j < _sortedGrid.row.size(); j++) {
-        _PTF_VG_clay->val[j] += param_category->val[k][j] * PTF_VG_clay[k];
-     }}}
-  
-  _PTF_VG_Db->reset();
-    for (int k=0; k<param_category->n_category; k++){
-      if (PTF_VG_Db[k]!=nodata) {
-        for (unsigned int j = 0; j < _sortedGrid.row.size(); j++) {
-        _PTF_VG_Db->val[j] += param_category->val[k][j] * PTF_VG_Db[k];
-     }}}
-  
-  _PTF_Ks_const->reset();
-    for (int k=0; k<param_category->n_category; k++){
-      if (PTF_Ks_const[k]!=nodata) {
-        for (unsigned int j = 0; j < _sortedGrid.row.size(); j++) {
-        _PTF_Ks_const->val[j] += param_category->val[k][j] * PTF_Ks_const[k];
-     }}}
-  
-  _PTF_Ks_sand->reset();
-    for (int k=0; k<param_category->n_category; k++){
-      if (PTF_Ks_sand[k]!=nodata) {
-        for (unsigned int j = 0; j < _sortedGrid.row.size(); j++) {
-        _PTF_Ks_sand->val[j] += param_category->val[k][j] * PTF_Ks_sand[k];
-     }}}
-  
-  _PTF_Ks_clay->reset();
-    for (int k=0; k<param_category->n_category; k++){
-      if (PTF_Ks_clay[k]!=nodata) {
-        for (unsigned int j = 0; j < _sortedGrid.row.size(); j++) {
-        _PTF_Ks_clay->val[j] += param_category->val[k][j] * PTF_Ks_clay[k];
-     }}}
-
-  }
-
-  if (ctrl.opt_fieldcapacity == 1){
-  
-  _SWP->reset();
-    for (int k=0; k<param_category->n_category; k++){
-      if (SWP[k]!=nodata) {
-        for (unsigned int j = 0; j < _sortedGrid.row.size(); j++) {
-        _SWP->val[j] += param_category->val[k][j] * SWP[k];
-     }}}
-
-  }
-
-  if (ctrl.opt_infil == 1 or ctrl.opt_depthprofile == 2){
-  
-  _KvKh->reset();
-    for (int k=0; k<param_category->n_category; k++){
-      if (KvKh[k]!=nodata) {
-        for (unsigned int j = 0; j < _sortedGrid.row.size(); j++) {
-        _KvKh->val[j] += param_category->val[k][j] * KvKh[k];
-     }}}
-  
-  _psiAE->reset();
-    for (int k=0; k<param_category->n_category; k++){
-      if (psiAE[k]!=nodata) {
-        for (unsigned int j = 0; j < _sortedGrid.row.size(); j++) {
-        _psiAE->val[j] += param_category->val[k][j] * psiAE[k];
-     }}}
-
-  }
-
-  if (ctrl.opt_depthprofile == 2){
-  
-  _KKs->reset();
-    for (int k=0; k<param_category->n_category; k++){
-      if (KKs[k]!=nodata) {
-        for (unsigned int j = 0; j < _sortedGrid.row.size(); j++) {
-        _KKs->val[j] += param_category->val[k][j] * KKs[k];
-     }}}
-  
-  _Ksat->reset();
-    for (int k=0; k<param_category->n_category; k++){
-      if (Ksat[k]!=nodata) {
-        for (unsigned int j = 0; j < _sortedGrid.row.size(); j++) {
-        _Ksat->val[j] += param_category->val[k][j] * Ksat[k];
-     }}}
-  
-  _BClambda->reset();
-    for (int k=0; k<param_category->n_category; k++){
-      if (BClambda[k]!=nodata) {
-        for (unsigned int j = 0; j < _sortedGrid.row.size(); j++) {
-        _BClambda->val[j] += param_category->val[k][j] * BClambda[k];
-     }}}
-
-  }
-
-  if (ctrl.opt_percolation == 2){
-  
-  _percExp->reset();
-    for (int k=0; k<param_category->n_category; k++){
-      if (percExp[k]!=nodata) {
-        for (unsigned int j = 0; j < _sortedGrid.row.size(); j++) {
-        _percExp->val[j] += param_category->val[k][j] * percExp[k];
-     }}}
-
-  }
-
-  if (ctrl.opt_evap == 1){
-  
-  _froot_coeff->reset();
-    for (int k=0; k<param_category->n_category; k++){
-      if (froot_coeff[k]!=nodata) {
-        for (unsigned int j = 0; j < _sortedGrid.row.size(); j++) {
-        _froot_coeff->val[j] += param_category->val[k][j] * froot_coeff[k];
-     }}}
-  
-  _ET_reduction->reset();
-    for (int k=0; k<param_category->n_category; k++){
-      if (ET_reduction[k]!=nodata) {
-        for (unsigned int j = 0; j < _sortedGrid.row.size(); j++) {
-        _ET_reduction->val[j] += param_category->val[k][j] * ET_reduction[k];
-     }}}
-
-  }
-
-  if (ctrl.opt_init_GW == 1){
-  
-  _init_GW->reset();
-    for (int k=0; k<param_category->n_category; k++){
-      if (init_GW[k]!=nodata) {
-        for (unsigned int j = 0; j < _sortedGrid.row.size(); j++) {
-        _init_GW->val[j] += param_category->val[k][j] * init_GW[k];
-     }}}
-
-  }
-
-  if (ctrl.opt_routinterf == 1){
-  
-  _pOvf_toChn->reset();
-    for (int k=0; k<param_category->n_category; k++){
-      if (pOvf_toChn[k]!=nodata) {
-        for (unsigned int j = 0; j < _sortedGrid.row.size(); j++) {
-        _pOvf_toChn->val[j] += param_category->val[k][j] * pOvf_toChn[k];
-     }}}
-  
-  _Ks_vadose->reset();
-    for (int k=0; k<param_category->n_category; k++){
-      if (Ks_vadose[k]!=nodata) {
-        for (unsigned int j = 0; j < _sortedGrid.row.size(); j++) {
-        _Ks_vadose->val[j] += param_category->val[k][j] * Ks_vadose[k];
-     }}}
-  
-  _lat_to_Chn_vadose->reset();
-    for (int k=0; k<param_category->n_category; k++){
-      if (lat_to_Chn_vadose[k]!=nodata) {
-        for (unsigned int j = 0; j < _sortedGrid.row.size(); j++) {
-        _lat_to_Chn_vadose->val[j] += param_category->val[k][j] * lat_to_Chn_vadose[k];
-     }}}
-  
-  _interfExp->reset();
-    for (int k=0; k<param_category->n_category; k++){
-      if (interfExp[k]!=nodata) {
-        for (unsigned int j = 0; j < _sortedGrid.row.size(); j++) {
-        _interfExp->val[j] += param_category->val[k][j] * interfExp[k];
-     }}}
-
-  }
-
-  if (ctrl.opt_routGWf == 1){
-  
-  _Ks_GW->reset();
-    for (int k=0; k<param_category->n_category; k++){
-      if (Ks_GW[k]!=nodata) {
-        for (unsigned int j = 0; j < _sortedGrid.row.size(); j++) {
-        _Ks_GW->val[j] += param_category->val[k][j] * Ks_GW[k];
-     }}}
-  
-  _lat_to_Chn_GW->reset();
-    for (int k=0; k<param_category->n_category; k++){
-      if (lat_to_Chn_GW[k]!=nodata) {
-        for (unsigned int j = 0; j < _sortedGrid.row.size(); j++) {
-        _lat_to_Chn_GW->val[j] += param_category->val[k][j] * lat_to_Chn_GW[k];
-     }}}
-  
-  _GWfExp->reset();
-    for (int k=0; k<param_category->n_category; k++){
-      if (GWfExp[k]!=nodata) {
-        for (unsigned int j = 0; j < _sortedGrid.row.size(); j++) {
-        _GWfExp->val[j] += param_category->val[k][j] * GWfExp[k];
-     }}}
-
-  }
-
-  if (ctrl.opt_routQ == 1){
-  
-  _Manningn->reset();
-    for (int k=0; k<param_category->n_category; k++){
-      if (Manningn[k]!=nodata) {
-        for (unsigned int j = 0; j < _sortedGrid.row.size(); j++) {
-        _Manningn->val[j] += param_category->val[k][j] * Manningn[k];
-     }}}
-
-  }
-
-  if (ctrl.opt_chanE == 1 or ctrl.opt_chanE == 2){
-  
-  _Echan_alpha->reset();
-    for (int k=0; k<param_category->n_category; k++){
-      if (Echan_alpha[k]!=nodata) {
-        for (unsigned int j = 0; j < _sortedGrid.row.size(); j++) {
-        _Echan_alpha->val[j] += param_category->val[k][j] * Echan_alpha[k];
-     }}}
-
-  }
-
-  if (ctrl.opt_irrigation == 1){
-  
-  _irrigation_coeff->reset();
-    for (int k=0; k<param_category->n_category; k++){
-      if (irrigation_coeff[k]!=nodata) {
-        for (unsigned int j = 0; j < _sortedGrid.row.size(); j++) {
-        _irrigation_coeff->val[j] += param_category->val[k][j] * irrigation_coeff[k];
-     }}}
-
-  }
-
-  if (ctrl.opt_tracking_isotope == 1){
-  
-  _CG_n_soil->reset();
-    for (int k=0; k<param_category->n_category; k++){
-      if (CG_n_soil[k]!=nodata) {
-        for (unsigned int j = 0; j < _sortedGrid.row.size(); j++) {
-        _CG_n_soil->val[j] += param_category->val[k][j] * CG_n_soil[k];
-     }}}
-
-  }
-
-  if (ctrl.opt_init_d18o == 1){
-  
-  _delta_d18o_init_GW->reset();
-    for (int k=0; k<param_category->n_category; k++){
-      if (delta_d18o_init_GW[k]!=nodata) {
-        for (unsigned int j = 0; j < _sortedGrid.row.size(); j++) {
-        _delta_d18o_init_GW->val[j] += param_category->val[k][j] * delta_d18o_init_GW[k];
-     }}}
-
-  }
-
-  if (ctrl.opt_init_no3 == 1){
-  
-  _delta_no3_init_GW->reset();
-    for (int k=0; k<param_category->n_category; k++){
-      if (delta_no3_init_GW[k]!=nodata) {
-        for (unsigned int j = 0; j < _sortedGrid.row.size(); j++) {
-        _delta_no3_init_GW->val[j] += param_category->val[k][j] * delta_no3_init_GW[k];
-     }}}
-
-  }
-
-  if (ctrl.opt_nitrogen_sim == 1){
-  
-  _denitrification_river->reset();
-    for (int k=0; k<param_category->n_category; k++){
-      if (denitrification_river[k]!=nodata) {
-        for (unsigned int j = 0; j < _sortedGrid.row.size(); j++) {
-        _denitrification_river->val[j] += param_category->val[k][j] * denitrification_river[k];
-     }}}
-  
-  _denitrification_soil->reset();
-    for (int k=0; k<param_category->n_category; k++){
-      if (denitrification_soil[k]!=nodata) {
-        for (unsigned int j = 0; j < _sortedGrid.row.size(); j++) {
-        _denitrification_soil->val[j] += param_category->val[k][j] * denitrification_soil[k];
-     }}}
-  
-  _degradation_soil->reset();
-    for (int k=0; k<param_category->n_category; k++){
-      if (degradation_soil[k]!=nodata) {
-        for (unsigned int j = 0; j < _sortedGrid.row.size(); j++) {
-        _degradation_soil->val[j] += param_category->val[k][j] * degradation_soil[k];
-     }}}
-  
-  _mineralisation_soil->reset();
-    for (int k=0; k<param_category->n_category; k++){
-      if (mineralisation_soil[k]!=nodata) {
-        for (unsigned int j = 0; j < _sortedGrid.row.size(); j++) {
-        _mineralisation_soil->val[j] += param_category->val[k][j] * mineralisation_soil[k];
-     }}}
-  
-  _deni_soil_moisture_thres->reset();
-    for (int k=0; k<param_category->n_category; k++){
-      if (deni_soil_moisture_thres[k]!=nodata) {
-        for (unsigned int j = 0; j < _sortedGrid.row.size(); j++) {
-        _deni_soil_moisture_thres->val[j] += param_category->val[k][j] * deni_soil_moisture_thres[k];
-     }}}
-
+  #pragma omp parallel for
+  for (int j = 0; j < _sortedGrid.size; j++) {
+    _depth3->val[j] = 0;
+    _alpha->val[j] = 0;
+    _irrigation_FC_thres->val[j] = 0;
+    _perc_vadose_coeff->val[j] = 0;
+    _nearsurface_mixing->val[j] = 0;
+    _ratio_to_interf->val[j] = 0;
+    if (ctrl.opt_intecept == 2 or ctrl.opt_evap == 1){
+      _rE->val[j] = 0;
+    }
+    if (ctrl.opt_snow == 1){
+      _snow_rain_thre->val[j] = 0;
+      _deg_day_min->val[j] = 0;
+      _deg_day_max->val[j] = 0;
+      _deg_day_increase->val[j] = 0;
+    }
+    if (ctrl.opt_pedotransf == 1 or ctrl.opt_pedotransf == 2 or ctrl.opt_pedotransf == 3){
+      _ref_thetaS->val[j] = 0;
+      _PTF_VG_clay->val[j] = 0;
+      _PTF_VG_Db->val[j] = 0;
+      _PTF_Ks_const->val[j] = 0;
+      _PTF_Ks_sand->val[j] = 0;
+      _PTF_Ks_clay->val[j] = 0;
+    }
+    if (ctrl.opt_fieldcapacity == 1){
+      _SWP->val[j] = 0;
+    }
+    if (ctrl.opt_infil == 1 or ctrl.opt_depthprofile == 2){
+      _KvKh->val[j] = 0;
+      _psiAE->val[j] = 0;
+    }
+    if (ctrl.opt_depthprofile == 2){
+      _KKs->val[j] = 0;
+      _Ksat->val[j] = 0;
+      _BClambda->val[j] = 0;
+    }
+    if (ctrl.opt_percolation == 2){
+      _percExp->val[j] = 0;
+    }
+    if (ctrl.opt_evap == 1){
+      _froot_coeff->val[j] = 0;
+      _ET_reduction->val[j] = 0;
+    }
+    if (ctrl.opt_init_GW == 1){
+      _init_GW->val[j] = 0;
+    }
+    if (ctrl.opt_routinterf == 1){
+      _pOvf_toChn->val[j] = 0;
+      _Ks_vadose->val[j] = 0;
+      _lat_to_Chn_vadose->val[j] = 0;
+      _interfExp->val[j] = 0;
+    }
+    if (ctrl.opt_routGWf == 1){
+      _Ks_GW->val[j] = 0;
+      _lat_to_Chn_GW->val[j] = 0;
+      _GWfExp->val[j] = 0;
+    }
+    if (ctrl.opt_routQ == 1){
+      _Manningn->val[j] = 0;
+    }
+    if (ctrl.opt_chanE == 1 or ctrl.opt_chanE == 2){
+      _Echan_alpha->val[j] = 0;
+    }
+    if (ctrl.opt_irrigation == 1){
+      _irrigation_coeff->val[j] = 0;
+    }
+    if (ctrl.opt_tracking_isotope == 1){
+      _CG_n_soil->val[j] = 0;
+    }
+    if (ctrl.opt_init_d18o == 1){
+      _delta_d18o_init_GW->val[j] = 0;
+    }
+    if (ctrl.opt_init_no3 == 1){
+      _delta_no3_init_GW->val[j] = 0;
+    }
+    if (ctrl.opt_nitrogen_sim == 1){
+      _denitrification_river->val[j] = 0;
+      _denitrification_soil->val[j] = 0;
+      _degradation_soil->val[j] = 0;
+      _mineralisation_soil->val[j] = 0;
+      _deni_soil_moisture_thres->val[j] = 0;
+    }
+
+    for (int n = param_category->nz_start[j]; n < param_category->nz_start[j+1]; n++) {
+      int k = param_category->nz_category[n];
+      double w = param_category->nz_weight[n];
+      if (depth3[k]!=nodata) _depth3->val[j] += w * depth3[k];
+      if (alpha[k]!=nodata) _alpha->val[j] += w * alpha[k];
+      if (irrigation_FC_thres[k]!=nodata) _irrigation_FC_thres->val[j] += w * irrigation_FC_thres[k];
+      if (perc_vadose_coeff[k]!=nodata) _perc_vadose_coeff->val[j] += w * perc_vadose_coeff[k];
+      if (nearsurface_mixing[k]!=nodata) _nearsurface_mixing->val[j] += w * nearsurface_mixing[k];
+      if (ratio_to_interf[k]!=nodata) _ratio_to_interf->val[j] += w * ratio_to_interf[k];
+      if (ctrl.opt_intecept == 2 or ctrl.opt_evap == 1){
+        if (rE[k]!=nodata) _rE->val[j] += w * rE[k];
+      }
+      if (ctrl.opt_snow == 1){
+        if (snow_rain_thre[k]!=nodata) _snow_rain_thre->val[j] += w * snow_rain_thre[k];
+        if (deg_day_min[k]!=nodata) _deg_day_min->val[j] += w * deg_day_min[k];
+        if (deg_day_max[k]!=nodata) _deg_day_max->val[j] += w * deg_day_max[k];
+        if (deg_day_increase[k]!=nodata) _deg_day_increase->val[j] += w * deg_day_increase[k];
+      }
+      if (ctrl.opt_pedotransf == 1 or ctrl.opt_pedotransf == 2 or ctrl.opt_pedotransf == 3){
+        if (ref_thetaS[k]!=nodata) _ref_thetaS->val[j] += w * ref_thetaS[k];
+        if (PTF_VG_clay[k]!=nodata) _PTF_VG_clay->val[j] += w * PTF_VG_clay[k];
+        if (PTF_VG_Db[k]!=nodata) _PTF_VG_Db->val[j] += w * PTF_VG_Db[k];
+        if (PTF_Ks_const[k]!=nodata) _PTF_Ks_const->val[j] += w * PTF_Ks_const[k];
+        if (PTF_Ks_sand[k]!=nodata) _PTF_Ks_sand->val[j] += w * PTF_Ks_sand[k];
+        if (PTF_Ks_clay[k]!=nodata) _PTF_Ks_clay->val[j] += w * PTF_Ks_clay[k];
+      }
+      if (ctrl.opt_fieldcapacity == 1){
+        if (SWP[k]!=nodata) _SWP->val[j] += w * SWP[k];
+      }
+      if (ctrl.opt_infil == 1 or ctrl.opt_depthprofile == 2){
+        if (KvKh[k]!=nodata) _KvKh->val[j] += w * KvKh[k];
+        if (psiAE[k]!=nodata) _psiAE->val[j] += w * psiAE[k];
+      }
+      if (ctrl.opt_depthprofile == 2){
+        if (KKs[k]!=nodata) _KKs->val[j] += w * KKs[k];
+        if (Ksat[k]!=nodata) _Ksat->val[j] += w * Ksat[k];
+        if (BClambda[k]!=nodata) _BClambda->val[j] += w * BClambda[k];
+      }
+      if (ctrl.opt_percolation == 2){
+        if (percExp[k]!=nodata) _percExp->val[j] += w * percExp[k];
+      }
+      if (ctrl.opt_evap == 1){
+        if (froot_coeff[k]!=nodata) _froot_coeff->val[j] += w * froot_coeff[k];
+        if (ET_reduction[k]!=nodata) _ET_reduction->val[j] += w * ET_reduction[k];
+      }
+      if (ctrl.opt_init_GW == 1){
+        if (init_GW[k]!=nodata) _init_GW->val[j] += w * init_GW[k];
+      }
+      if (ctrl.opt_routinterf == 1){
+        if (pOvf_toChn[k]!=nodata) _pOvf_toChn->val[j] += w * pOvf_toChn[k];
+        if (Ks_vadose[k]!=nodata) _Ks_vadose->val[j] += w * Ks_vadose[k];
+        if (lat_to_Chn_vadose[k]!=nodata) _lat_to_Chn_vadose->val[j] += w * lat_to_Chn_vadose[k];
+        if (interfExp[k]!=nodata) _interfExp->val[j] += w * interfExp[k];
+      }
+      if (ctrl.opt_routGWf == 1){
+        if (Ks_GW[k]!=nodata) _Ks_GW->val[j] += w * Ks_GW[k];
+        if (lat_to_Chn_GW[k]!=nodata) _lat_to_Chn_GW->val[j] += w * lat_to_Chn_GW[k];
+        if (GWfExp[k]!=nodata) _GWfExp->val[j] += w * GWfExp[k];
+      }
+      if (ctrl.opt_routQ == 1){
+        if (Manningn[k]!=nodata) _Manningn->val[j] += w * Manningn[k];
+      }
+      if (ctrl.opt_chanE == 1 or ctrl.opt_chanE == 2){
+        if (Echan_alpha[k]!=nodata) _Echan_alpha->val[j] += w * Echan_alpha[k];
+      }
+      if (ctrl.opt_irrigation == 1){
+        if (irrigation_coeff[k]!=nodata) _irrigation_coeff->val[j] += w * irrigation_coeff[k];
+      }
+      if (ctrl.opt_tracking_isotope == 1){
+        if (CG_n_soil[k]!=nodata) _CG_n_soil->val[j] += w * CG_n_soil[k];
+      }
+      if (ctrl.opt_init_d18o == 1){
+        if (delta_d18o_init_GW[k]!=nodata) _delta_d18o_init_GW->val[j] += w * delta_d18o_init_GW[k];
+      }
+      if (ctrl.opt_init_no3 == 1){
+        if (delta_no3_init_GW[k]!=nodata) _delta_no3_init_GW->val[j] += w * delta_no3_init_GW[k];
+      }
+      if (ctrl.opt_nitrogen_sim == 1){
+        if (denitrification_river[k]!=nodata) _denitrification_river->val[j] += w * denitrification_river[k];
+        if (denitrification_soil[k]!=nodata) _denitrification_soil->val[j] += w * denitrification_soil[k];
+        if (degradation_soil[k]!=nodata) _degradation_soil->val[j] += w * degradation_soil[k];
+        if (mineralisation_soil[k]!=nodata) _mineralisation_soil->val[j] += w * mineralisation_soil[k];
+        if (deni_soil_moisture_thres[k]!=nodata) _deni_soil_moisture_thres->val[j] += w * deni_soil_moisture_thres[k];
+      }
+    }
   }
   /* end of Parameters */
 
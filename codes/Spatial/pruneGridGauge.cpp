@@ -0,0 +1,62 @@
+/***************************************************************
+* Generic Ecohydrological Model (GEM), a spatial-distributed module-based ecohydrological models
+* for multiscale hydrological, isotopic, and water quality simulations
+
+* Copyright (c) 2025   Songjun Wu <songjun.wu@igb-berlin.de / songjun-wu@outlook.com>
+
+  * GEM is a free software under the terms of GNU GEneral Public License version 3,
+  * Resitributon and modification are allowed under proper aknowledgement.
+
+* Contributors: Songjun Wu       Leibniz Institute of Freshwater Ecology and Inland Fisheries (IGB)
+
+* pruneGridGauge.cpp
+  * Created  on: 30.02.2025
+  * Modified on: 19.10.2026
+***************************************************************/
+
+
+#include "Control.h"
+
+int Control::PruneGridGauge(sortedGrid &map2array, svector &gauges){
+  /* Restrict the sorted grid to the cells that drain to at least one gauge (gauges.val > 0).
+     Cells are sorted from upstream to downstream (to_cell[j] > j), so a single backward sweep marks all upstream cells.
+     The relative order of the kept cells is unchanged; the gauges without a kept downstream cell become outlets. */
+
+  int size = map2array.size;
+  int j, to_j;
+  vector<int> keep(size, 0);
+  vector<int> new_id(size, -9999);
+  sortedGrid pruned;
+
+  for (j=size-1; j>=0; j--){
+    if (gauges.val[j] > 0){
+      keep[j] = 1;
+    } else if (map2array.lat_ok[j] == 1){
+      keep[j] = keep[map2array.to_cell[j]];
+    }
+  }
+
+  for (j=0; j<size; j++){
+    if (keep[j] == 1){
+      new_id[j] = int(pruned.row.size());
+      pruned.row.push_back(map2array.row[j]);
+      pruned.col.push_back(map2array.col[j]);
+    }
+  }
+  pruned.size = int(pruned.row.size());
+  if (pruned.size == 0){
+    throw runtime_error("no gauge found for the pruning of the grid    :" + path_BasinFolder + fn__Gauge_to_Report);
+  }
+
+  for (j=0; j<size; j++){
+    if (keep[j] == 1){
+      to_j = map2array.lat_ok[j] == 1 ? new_id[map2array.to_cell[j]] : -9999;
+      pruned.to_cell.push_back(to_j);
+      pruned.lat_ok.push_back(to_j >= 0 ? 1 : 0);
+    }
+  }
+
+  map2array = pruned;
+
+  return EXIT_SUCCESS;
+}
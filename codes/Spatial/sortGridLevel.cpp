@@ -0,0 +1,72 @@
+/***************************************************************
+* Generic Ecohydrological Model (GEM), a spatial-distributed module-based ecohydrological models
+* for multiscale hydrological, isotopic, and water quality simulations
+
+* Copyright (c) 2025   Songjun Wu <songjun.wu@igb-berlin.de / songjun-wu@outlook.com>
+
+  * GEM is a free software under the terms of GNU GEneral Public License version 3,
+  * Resitributon and modification are allowed under proper aknowledgement.
+
+* Contributors: Songjun Wu       Leibniz Institute of Freshwater Ecology and Inland Fisheries (IGB)
+
+* sortGridLevel.cpp
+  * Created  on: 30.02.2025
+  * Modified on: 19.10.2026
+***************************************************************/
+
+
+#include "Control.h"
+
+int Control::SortGridLevel(sortedGrid &map2array){
+  /* Group the sorted cells by topological level and collect the upstream cells of each cell.
+     Cells are sorted from upstream to downstream, so to_cell[j] > j and a single sweep is sufficient.
+     Cells within the same level never drain into each other and can be routed concurrently. */
+
+  int size = map2array.size;
+  int j, k, to_j;
+
+  // Longest upstream path of each cell
+  map2array.level.assign(size, 0);
+  map2array.n_level = size > 0 ? 1 : 0;
+  for (j=0; j<size; j++){
+    if (map2array.lat_ok[j] == 1){
+      to_j = map2array.to_cell[j];
+      map2array.level[to_j] = max(map2array.level[to_j], map2array.level[j] + 1);
+      map2array.n_level = max(map2array.n_level, map2array.level[to_j] + 1);
+    }
+  }
+
+  // Cells of each level (counting sort keeps the ascending order within each level)
+  map2array.level_start.assign(map2array.n_level + 1, 0);
+  for (j=0; j<size; j++){
+    map2array.level_start[map2array.level[j] + 1]++;
+  }
+  for (k=0; k<map2array.n_level; k++){
+    map2array.level_start[k+1] += map2array.level_start[k];
+  }
+  vector<int> counter(map2array.level_start.begin(), map2array.level_start.end() - 1);
+  map2array.level_cell.assign(size, 0);
+  for (j=0; j<size; j++){
+    map2array.level_cell[counter[map2array.level[j]]++] = j;
+  }
+
+  // Upstream cells of each cell (ascending order to keep the summation order of the serial sweep)
+  map2array.from_start.assign(size + 1, 0);
+  for (j=0; j<size; j++){
+    if (map2array.lat_ok[j] == 1){
+      map2array.from_start[map2array.to_cell[j] + 1]++;
+    }
+  }
+  for (j=0; j<size; j++){
+    map2array.from_start[j+1] += map2array.from_start[j];
+  }
+  counter.assign(map2array.from_start.begin(), map2array.from_start.end() - 1);
+  map2array.from_cell.assign(map2array.from_start[size], 0);
+  for (j=0; j<size; j++){
+    if (map2array.lat_ok[j] == 1){
+      map2array.from_cell[counter[map2array.to_cell[j]]++] = j;
+    }
+  }
+
+  return EXIT_SUCCESS;
+}
@@ -17,7 +17,8 @@
 
 #include "Basin.h"
 
-int Basin::Fractionation(Atmosphere &atm, Param &par, svector &sv_evap, svector &sv_V_new, svector &sv_di_old, svector &sv_di_new, svector &sv_di_evap, int issoil){
+template<typename T>
+int Basin::Fractionation(Atmosphere &atm, Param &par, svector &sv_evap, svector &sv_V_new, svector_t<T> &sv_di_old, svector_t<T> &sv_di_new, svector &sv_di_evap, int issoil){
 
     double Ta, Ts, ha, hs, ha_p, ea_s, es_s, alpha_p, eps, eps_p, eps_k, m, n, f;
     double di_atm, di_s, di_new, di_evap, di_old; // Isotopic signitures
@@ -117,3 +118,5 @@ int Basin::Fractionation(Atmosphere &atm, Param &par, svector &sv_evap, svector
 }
       
 
+template int Basin::Fractionation<double>(Atmosphere &atm, Param &par, svector &sv_evap, svector &sv_V_new, svector_t<double> &sv_di_old, svector_t<double> &sv_di_new, svector &sv_di_evap, int issoil);
+template int Basin::Fractionation<float>(Atmosphere &atm, Param &par, svector &sv_evap, svector &sv_V_new, svector_t<float> &sv_di_old, svector_t<float> &sv_di_new, svector &sv_di_evap, int issoil);
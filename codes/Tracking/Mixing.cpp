@@ -17,7 +17,8 @@
 
 #include "Basin.h"
 
-int Basin::Mixing_full(double storage, double &cstorage, double input, double cinput){
+template<typename T>
+int Basin::Mixing_full(double storage, T &cstorage, double input, double cinput){
 
     if (input > roundoffERR){ // if there is inflow
         cstorage = (storage * cstorage + input * cinput) / (storage + input);
@@ -31,7 +32,8 @@ int Basin::Mixing_full(double storage, double &cstorage, double input, double ci
 }
 
 
-int Basin::Mixing_baseflow(double storage, double &coutput, double input, double cinput, double output){
+template<typename T>
+int Basin::Mixing_baseflow(double storage, T &coutput, double input, double cinput, double output){
 
     // Baseflow mixing equation from INCA model and mhM-nitrate model
 
@@ -53,4 +55,8 @@ int Basin::Mixing_baseflow(double storage, double &coutput, double input, double
     return EXIT_SUCCESS;
 }
 
-
+// Concentrations are kept in double (e.g., nitrogen) or in low precision (isotopes and ages)
+template int Basin::Mixing_full<double>(double storage, double &cstorage, double input, double cinput);
+template int Basin::Mixing_full<float>(double storage, float &cstorage, double input, double cinput);
+template int Basin::Mixing_baseflow<double>(double storage, double &coutput, double input, double cinput, double output);
+template int Basin::Mixing_baseflow<float>(double storage, float &coutput, double input, double cinput, double output);
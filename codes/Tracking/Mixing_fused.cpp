@@ -0,0 +1,143 @@
+/***************************************************************
+* Generic Ecohydrological Model (GEM), a spatial-distributed module-based ecohydrological models
+* for multiscale hydrological, isotopic, and water quality simulations
+
+* Copyright (c) 2025   Songjun Wu <songjun.wu@igb-berlin.de / songjun-wu@outlook.com>
+
+  * GEM is a free software under the terms of GNU GEneral Public License version 3,
+  * Resitributon and modification are allowed under proper aknowledgement.
+
+* Contributors: Songjun Wu       Leibniz Institute of Freshwater Ecology and Inland Fisheries (IGB)
+
+* Mixing_fused.cpp
+  * Created  on: 30.02.2025
+  * Modified on: 19.10.2026
+***************************************************************/
+
+
+#include "Basin.h"
+
+/*
+Fused solute mixing (opt_fused_tracking = 1)
+d18o, age and no3 of a storage are mixed in one pass over the cells, so that the water storages and fluxes are loaded once.
+Same equations and order as Mixing_*_tracking and Solve_*_nitrogen.
+*/
+
+int Basin::Mixing_canopy_fused(Control &ctrl, Atmosphere &atm){
+
+    int iso = ctrl.opt_tracking_isotope;
+    int age = ctrl.opt_tracking_age;
+    int nit = ctrl.opt_nitrogen_sim;
+
+    #pragma omp parallel for
+    for (int j = 0; j < _sortedGrid.size; j++) {
+        double I_old = _I_old->val[j];
+        double P = atm._P->val[j];
+
+        // Mixing canopy storage with precipitation input; ponding water is aligned with throughfall
+        if (iso == 1){
+            Mixing_full(I_old, _d18o_I->val[j], P, atm._d18o_P->val[j]);
+            _d18o_pond->val[j] = _d18o_I->val[j];
+        }
+        if (age == 1){
+            Mixing_full(I_old, _age_I->val[j], P, 0.0);
+            _age_pond->val[j] = _age_I->val[j];
+        }
+        if (nit == 1){
+            Mixing_full(I_old, _no3_I->val[j], P, _no3_rain->val[j]);
+            _no3_pond->val[j] = _no3_I->val[j];
+        }
+    }
+
+    return EXIT_SUCCESS;
+}
+
+
+int Basin::Mixing_surface_fused(Control &ctrl, Atmosphere &atm, Param &par){
+
+    int iso = ctrl.opt_tracking_isotope;
+    int age = ctrl.opt_tracking_age;
+    int nit = ctrl.opt_nitrogen_sim;
+
+    #pragma omp parallel for
+    for (int j = 0; j < _sortedGrid.size; j++) {
+        double snow_old = _snow_old->val[j];
+        double snowacc = _snowacc->val[j];
+        double Th = _Th->val[j];
+        double snowmelt = _snowmelt->val[j];
+        double pond = _pond->val[j];
+        double irrigation_from_river = _irrigation_from_river->val[j];
+        double irrigation_from_GW = _irrigation_from_GW->val[j];
+        double irrigation_amount = irrigation_from_river + irrigation_from_GW;
+        bool is_snow = atm._Ta->val[j] < par._snow_rain_thre->val[j];
+
+        // Mixing snow with throughfall if temperature is below snow rain threshold, else throughfall mixes with snow melt
+        if (iso == 1){
+            if (is_snow){
+                Mixing_full(snow_old, _d18o_snow->val[j], snowacc, _d18o_pond->val[j]);
+            } else{
+                Mixing_full(Th, _d18o_pond->val[j], snowmelt, _d18o_snow->val[j]);
+            }
+            if (irrigation_amount > roundoffERR){
+                Mixing_full(pond, _d18o_pond->val[j], irrigation_amount, (irrigation_from_river * _d18o_chanS->val[j] + irrigation_from_GW * _d18o_GW->val[j]) / irrigation_amount);
+            }
+        }
+        if (age == 1){
+            if (is_snow){
+                Mixing_full(snow_old, _age_snow->val[j], snowacc, _age_pond->val[j]);
+            } else{
+                Mixing_full(Th, _age_pond->val[j], snowmelt, _age_snow->val[j]);
+            }
+            if (irrigation_amount > roundoffERR){
+                Mixing_full(pond, _age_pond->val[j], irrigation_amount, (irrigation_from_river * _age_chanS->val[j] + irrigation_from_GW * _age_GW->val[j]) / irrigation_amount);
+            }
+        }
+        if (nit == 1){
+            if (is_snow){
+                Mixing_full(snow_old, _no3_snow->val[j], snowacc, _no3_pond->val[j]);
+            } else{
+                _no3_pond->val[j] = _no3_I->val[j];
+                Mixing_full(Th, _no3_pond->val[j], snowmelt, _no3_snow->val[j]);
+            }
+            if (irrigation_amount > roundoffERR){
+                Mixing_full(pond, _no3_pond->val[j], irrigation_amount, (irrigation_from_river * _no3_chanS->val[j] + irrigation_from_GW * _no3_GW->val[j]) / irrigation_amount);
+            }
+        }
+    }
+
+    return EXIT_SUCCESS;
+}
+
+
+int Basin::Mixing_vadose_GW_fused(Control &ctrl, Atmosphere &atm){
+    // Called after the soil profile mixing of all solutes, as the percolation from layer 3 carries the updated layer 3 concentrations
+
+    int iso = ctrl.opt_tracking_isotope;
+    int age = ctrl.opt_tracking_age;
+    int nit = ctrl.opt_nitrogen_sim;
+    int GW_mixing = ctrl.opt_baseflow_mixing == 0;
+
+    #pragma omp parallel for
+    for (int j = 0; j < _sortedGrid.size; j++) {
+        double vadose_old = _vadose_old->val[j];
+        double Perc3 = _Perc3->val[j];
+        double GW_old = _GW_old->val[j];
+        double Perc_vadose = _Perc_vadose->val[j];
+
+        // Mixing vadose storage with percolation from layer 3, then GW storage with percolation from vadose zone
+        if (iso == 1){
+            Mixing_full(vadose_old, _d18o_vadose->val[j], Perc3, _d18o_layer3->val[j]);
+            if (GW_mixing) Mixing_full(GW_old, _d18o_GW->val[j], Perc_vadose, _d18o_vadose->val[j]);
+        }
+        if (age == 1){
+            Mixing_full(vadose_old, _age_vadose->val[j], Perc3, _age_layer3->val[j]);
+            if (GW_mixing) Mixing_full(GW_old, _age_GW->val[j], Perc_vadose, _age_vadose->val[j]);
+        }
+        if (nit == 1){
+            Mixing_full(vadose_old, _no3_vadose->val[j], Perc3, _no3_layer3->val[j]);
+            if (GW_mixing) Mixing_full(GW_old, _no3_GW->val[j], Perc_vadose, _no3_vadose->val[j]);
+        }
+    }
+
+    return EXIT_SUCCESS;
+}
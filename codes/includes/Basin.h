@@ -38,6 +38,10 @@ class Basin {
   /* end of Properties */
 
   public:
+  state_arena *_states;  // 64-byte aligned block backing all Storages, Tracking and Nitrogen svectors
+  vector<svector_lp*> _states_lp;  // Low-precision state svectors outside the arena, in construction order
+  vector<svector*> _states_flux;  // Fluxes carried over to the next time step (_Q, _TchanS, and PET with canopy evaporation), in construction order
+
   /* GIS */
   svector *_chnwidth;  // Channel width [m]
   svector *_chndepth;  // Channel depth [m]
@@ -147,6 +151,7 @@ class Basin {
   svector *_p_perc1;  // Percolation proportion in layer 1
   svector *_p_perc2;  // Percolation proportion in layer 2
   svector *_p_perc3;  // Percolation proportion in layer 3
+  svector *_a_routQ;  // Kinematic Wave coefficient of each reach, pow(pow(chnwidth,0.67)*Manningn/sqrt(slope), 0.6) [-]
   svector *_flux_ovf_in_acc;  // Total amount of solutes in overland inflow [original unit * m]
   svector *_flux_interf_in_acc;  // Total amount of solutes in inter-inflow [original unit * m]
   svector *_flux_GWf_in_acc;  // Total amount of solutes in GW inflow [original unit * m]
@@ -155,24 +160,24 @@ class Basin {
 
 
   /* Tracking */
-  svector *_d18o_I;  // d18o in Canopy storage [‰]
-  svector *_d18o_snow;  // d18o in Snow depth in [‰]
-  svector *_d18o_pond;  // d18o in Ponding water in [‰]
-  svector *_d18o_layer1;  // d18o in Soil moisture in layer 1 [‰]
-  svector *_d18o_layer2;  // d18o in Soil moisture in layer 2 [‰]
-  svector *_d18o_layer3;  // d18o in Soil moisture in layer 3 [‰]
-  svector *_d18o_vadose;  // d18o in vadose storage [‰]
-  svector *_d18o_GW;  // d18o in Groundwater storage [‰]
-  svector *_d18o_chanS;  // d18o in Channel storage [‰]
-  svector *_age_vadose;  // Age in vadose storage [‰]
-  svector *_age_I;  // Age in Canopy storage [days]
-  svector *_age_snow;  // Age in Snow depth in [days]
-  svector *_age_pond;  // Age in Ponding water in [days]
-  svector *_age_layer1;  // Age in Soil moisture in layer 1 [days]
-  svector *_age_layer2;  // Age in Soil moisture in layer 2 [days]
-  svector *_age_layer3;  // Age in Soil moisture in layer 3 [days]
-  svector *_age_GW;  // Age in Groundwater storage [days]
-  svector *_age_chanS;  // Age in Channel storage [days]
+  svector_lp *_d18o_I;  // d18o in Canopy storage [‰]
+  svector_lp *_d18o_snow;  // d18o in Snow depth in [‰]
+  svector_lp *_d18o_pond;  // d18o in Ponding water in [‰]
+  svector_lp *_d18o_layer1;  // d18o in Soil moisture in layer 1 [‰]
+  svector_lp *_d18o_layer2;  // d18o in Soil moisture in layer 2 [‰]
+  svector_lp *_d18o_layer3;  // d18o in Soil moisture in layer 3 [‰]
+  svector_lp *_d18o_vadose;  // d18o in vadose storage [‰]
+  svector_lp *_d18o_GW;  // d18o in Groundwater storage [‰]
+  svector_lp *_d18o_chanS;  // d18o in Channel storage [‰]
+  svector_lp *_age_vadose;  // Age in vadose storage [‰]
+  svector_lp *_age_I;  // Age in Canopy storage [days]
+  svector_lp *_age_snow;  // Age in Snow depth in [days]
+  svector_lp *_age_pond;  // Age in Ponding water in [days]
+  svector_lp *_age_layer1;  // Age in Soil moisture in layer 1 [days]
+  svector_lp *_age_layer2;  // Age in Soil moisture in layer 2 [days]
+  svector_lp *_age_layer3;  // Age in Soil moisture in layer 3 [days]
+  svector_lp *_age_GW;  // Age in Groundwater storage [days]
+  svector_lp *_age_chanS;  // Age in Channel storage [days]
   /* end of Tracking */
 
   // Nitrogen addition and plant uptakes are identical for each year, so they only need to be sorted once (or once after change in parameterisation)
@@ -264,6 +269,8 @@ class Basin {
   // Init
   int Initialisation(Control &ctrl, Param &par, Atmosphere &atm);
   int Store_states();  // Store all water storages for mixing
+  int Pair_states(Control &ctrl);  // Check if the storages and their _old twins are two contiguous blocks of the state arena
+  size_t _states_pair_length;  // Length of the contiguous block copied by Store_states [doubles]; 0 if copied field by field
 
   // Open and read ground inputs such as LAI
   int open_groundTs(Control &ctrl);
@@ -322,22 +329,30 @@ class Basin {
   int Routing_ovf_1(Control &ctrl, Param &par); // overland flow routing; All ponding water goes to next cell
   int Routing_interflow_1(Control &ctrl, Param &par); // Interflow routing based on linear approximation of Kinematic Wave
   int Routing_Q_1(Control &ctrl, Param &par); // Stream routing based on Kinematic Wave
+  double Kinematic_wave(double a, double dtdx, double Qupstream, double C); // Newton-Raphson solver of the Kinematic Wave for one channel cell
   int Routing_GWflow_1(Control &ctrl, Param &par); // GW flow routing based on linear approximation of Kinematic Wave
+  int Routing_ovf_1_cell(Control &ctrl, Param &par, int j); // overland flow routing of a single cell
+  int Routing_interflow_1_cell(Control &ctrl, Param &par, int j); // Interflow routing of a single cell
+  int Routing_GWflow_1_cell(Control &ctrl, Param &par, int j); // GW flow routing of a single cell
+  double Gather_upstream(const svector &sv_out, int j); // Sum of the outflows of all upstream cells of cell j
 
   /* Energy balance */
   double Get_soil_temperature(const double Ta, const double LAI);
 
   /* Isotopic and Age tracking */
-  int Mixing_full(double storage, double &cstorage, double input, double cinput);  // Full mixing within the timestep
-  int Mixing_baseflow(double storage, double &coutput, double input, double cinput, double output);   // Baseflow mixing for GW storage
+  template<typename T> int Mixing_full(double storage, T &cstorage, double input, double cinput);  // Full mixing within the timestep
+  template<typename T> int Mixing_baseflow(double storage, T &coutput, double input, double cinput, double output);   // Baseflow mixing for GW storage
   int Mixing_canopy_tracking(Control &ctrl, Atmosphere &atm);  // Canopy storage mixing and fractionaton
   int Mixing_surface_tracking(Control &ctrl, Atmosphere &atm, Param &par);  // Canopy snowpack and throughfall
   int Mixing_soil_profile_tracking(Control &ctrl, Atmosphere &atm, Param &par);  // Soil storage mixing and fractionaton
   int Mixing_vadose_tracking(Control &ctrl, Atmosphere &atm);  // Vadose storage mixing
   int Mixing_GW_tracking(Control &ctrl, Atmosphere &atm);  // GW storage mixing
+  int Mixing_canopy_fused(Control &ctrl, Atmosphere &atm);  // Canopy mixing of d18o, age and no3 in one pass
+  int Mixing_surface_fused(Control &ctrl, Atmosphere &atm, Param &par);  // Snow and ponding water mixing of d18o, age and no3 in one pass
+  int Mixing_vadose_GW_fused(Control &ctrl, Atmosphere &atm);  // Vadose and GW storage mixing of d18o, age and no3 in one pass
   int Mixing_routing_tracking(Control &ctrl, Param &par);  // Mixing of overland flow, interflow, and GW flow
   int Mixing_channel_tracking(Control &ctrl, Atmosphere &atm, Param &par);  // Fractionation due to channel evaporation
-  int Fractionation(Atmosphere &atm, Param &par, svector &sv_evap, svector &sv_V_new, svector &sv_di_old, svector &sv_di_new, svector &sv_di_evap, int issoil);  // Fractionation due to canopy or soil evaporation
+  template<typename T> int Fractionation(Atmosphere &atm, Param &par, svector &sv_evap, svector &sv_V_new, svector_t<T> &sv_di_old, svector_t<T> &sv_di_new, svector &sv_di_evap, int issoil);  // Fractionation due to canopy or soil evaporation
   int Advance_age(); // Advance water ages by 1
 
 
@@ -368,6 +383,7 @@ class Basin {
 
   /* Functions */
   int Sort_percolation_travel_time(Control &ctrl, Param &par);
+  int Sort_routing_coefficient(Control &ctrl, Param &par);  // Kinematic Wave coefficient of each reach
   int Sort_root_fraction(Control &ctrl,Param &par);  // Estimate root fraction
   double Temp_factor(const double T);  // Temperature factor of nitrogen transformation
   double Moist_factor(const double db_theta, const double db_thetaWP, const double db_thetaS, const double db_depth); // Moisture factor of nitrogen transformation
@@ -378,6 +394,8 @@ class Basin {
   /* Save TS output to speed up calibration; Temporary implementation */
   int Report_for_cali(Control &ctrl);
   int Save_for_cali(Control &ctrl);
+  int Save_checkpoint(Control &ctrl);  // Dump all state svectors to ctrl.fn_checkpoint
+  int Load_checkpoint(Control &ctrl);  // Restore all state svectors from ctrl.fn_checkpoint
   bool save_vector_to_binary(const std::vector<double>& vec, const std::string& filename);
 
 };
@@ -48,7 +48,10 @@ struct Control{
   int Ground_input_tstep;
   int Report_interval;
   int Update_interval;
+  int Report_buffer;  // Number of report records buffered per output file before one write
   int num_category;  // Number of categories for parameterisation
+  int Checkpoint_time;  // Time of the checkpoint in seconds since Simul_start (opt_checkpoint = 1 or 2)
+  string fn_checkpoint;  // Checkpoint file to be written (opt_checkpoint = 1) or restored (opt_checkpoint = 2)
   /* end of Settings */
 
   /* Year month day */
@@ -161,6 +164,39 @@ struct Control{
   // 1: A raster map showing the potential fertilization amount in g/m2
   // 2: Specificed for each vegetation type in Crop_info.ini
   int opt_fert_input;
+  // Lateral routing schedule
+  // 0: serial sweep over the sorted grid
+  // 1: level-scheduled sweep; cells within the same topological level are routed in parallel
+  int opt_parallel_routing;
+  // Land use (category_*.bin) input
+  // 0: stream each epoch from the open category files at every land use update
+  // 1: load all epochs into memory once (faster for multi-epoch scenarios if the maps fit in RAM)
+  int opt_landuse_preload;
+  // The layout of map reports (*_map.bin)
+  // 0: full raster (rowNum * colNum values per map, nodata outside the catchment)
+  // 1: compact; only the active cells (in the order of map_index.bin) are written per map
+  int opt_report_map_format;
+  // Model state checkpoint (states of all storages, tracking and nitrogen pools at Checkpoint_time)
+  // 0: disabled
+  // 1: save a checkpoint to Checkpoint_file
+  // 2: warm start; restore the states from Checkpoint_file at Checkpoint_time (the simulation before Checkpoint_time is skipped, only inputs are advanced)
+  int opt_checkpoint;
+  // Report profile
+  // 0: full; time series and maps as flagged by the report_* keys, plus the gauge series for calibration
+  // 1: calibration; only the gauge series (discharge, d18o and no3 in channel) are collected, no report files or map accumulation
+  int opt_report_profile;
+  // Simulated domain
+  // 0: all cells of the catchment grid
+  // 1: only the cells upstream of the gauges in Gauge_to_Report (the cells that do not drain to any gauge are not simulated)
+  int opt_gauge_pruning;
+  // Sub-stepping of the channel routing (only when opt_routQ = 1)
+  // 0: one Kinematic Wave solution per time step
+  // 1: adaptive; each reach is solved in sub-steps so that its Courant number stays below 1 (at most 100 sub-steps)
+  int opt_routQ_substep;
+  // Solute mixing of the canopy, surface, vadose and GW storages
+  // 0: one pass over the cells per solute (d18o, age, no3)
+  // 1: fused; all enabled solutes of a storage are mixed in one pass over the cells
+  int opt_fused_tracking;
   /* end of Options */
 
 
@@ -410,6 +446,8 @@ struct Control{
   sortedGrid _sortedGrid;
   sortedTSmask _Tsmask;  // Gauges that require outputs
   sortedGrid SortGridLDD();
+  int SortGridLevel(sortedGrid &map2array);
+  int PruneGridGauge(sortedGrid &map2array, svector &gauges);
   sortedTSmask sortTSmask();
   /* end of Grids sorting*/
 
@@ -43,6 +43,7 @@ class Param {
   int sort_root_fraction_OK;  
   int sort_plant_uptake_OK;  // The plant uptake only needs to be calculated once (or once within each change)
   int sort_nitrogen_addition_OK;  // The nitrogen addtion only needs to be calculated once (or once within each change)
+  int sort_routQ_coeff_OK;  // The Kinematic Wave coefficients only need to be calculated once (or once within each change)
 
   /* Parameters */
   vector<double> depth3;
@@ -148,6 +149,7 @@ class Param {
   // Functions
   int ReadParamFile(Control &ctrl, string fname = "param.ini");  // Read parameters into array
   int Parameterisation(Control &ctrl); // Assign parameter values to each grid
+  int Assign_parameters(Control &ctrl); // Assign parameter values to each grid without re-reading the category maps
 
   void readIntoParam(vector<double>& param_arr, string key, vector<string> lines);
 
@@ -20,6 +20,7 @@
 #include <iostream>
 #include <fstream>
 #include <vector>
+#include <map>
 
 using namespace std;
 
@@ -29,6 +30,9 @@ class Report {
     int _rowNum, _colNum;
     double _dx, _nodata;
     int advance_report;
+    int report_buffer;  // Number of records buffered per report file before writing
+    vector<double> map_template;  // Map filled with nodata (rowNum * colNum), sized once
+    map<ofstream*, vector<double>> buffered;  // Records waiting to be written, per report file
     /* end of Properties */
 
     public:
@@ -209,7 +213,11 @@ class Report {
     
     
     int report_create(string fname, ofstream &ofHandle);
-    int reportTS(Control &ctrl, const svector *input, ofstream &ofHandle);
+    template<typename T> int reportTS(Control &ctrl, const svector_t<T> *input, ofstream &ofHandle);
     int reportMap(Control &ctrl, const svector *input, sortedGrid _sortedGrid, ofstream &ofHandle);
+    int report_write(ofstream &ofHandle, vector<double> &outdata, int length);  // Write the buffered records once report_buffer records are collected
+    int report_flush();  // Write all buffered records
+    int report_map_index(Control &ctrl);  // Write map_index.bin for compact map reports
+    int report_info(Control &ctrl);  // Write report_info.txt describing the record layout of the reports
 
 };
\ No newline at end of file
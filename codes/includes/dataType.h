@@ -20,6 +20,7 @@
 #include <iostream>
 #include <fstream>
 #include <vector>
+#include <cstdlib>
 using namespace std;
 
 
@@ -44,6 +45,12 @@ struct sortedGrid{
     vector<int> col;  // col ID
     vector<int> to_cell;  // vector ID of downstream cell
     vector<int> lat_ok;  // 1: there is a downstream cell; 0: outlet
+    int n_level;  // Number of topological levels
+    vector<int> level;  // Topological level of each cell (longest path from the upstream-most cell)
+    vector<int> level_start;  // Offset of each level in level_cell (size = n_level + 1)
+    vector<int> level_cell;  // vector IDs of cells grouped by level
+    vector<int> from_start;  // Offset of the upstream cells of each cell in from_cell (size = size + 1)
+    vector<int> from_cell;  // vector IDs of upstream cells, in ascending order
 };
 
 struct sortedTSmask{
@@ -51,23 +58,89 @@ struct sortedTSmask{
 };
 
 
-struct svector{
+template<typename T>
+struct svector_t{
     int size;
-    double *val;
+    T *val;
+    bool owner;  // false if val is a field of a state_arena
     //ctor from raster ascii file
-    svector(string fname, int rowNum, int colNum, sortedGrid _sortedGrid);
-    svector(int length);
+    svector_t(string fname, int rowNum, int colNum, sortedGrid _sortedGrid);
+    svector_t(int length);
+    //ctor as a view into an external buffer (e.g. state_arena::next())
+    svector_t(string fname, int rowNum, int colNum, sortedGrid _sortedGrid, T *buffer);
+    svector_t(int length, T *buffer);
     //dtor
-    ~svector();
+    ~svector_t();
 
     int reset();
-    int equals(svector &sv);
-    int plus(svector &sv);
-    int minus(svector &sv);
-    int multiply(svector &sv);
+    template<typename U> int equals(const svector_t<U> &sv);
+    template<typename U> int plus(const svector_t<U> &sv);
+    template<typename U> int minus(const svector_t<U> &sv);
+    template<typename U> int multiply(const svector_t<U> &sv);
     int higherthan(double max);
 };
 
+// Precision policy: svector for mass-balance storages, fluxes and accumulators;
+// svector_lp for the variables listed in low_precision (develop.py), e.g. isotope and age tracking.
+// Build with -DGEM_FULL_PRECISION to keep all variables in double.
+#ifdef GEM_FULL_PRECISION
+typedef double real_lp;
+#else
+typedef float real_lp;
+#endif
+typedef svector_t<double> svector;
+typedef svector_t<real_lp> svector_lp;
+
+template<typename T> template<typename U>
+int svector_t<T>::equals(const svector_t<U> &sv){
+  for (int j=0; j<size; j++){
+      val[j] = sv.val[j];
+  }
+  return EXIT_SUCCESS;
+}
+
+template<typename T> template<typename U>
+int svector_t<T>::plus(const svector_t<U> &sv){
+  for (int j=0; j<size; j++){
+      val[j] += sv.val[j];
+  }
+  return EXIT_SUCCESS;
+}
+
+template<typename T> template<typename U>
+int svector_t<T>::minus(const svector_t<U> &sv){
+  for (int j=0; j<size; j++){
+      val[j] -= sv.val[j];
+  }
+  return EXIT_SUCCESS;
+}
+
+template<typename T> template<typename U>
+int svector_t<T>::multiply(const svector_t<U> &sv){
+  for (int j=0; j<size; j++){
+      val[j] *= sv.val[j];
+  }
+  return EXIT_SUCCESS;
+}
+
+struct state_arena{
+    int size;  // Number of cells
+    int stride;  // Padded length of each field, a multiple of 8 doubles (64 bytes)
+    int n_field;  // Number of fields
+    int n_used;  // Number of fields handed out by next()
+    double *data;  // 64-byte aligned block of n_field * stride doubles
+    //ctor
+    state_arena(int num_field, int length);
+    //dtor
+    ~state_arena();
+
+    double *next();  // Hand out the next (aligned) field
+    size_t bytes();  // Size of the whole block [bytes]
+    int reset();
+    int snapshot(double *buffer);  // Copy the whole block into buffer (bytes() long)
+    int restore(const double *buffer);  // Copy buffer back into the whole block
+};
+
 struct svector_2d{
     int parameterisation_OK; // = 0 for a fresh update for each parameterisation
     int sort_PTF; // = 0 for a fresh update for each parameterisation
@@ -75,11 +148,21 @@ struct svector_2d{
     int parameterisation_count; // How many times of parametersation have been done?
     int n_category, size;
     double **val;
+    vector<int> nz_start;  // Offset of the non-zero categories of each cell in nz_category (size = size + 1)
+    vector<int> nz_category;  // Category IDs with non-zero fraction, in ascending order within each cell
+    vector<double> nz_weight;  // The corresponding category fractions [decimal]
+    int preload;  // 1: all land use epochs are kept in memory; 0: epochs are streamed from the open files
+    int n_epoch;  // Number of preloaded land use epochs
+    vector<ifstream> if_category;  // Open category_<k>.bin files, read sequentially (one epoch per update)
+    double *buffer;  // Reusable buffer for one map (rowNum * colNum)
+    vector<vector<double>> preloaded;  // Fractions of all epochs, [k][epoch * size + j]
     //ctor from raster ascii file
     svector_2d(int num_category, sortedGrid _sortedGrid);
     //dtor
     ~svector_2d();
-    int update(string fname, int num_category, int rowNum, int colNum, sortedGrid _sortedGrid);
+    int open(string fname, int num_category, int rowNum, int colNum, sortedGrid _sortedGrid, int opt_preload);
+    int update(string fname, int num_category, int rowNum, int colNum, sortedGrid _sortedGrid, int opt_preload);
+    int sparsify();  // Collect the non-zero (category, fraction) pairs of each cell
 };
 
 #endif /* dataType_H_ */
\ No newline at end of file
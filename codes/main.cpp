@@ -44,17 +44,23 @@ int main(){
   oReport = new Report(*oControl);
   
   oBasin->Initialisation(*oControl, *oParam, *oAtmosphere);
-  oReport->Report_Initialisation(*oControl);  // To be re-enabled
+  // Record layout of the reports, so that the outputs can be read (and packed) without the model setup; also written in the calibration profile
+  oReport->report_info(*oControl);
+  if (oControl->opt_report_profile == 0) oReport->Report_Initialisation(*oControl);  // No report files in the calibration profile
   
   auto stop1 = std::chrono::high_resolution_clock::now();
 
   while (oControl->current_ts < oControl->Simul_end){
 
     oControl->Get_year_month_day();
-    oBasin->Solve_timesteps(*oControl, *oParam, *oAtmosphere);
+    // Warm start: the period before Checkpoint_time is not simulated, only the inputs are advanced
+    // (the reports of this period are kept as placeholders so that the output length is unchanged)
+    if (oControl->opt_checkpoint != 2 or oControl->current_ts >= oControl->Checkpoint_time){
+      oBasin->Solve_timesteps(*oControl, *oParam, *oAtmosphere);
+    }
     
     // report outputs
-    oReport->Report_all(*oControl, *oBasin);  // To be re-enabled
+    if (oControl->opt_report_profile == 0) oReport->Report_all(*oControl, *oBasin);
 
     // Temporary for faster calibration; todo
     oBasin->Report_for_cali(*oControl);  // to be disabled
@@ -102,6 +108,15 @@ int main(){
       oParam->Parameterisation(*oControl); // Parameterisation
       advance_landuse = 0;
   }
+
+    // Model state checkpoint
+    if (oControl->current_ts == oControl->Checkpoint_time){
+      if (oControl->opt_checkpoint == 1){
+        oBasin->Save_checkpoint(*oControl);
+      } else if (oControl->opt_checkpoint == 2){
+        oBasin->Load_checkpoint(*oControl);
+      }
+    }
   }
 
   // Temporary for faster calibration; todo
@@ -112,7 +127,7 @@ int main(){
   //oBasin->dtor(*oControl);
   //oParam->dtor(*oControl);
   //oControl->dtor();
-  oReport->dtor(*oControl); // To be re-enabled
+  if (oControl->opt_report_profile == 0) oReport->dtor(*oControl);
   
   auto stop2  = std::chrono::high_resolution_clock::now();
 
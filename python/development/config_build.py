@@ -121,7 +121,10 @@ def gen_config_template(path, options, signs, datas, reports, parameters, max_ca
     text.append('Clim_input_tstep = 86400 # seconds (daily)\n')
     text.append('Ground_input_tstep = 604800 # seconds (every 7 days)\n')
     text.append('Report_interval = -3 # The interval of map reports in seconds; or daily (-1), monthly (-2), or annually (-3) \n')
-    text.append('Update_interval = 315619200  # seconds (every 10 years); the interval for land use / soil type update \n\n')
+    text.append('Update_interval = 315619200  # seconds (every 10 years); the interval for land use / soil type update \n')
+    text.append('Report_buffer = 1 # Number of report records (time steps or maps) buffered per output file before one write; 1: write every record \n')
+    text.append('Checkpoint_time = 63158400 # seconds since Simul_start (731 days); the time of the model state checkpoint (opt_checkpoint = 1 or 2)\n')
+    text.append('Checkpoint_file = ./checkpoint.bin # model state checkpoint to be written (opt_checkpoint = 1) or restored (opt_checkpoint = 2)\n\n')
 
     text.append('# Options \n')
     opt_list = []
@@ -186,4 +186,63 @@ class Opt:
     cond['fert_input_1']   = {'key':'opt_fert_input', 'value':1, 
                         'general_description':'The format of fertilization inputs\n# 1: A raster map showing the potential fertilization amount in g/m2\n# 2: Specificed for each vegetation type in Crop_info.ini',
                         'description':'The fertilization inputs are from a raster map'}
-    
\ No newline at end of file
+    
+
+    cond['parallel_routing_0']   = {'key':'opt_parallel_routing', 'value':0, 
+                        'general_description':'Lateral routing schedule\n# 0: serial sweep over the sorted grid\n# 1: level-scheduled sweep; cells within the same topological level are routed in parallel',
+                        'description':'Serial lateral routing over the sorted grid'}
+    cond['parallel_routing_1']   = {'key':'opt_parallel_routing', 'value':1, 
+                        'general_description':'Lateral routing schedule\n# 0: serial sweep over the sorted grid\n# 1: level-scheduled sweep; cells within the same topological level are routed in parallel',
+                        'description':'Level-scheduled parallel lateral routing'}
+
+    cond['landuse_preload_0']   = {'key':'opt_landuse_preload', 'value':0, 
+                        'general_description':'Land use (category_*.bin) input\n# 0: stream each epoch from the open category files at every land use update\n# 1: load all epochs into memory once (faster for multi-epoch scenarios if the maps fit in RAM)',
+                        'description':'Stream land use epochs from the category files'}
+    cond['landuse_preload_1']   = {'key':'opt_landuse_preload', 'value':1, 
+                        'general_description':'Land use (category_*.bin) input\n# 0: stream each epoch from the open category files at every land use update\n# 1: load all epochs into memory once (faster for multi-epoch scenarios if the maps fit in RAM)',
+                        'description':'Load all land use epochs into memory once'}
+
+    cond['report_map_format_0']   = {'key':'opt_report_map_format', 'value':0, 
+                        'general_description':'The layout of map reports (*_map.bin)\n# 0: full raster (rowNum * colNum values per map, nodata outside the catchment)\n# 1: compact; only the active cells (in the order of map_index.bin) are written per map',
+                        'description':'Map reports as full rasters'}
+    cond['report_map_format_1']   = {'key':'opt_report_map_format', 'value':1, 
+                        'general_description':'The layout of map reports (*_map.bin)\n# 0: full raster (rowNum * colNum values per map, nodata outside the catchment)\n# 1: compact; only the active cells (in the order of map_index.bin) are written per map',
+                        'description':'Map reports with active cells only'}
+
+    cond['checkpoint_0']   = {'key':'opt_checkpoint', 'value':0, 
+                        'general_description':'Model state checkpoint (states of all storages, tracking and nitrogen pools at Checkpoint_time)\n# 0: disabled\n# 1: save a checkpoint to Checkpoint_file\n# 2: warm start; restore the states from Checkpoint_file at Checkpoint_time (the simulation before Checkpoint_time is skipped, only inputs are advanced)',
+                        'description':'No model state checkpoint'}
+    cond['checkpoint_1']   = {'key':'opt_checkpoint', 'value':1, 
+                        'general_description':'Model state checkpoint (states of all storages, tracking and nitrogen pools at Checkpoint_time)\n# 0: disabled\n# 1: save a checkpoint to Checkpoint_file\n# 2: warm start; restore the states from Checkpoint_file at Checkpoint_time (the simulation before Checkpoint_time is skipped, only inputs are advanced)',
+                        'description':'Save the model states at Checkpoint_time'}
+    cond['checkpoint_2']   = {'key':'opt_checkpoint', 'value':2, 
+                        'general_description':'Model state checkpoint (states of all storages, tracking and nitrogen pools at Checkpoint_time)\n# 0: disabled\n# 1: save a checkpoint to Checkpoint_file\n# 2: warm start; restore the states from Checkpoint_file at Checkpoint_time (the simulation before Checkpoint_time is skipped, only inputs are advanced)',
+                        'description':'Restore the model states at Checkpoint_time'}
+
+    cond['report_profile_0']   = {'key':'opt_report_profile', 'value':0, 
+                        'general_description':'Report profile\n# 0: full; time series and maps as flagged by the report_* keys, plus the gauge series for calibration\n# 1: calibration; only the gauge series (discharge, d18o and no3 in channel) are collected, no report files or map accumulation',
+                        'description':'Full reports'}
+    cond['report_profile_1']   = {'key':'opt_report_profile', 'value':1, 
+                        'general_description':'Report profile\n# 0: full; time series and maps as flagged by the report_* keys, plus the gauge series for calibration\n# 1: calibration; only the gauge series (discharge, d18o and no3 in channel) are collected, no report files or map accumulation',
+                        'description':'Gauge series for calibration only'}
+
+    cond['gauge_pruning_0']   = {'key':'opt_gauge_pruning', 'value':0, 
+                        'general_description':'Simulated domain\n# 0: all cells of the catchment grid\n# 1: only the cells upstream of the gauges in Gauge_to_Report (the cells that do not drain to any gauge are not simulated)',
+                        'description':'Simulate all cells'}
+    cond['gauge_pruning_1']   = {'key':'opt_gauge_pruning', 'value':1, 
+                        'general_description':'Simulated domain\n# 0: all cells of the catchment grid\n# 1: only the cells upstream of the gauges in Gauge_to_Report (the cells that do not drain to any gauge are not simulated)',
+                        'description':'Simulate the cells upstream of the gauges only'}
+
+    cond['routQ_substep_0']   = {'key':'opt_routQ_substep', 'value':0, 
+                        'general_description':'Sub-stepping of the channel routing (only when opt_routQ = 1)\n# 0: one Kinematic Wave solution per time step\n# 1: adaptive; each reach is solved in sub-steps so that its Courant number stays below 1 (at most 100 sub-steps)',
+                        'description':'One channel routing step per time step'}
+    cond['routQ_substep_1']   = {'key':'opt_routQ_substep', 'value':1, 
+                        'general_description':'Sub-stepping of the channel routing (only when opt_routQ = 1)\n# 0: one Kinematic Wave solution per time step\n# 1: adaptive; each reach is solved in sub-steps so that its Courant number stays below 1 (at most 100 sub-steps)',
+                        'description':'Adaptive channel routing sub-steps'}
+
+    cond['fused_tracking_0']   = {'key':'opt_fused_tracking', 'value':0, 
+                        'general_description':'Solute mixing of the canopy, surface, unsaturated-zone and groundwater storages\n# 0: one pass over the cells per solute (d18o, age, no3)\n# 1: fused; all enabled solutes of a storage are mixed in one pass over the cells',
+                        'description':'Solute mixing per solute'}
+    cond['fused_tracking_1']   = {'key':'opt_fused_tracking', 'value':1, 
+                        'general_description':'Solute mixing of the canopy, surface, unsaturated-zone and groundwater storages\n# 0: one pass over the cells per solute (d18o, age, no3)\n# 1: fused; all enabled solutes of a storage are mixed in one pass over the cells',
+                        'description':'Fused solute mixing'}
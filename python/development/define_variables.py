@@ -6,7 +6,7 @@ from develop_tools import *
 
 
 
-def includes(fname, signs, datas, max_category):
+def includes(fname, signs, datas, max_category, low_precision=[]):
     for j in range(len(signs)):
         sign = signs[j]
         data = datas[j]
@@ -28,7 +28,8 @@ def includes(fname, signs, datas, max_category):
             for key in keys:
                 for i in range(len(grouped_data[key])):
                     if grouped_data[key][i][3] == 'grid':
-                        content.append('  svector *' + grouped_data[key][i][0] + ';  // ' + grouped_data[key][i][2] + '\n')
+                        vtype = 'svector_lp' if grouped_data[key][i][0] in low_precision else 'svector'
+                        content.append('  ' + vtype + ' *' + grouped_data[key][i][0] + ';  // ' + grouped_data[key][i][2] + '\n')
                     if grouped_data[key][i][4] == 'spatial_TS':
                         content.append('  ifstream if_' + grouped_data[key][i][0] + ';  // ' + grouped_data[key][i][2] + '\n')         
             content = lines[:start] + content + lines[end:]
@@ -248,13 +249,17 @@ def report_destructor(fname, reports):
                 f.writelines(content)
 
 
-def constructor(fname, signs, datas):
+def constructor(fname, signs, datas, arena_signs=[], low_precision=[], carried=[]):
     for j in range(len(signs)):
         sign = signs[j]
         data = datas[j]
         
         content = []
-        
+        # svectors of the arena signs are views into the state arena
+        if sign in arena_signs:
+            buffer = ', _states->next()'
+        else:
+            buffer = ''
 
         with open(fname, 'r') as f:
             lines = f.readlines()
@@ -264,16 +269,48 @@ def constructor(fname, signs, datas):
             for key in keys:
                 text = []
                 for i in range(len(grouped_data[key])):                  
+                    # Low-precision svectors are allocated on their own (the state arena holds doubles)
+                    if grouped_data[key][i][0] in low_precision:
+                        vtype, vbuffer = 'svector_lp', ''
+                    else:
+                        vtype, vbuffer = 'svector', buffer
                     if grouped_data[key][i][4] == 'new' or grouped_data[key][i][4] == 'spatial_TS' or grouped_data[key][i][4] == 'spatial_param':
-                        text.append('  '+grouped_data[key][i][0]+' = new svector(_sortedGrid.size);\n')  
+                        text.append('  '+grouped_data[key][i][0]+' = new '+vtype+'(_sortedGrid.size'+vbuffer+');\n')  
                     if grouped_data[key][i][4] == 'spatial':
-                        text.append('  '+grouped_data[key][i][0]+' = new svector(ctrl.path_BasinFolder + ctrl.fn_'+grouped_data[key][i][0]+', _rowNum, _colNum, _sortedGrid);\n')  
+                        text.append('  '+grouped_data[key][i][0]+' = new '+vtype+'(ctrl.path_BasinFolder + ctrl.fn_'+grouped_data[key][i][0]+', _rowNum, _colNum, _sortedGrid'+vbuffer+');\n')  
+                    # Low-precision states are registered for checkpoints (the arena covers the others)
+                    if sign in arena_signs and grouped_data[key][i][0] in low_precision:
+                        text.append('  _states_lp.push_back('+grouped_data[key][i][0]+');\n')
+                    # Fluxes carried over to the next time step are registered for checkpoints as well
+                    if grouped_data[key][i][0] in carried:
+                        text.append('  _states_flux.push_back('+grouped_data[key][i][0]+');\n')
                 content.append(if_condition_build(key, text))
             content = lines[:start] + content + lines[end:]
         if(('').join(content) != ('').join(lines)):
             with open(fname, 'w') as f:
                 f.writelines(content)  
 
+def state_arena(fname, signs, datas, low_precision=[]):
+    # Count the svectors of the arena signs (per option) and allocate one aligned block for all of them
+    with open(fname, 'r') as f:
+        lines = f.readlines()
+        start, end = locate_text(lines, '/* State arena */', '/* end of State arena */')
+        content = ['  int n_state = 0;\n']
+        for j in range(len(signs)):
+            keys, grouped_data = group_text(datas[j])
+            for key in keys:
+                num = 0
+                for i in range(len(grouped_data[key])):
+                    if grouped_data[key][i][4] in ['new', 'spatial', 'spatial_TS', 'spatial_param'] and not grouped_data[key][i][0] in low_precision:
+                        num += 1
+                if num > 0:
+                    content.append(if_condition_build(key, ['  n_state += '+str(num)+';\n']))
+        content.append('  _states = new state_arena(n_state, _sortedGrid.size);\n')
+        content = lines[:start] + content + lines[end:]
+    if(('').join(content) != ('').join(lines)):
+        with open(fname, 'w') as f:
+            f.writelines(content)
+
 def report_includes(fname, reports):
     with open(fname, 'r') as f:
     
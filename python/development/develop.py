@@ -183,6 +183,7 @@ Fluxes   = [#['_D', [Opt.cond['none']], 'Interception [m]', 'grid', 'new', 'inte
 
             ['_Q', [Opt.cond['none']], 'Discharge [m3/s]', 'grid', 'spatial', 'discharge', 1],
             ['_Qupstream', [Opt.cond['none']], 'Upstream inflow [m3/s]', 'grid', 'new', None, 0],
+            ['_a_routQ', [Opt.cond['routQ_1']], 'Kinematic Wave coefficient of each reach, pow(pow(chnwidth,0.67)*Manningn/sqrt(slope), 0.6) [-]', 'grid', 'new', None, 0],
 
             ['_Echan', [Opt.cond['none']], 'Channel evaporation [m]', 'grid', 'new', 'channel_evaporation', 1],
 
@@ -376,6 +377,15 @@ datas_groundTs = [GroundTs]
 signs_basin = ['GIS', 'Storages', 'Fluxes', 'Tracking', 'Nitrogen']
 datas_basin = [GIS, Storages, Fluxes, Tracking, Nitrogen]
 
+signs_state = ['Storages', 'Tracking', 'Nitrogen']  # svectors held in the aligned state arena of Basin
+datas_state = [Storages, Tracking, Nitrogen]
+
+# Variables stored in single precision (svector_lp); mass-balance storages, fluxes and report accumulators stay in double
+low_precision = [data[0] for data in Tracking if data[0].startswith('_d18o_') or data[0].startswith('_age_')]
+
+# Fluxes read in the next time step before they are updated; saved and restored with the model state checkpoint
+carried = ['_Q', '_TchanS']
+
 signs_param = ['Parameters']
 datas_param = [Parameters]
 
@@ -394,8 +404,9 @@ define_variables.constructor(fname=path + 'Constructors/AtmosphereConstruct.cpp'
 define_variables.atmos_read_climate_maps(fname=path + 'Atmosphere/read_climate_maps.cpp', signs=signs_atmos, datas=datas_atmos)
 
 
-define_variables.includes(fname=path + 'includes/Basin.h', signs=signs_groundTs+signs_basin, datas=datas_groundTs+datas_basin, max_category=setting.max_category)
-define_variables.constructor(fname=path + 'Constructors/BasinConstruct.cpp', signs=signs_groundTs+signs_basin, datas=datas_groundTs+datas_basin)
+define_variables.includes(fname=path + 'includes/Basin.h', signs=signs_groundTs+signs_basin, datas=datas_groundTs+datas_basin, max_category=setting.max_category, low_precision=low_precision)
+define_variables.state_arena(fname=path + 'Constructors/BasinConstruct.cpp', signs=signs_state, datas=datas_state, low_precision=low_precision)
+define_variables.constructor(fname=path + 'Constructors/BasinConstruct.cpp', signs=signs_groundTs+signs_basin, datas=datas_groundTs+datas_basin, arena_signs=signs_state, low_precision=low_precision, carried=carried)
 define_variables.destructor(fname=path + 'Destructors/BasinDestruct.cpp', signs=signs_groundTs+signs_basin, datas=datas_groundTs+datas_basin)
 define_variables.basin_read_groundTs_maps(fname=path + 'Atmosphere/read_groundTs_maps.cpp', signs=signs_groundTs, datas=datas_groundTs)
 
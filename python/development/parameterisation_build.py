@@ -2,23 +2,29 @@ from develop_tools import *
 
 def parameterisation_build(fname, parameters):
 
+    # One fused pass over cells; each cell only visits its non-zero (category, weight) pairs
     content = []
     content.append('  int nodata = ctrl._nodata;\n\n')
     keys, grouped_data = group_text(parameters)
+
+    content.append('  #pragma omp parallel for\n')
+    content.append('  for (int j = 0; j < _sortedGrid.size; j++) {\n')
     for key in keys:
         text = []
         for i in range(len(grouped_data[key])):
-            text.append('\n  ' + grouped_data[key][i][0] + '->reset();\n')
-
-            text.append('  for (int k=0; k<param_category->n_category; k++){\n')
-
-            text.append('    if ('+grouped_data[key][i][0][1:]+'[k]!=nodata) {\n')
-            
-            text.append('      for (unsigned int j = 0; j < _sortedGrid.row.size(); j++) {\n')
-            text.append('      '+grouped_data[key][i][0]+'->val[j] += param_category->val[k][j] * '+grouped_data[key][i][0][1:]+'[k];\n')
-            text.append('   }}}\n')
+            text.append('    ' + grouped_data[key][i][0] + '->val[j] = 0;\n')
+        content.append(if_condition_build(key, text))
 
+    content.append('\n    for (int n = param_category->nz_start[j]; n < param_category->nz_start[j+1]; n++) {\n')
+    content.append('      int k = param_category->nz_category[n];\n')
+    content.append('      double w = param_category->nz_weight[n];\n')
+    for key in keys:
+        text = []
+        for i in range(len(grouped_data[key])):
+            text.append('      if (' + grouped_data[key][i][0][1:] + '[k]!=nodata) ' + grouped_data[key][i][0] + '->val[j] += w * ' + grouped_data[key][i][0][1:] + '[k];\n')
         content.append(if_condition_build(key, text))
+    content.append('    }\n')
+    content.append('  }\n')
     
     with open(fname, 'r') as f:
         lines = f.readlines()
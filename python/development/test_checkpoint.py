@@ -0,0 +1,166 @@
+import os
+import re
+import sys
+import glob
+import shutil
+import subprocess
+import numpy as np
+
+# Save-then-restore test of the model state checkpoint (opt_checkpoint = 1 / 2) on a small synthetic catchment:
+# the warm start should reproduce every time series report of the cold run after Checkpoint_time
+# Usage: python test_checkpoint.py <path to gEcoHydro> [working directory]
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, '..', '..'))
+sys.path.insert(0, os.path.join(project_root, 'python', 'run_model'))
+import GEM_tools
+
+nodata = -9999
+nrow, ncol = 7, 5
+nday = 3 * 365
+n_sites = 2
+
+
+def save_asc(fname, data):
+    with open(fname, 'w') as f:
+        f.write('ncols %d\nnrows %d\nxllcorner 0\nyllcorner 0\ncellsize 500\nNODATA_value %d\n' % (ncol, nrow, nodata))
+        np.savetxt(f, data)
+
+
+def grid(value, mask):
+    data = np.full((nrow, ncol), float(nodata))
+    data[mask] = value
+    return data
+
+
+def build_catchment(run_path):
+    # 5 x 3 active cells; the hillslope columns drain into the channel in the middle column (outlet at the bottom)
+    spatial_path = run_path + 'spatial/'
+    climate_path = run_path + 'climate/'
+    for path in [spatial_path, climate_path, run_path + 'outputs/']:
+        os.makedirs(path, exist_ok=True)
+
+    mask = np.zeros((nrow, ncol), dtype=bool)
+    mask[1:6, 1:4] = True
+    chanmask = np.zeros((nrow, ncol), dtype=bool)
+    chanmask[1:6, 2] = True
+
+    fdir = grid(4, mask)
+    fdir[1:6, 1] = 1
+    fdir[1:6, 3] = 16
+    fdir[5, 2] = -1
+    save_asc(spatial_path + 'fdir.asc', fdir)
+    gauge = grid(0, mask)
+    gauge[5, 2] = 1
+    gauge[3, 2] = 2
+    save_asc(spatial_path + 'Gauge_to_Report.asc', gauge)
+    for name, value in [('chnwidth', 5), ('chndepth', 1.5), ('chnlength', 500)]:
+        save_asc(spatial_path + name + '.asc', grid(value, chanmask))
+
+    values = {'dem':100, 'slope':0.05, 'depth1':0.1, 'depth2':0.3, 'climate_zones':1, 'no3_rain':0.5, 'N_fertilization':10,
+              'I':0, 'snow':0, 'pond':0, 'theta1':0.3, 'theta2':0.3, 'theta3':0.3, 'vadose':0.1, 'GW':1, 'Q':0.1}
+    for k in range(1, 4):
+        values.update({'sand%d' % k:0.4, 'clay%d' % k:0.2, 'silt%d' % k:0.4, 'organic%d' % k:0.04 - 0.01 * k, 'bulkdensity%d' % k:1.2 + 0.1 * k,
+                       'humusN%d' % k:600 - 200 * k, 'fastN%d' % k:60 - 20 * k})
+    for storage in ['I', 'snow', 'pond', 'layer1', 'layer2', 'layer3', 'vadose', 'GW', 'chanS']:
+        values.update({'d18o_' + storage:-8, 'age_' + storage:100, 'no3_' + storage:2})
+    for name, value in values.items():
+        save_asc(spatial_path + name + '.asc', grid(value, mask))
+
+    # Global, soil and land use categories, each covering the whole catchment
+    for k in range(3):
+        grid(1.0, mask).tofile(spatial_path + 'category_%d.bin' % k)
+
+    # One climate zone (opt_climate_input_format = 2) and weekly LAI maps (opt_groundTs_input_format = 1)
+    rng = np.random.default_rng(1)
+    season = np.sin(2 * np.pi * np.arange(nday) / 365)
+    climate = {'P':np.where(rng.random(nday) < 0.4, rng.gamma(2, 0.004, nday), 0), 'Ta':8 + 10 * season + rng.normal(0, 2, nday),
+               'RH':np.full(nday, 0.7), 'PET':0.002 + 0.0015 * season, 'airpressure':np.full(nday, 101325.0),
+               'windspeed':np.full(nday, 2.0), 'Rnet':100 + 80 * season, 'd18o_P':-8 + 2 * season}
+    for name, value in climate.items():
+        value.astype(np.float64).tofile(climate_path + name + '.bin')
+    np.full((nday // 7 + 2, nrow, ncol), 2.0).tofile(climate_path + 'LAI.bin')
+
+
+def write_tables(run_path):
+    # [global, soil, land use] values; -9999 is skipped in the parameterisation
+    params = {'depth3':[1, nodata, nodata], 'alpha':[1e-3, nodata, nodata], 'rE':[-0.5, nodata, nodata], 'snow_rain_thre':[0, nodata, nodata],
+              'deg_day_min':[1e-3, nodata, nodata], 'deg_day_max':[5e-3, nodata, nodata], 'deg_day_increase':[0.5, nodata, nodata],
+              'irrigation_FC_thres':[0.4, nodata, nodata], 'ET_reduction':[0.8, nodata, nodata], 'Echan_alpha':[1, nodata, nodata],
+              'CG_n_soil':[0.8, nodata, nodata],
+              'ref_thetaS':[nodata, 0.7, nodata], 'PTF_VG_clay':[nodata, 1e-4, nodata], 'PTF_VG_Db':[nodata, 1e-2, nodata],
+              'PTF_Ks_const':[nodata, -0.7, nodata], 'PTF_Ks_sand':[nodata, 0.015, nodata], 'PTF_Ks_clay':[nodata, 0.008, nodata],
+              'SWP':[nodata, 33, nodata], 'KvKh':[nodata, 0.1, nodata], 'psiAE':[nodata, 0.5, nodata], 'KKs':[nodata, 10, nodata],
+              'Ksat':[nodata, 10, nodata], 'BClambda':[nodata, 5, nodata], 'percExp':[nodata, 10, nodata], 'perc_vadose_coeff':[nodata, 1e-2, nodata],
+              'froot_coeff':[nodata, nodata, 0.9], 'init_GW':[nodata, nodata, 5], 'pOvf_toChn':[nodata, nodata, 0.1],
+              'Ks_vadose':[nodata, nodata, 0.1], 'Ks_GW':[nodata, nodata, 1e-4], 'lat_to_Chn_vadose':[nodata, nodata, 1],
+              'lat_to_Chn_GW':[nodata, nodata, 0.1], 'interfExp':[nodata, nodata, 1], 'GWfExp':[nodata, nodata, 1e-2],
+              'Manningn':[nodata, nodata, 0.05], 'irrigation_coeff':[nodata, nodata, 0.5], 'nearsurface_mixing':[nodata, nodata, 0.5],
+              'ratio_to_interf':[nodata, nodata, 0.5], 'delta_d18o_init_GW':[nodata, nodata, 0], 'delta_no3_init_GW':[nodata, nodata, 0],
+              'denitrification_river':[nodata, nodata, 1e-2], 'denitrification_soil':[nodata, nodata, 1e-2],
+              'degradation_soil':[nodata, nodata, 1e-5], 'mineralisation_soil':[nodata, nodata, 1e-2],
+              'deni_soil_moisture_thres':[nodata, nodata, 0.5]}
+    crops = {'is_landuse':1, 'is_crop':1, 'fert_add':12, 'fert_day':87, 'fert_down':0.4, 'fert_period':30, 'fert_IN':0.7,
+             'manure_add':0, 'manure_day':110, 'manure_down':0.4, 'manure_period':30, 'manure_IN':0.5,
+             'residue_add':1, 'residue_day':242, 'residue_down':0.3, 'residue_period':30, 'residue_fastN':0.6,
+             'up1':10, 'up2':0.6, 'up3':0.04, 'upper_uptake':0.99, 'plant_day':85, 'emerge_day':100, 'harvest_day':242,
+             'irrigation_thres':0.6}
+    with open(run_path + 'param.ini', 'w') as f:
+        f.writelines([name + ',' + ','.join([str(v) for v in value]) + '\n' for name, value in params.items()])
+    with open(run_path + 'Crop_info.ini', 'w') as f:
+        f.writelines([name + ',%d,%d,' % (nodata, nodata) + str(value) + '\n' for name, value in crops.items()])
+
+
+def run_model(model_path, run_path, options):
+    if os.path.exists(run_path):
+        shutil.rmtree(run_path)
+    build_catchment(run_path)
+    write_tables(run_path)
+
+    # The full config of the repository, with all time series reports enabled
+    template = os.path.join(project_root, 'config.ini')
+    options = dict(options, Simul_end=nday*86400, num_category=3, opt_climate_input_format=2, opt_groundTs_input_format=1)
+    with open(template, 'r') as f:
+        for line in f:
+            key = re.match(r'(report_\w+)\s*=', line)
+            if key is not None:
+                options[key.group(1)] = 1
+    with open(run_path + 'config.ini', 'w') as f:
+        f.write(GEM_tools.render_config(template, options))
+
+    result = subprocess.run([model_path], cwd=run_path, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError('GEM failed in ' + run_path + ':\n' + result.stdout + result.stderr)
+
+
+def test_checkpoint(model_path, work_path, tstep, checkpoint_time, options):
+    nstep = nday * 86400 // tstep
+    options = dict(options, Simul_tstep=tstep, Checkpoint_time=checkpoint_time, Checkpoint_file=work_path + 'checkpoint.bin')
+    run_model(model_path, work_path + 'cold/', dict(options, opt_checkpoint=1))
+    run_model(model_path, work_path + 'warm/', dict(options, opt_checkpoint=2))
+
+    # Steps before Checkpoint_time are only placeholders in the warm start
+    # (discharge and in-stream solutes are followed by the calibration records, so only the first nstep records are compared)
+    start = checkpoint_time // tstep
+    failed = []
+    fnames = sorted(glob.glob(work_path + 'cold/outputs/*_TS.bin'))
+    for fname in fnames:
+        cold = np.fromfile(fname)[:nstep*n_sites].reshape(nstep, n_sites)[start:]
+        warm = np.fromfile(fname.replace('/cold/', '/warm/'))[:nstep*n_sites].reshape(nstep, n_sites)[start:]
+        if not np.array_equal(cold, warm, equal_nan=True):
+            failed.append(os.path.basename(fname))
+    print('Simul_tstep = %d, Checkpoint_time = %d: %d of %d reports reproduced' % (tstep, checkpoint_time, len(fnames) - len(failed), len(fnames)))
+    for fname in failed:
+        print('    mismatch in ' + fname)
+    return len(failed) == 0
+
+
+if __name__ == '__main__':
+    model_path = os.path.abspath(sys.argv[1])
+    work_path = os.path.abspath(sys.argv[2] if len(sys.argv) > 2 else './test_checkpoint') + '/'
+
+    # Daily steps with sub-stepped channel routing (_Q) and in-stream nitrogen (_TchanS);
+    # then half-daily steps with canopy evaporation, where PET is carried over between two climate inputs
+    passed = test_checkpoint(model_path, work_path + 'daily/', 86400, 400*86400, {'opt_routQ_substep':1})
+    passed = test_checkpoint(model_path, work_path + 'subdaily/', 43200, 400*86400 + 43200, {'opt_routQ_substep':1, 'opt_canopy_evap':1}) and passed
+    sys.exit(0 if passed else 1)
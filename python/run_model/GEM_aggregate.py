@@ -0,0 +1,179 @@
+import os
+import json
+import pickle
+import hashlib
+import numpy as np
+from multiprocessing import Pool, cpu_count
+import GEM_store
+
+
+# Out-of-core time aggregation of *_map.bin reports
+# Reports are memory-mapped and reduced in blocks of `chunk` records, so that the memory is bounded by chunk * cells
+# Both full maps and compact maps (opt_report_map_format = 1, with map_index.bin) are supported; the format is read from report_info.txt
+# nodata records are ignored (set nodata=None to keep them); cells without any valid record are set to `fill`
+# Derived products (summaries and figures) are keyed by the mtime and size of their inputs and are only rebuilt when these change
+
+
+def open_map(fname, shape):
+    """Memory-map a *_map.bin report as (time, cells).
+    Returns the records, the raster index of the cells (None for full maps) and the raster shape."""
+    output_path = os.path.join(os.path.dirname(fname), '')
+    if GEM_store.report_map_format(output_path) == 1:
+        index_fname = output_path + 'map_index.bin'
+        nrow, ncol, ncell = [int(i) for i in np.fromfile(index_fname, dtype=np.int32, count=3)]
+        index = np.fromfile(index_fname, dtype=np.int32, offset=3*4)
+        return np.memmap(fname, dtype=np.float64, mode='r').reshape(-1, ncell), index, (nrow, ncol)
+    return np.memmap(fname, dtype=np.float64, mode='r').reshape(-1, shape[0] * shape[1]), None, tuple(shape)
+
+
+def to_raster(values, index, shape, fill):
+    if index is not None:
+        data = np.full(values.shape[:-1] + (shape[0] * shape[1],), fill)
+        data[..., index] = values
+        values = data
+    return values.reshape(values.shape[:-1] + shape)
+
+
+def _blocks(values, start, stop, chunk, nodata):
+    # Copy of the records [t, t+chunk) with nodata replaced by nan
+    for t in range(start, stop, chunk):
+        block = np.array(values[t:min(t + chunk, stop)])
+        if nodata is not None:
+            block[block == nodata] = np.nan
+        yield t, block
+
+
+def _period(values, start, stop):
+    stop = values.shape[0] if stop is None else min(stop, values.shape[0])
+    return start, max(start, stop)
+
+
+def mean(fname, shape, start=0, stop=None, chunk=365, nodata=-9999, fill=np.nan):
+    """Time mean of the records [start, stop) as (row, col)"""
+    values, index, shape = open_map(fname, shape)
+    start, stop = _period(values, start, stop)
+    total = np.zeros(values.shape[1])
+    count = np.zeros(values.shape[1])
+    for _, block in _blocks(values, start, stop, chunk, nodata):
+        total += np.nansum(block, axis=0)
+        count += np.sum(~np.isnan(block), axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        data = np.where(count > 0, total / count, fill)
+    return to_raster(data, index, shape, fill)
+
+
+def total(fname, shape, start=0, stop=None, chunk=365, nodata=-9999, fill=np.nan):
+    """Time sum of the records [start, stop) as (row, col)"""
+    values, index, shape = open_map(fname, shape)
+    start, stop = _period(values, start, stop)
+    data = np.zeros(values.shape[1])
+    count = np.zeros(values.shape[1])
+    for _, block in _blocks(values, start, stop, chunk, nodata):
+        data += np.nansum(block, axis=0)
+        count += np.sum(~np.isnan(block), axis=0)
+    data[count == 0] = fill
+    return to_raster(data, index, shape, fill)
+
+
+def climatology(fname, shape, groups, ngroups=None, start=0, stop=None, chunk=365, nodata=-9999, fill=np.nan):
+    """Mean of each group of records as (group, row, col), e.g. seasonal or monthly climatology.
+    groups: group (0, 1, ...) of each record in [start, stop), e.g. pd.date_range(start_date, periods=n, freq='D').month - 1"""
+    values, index, shape = open_map(fname, shape)
+    start, stop = _period(values, start, stop)
+    groups = np.asarray(groups, dtype=np.int64)
+    ngroups = int(groups.max()) + 1 if ngroups is None else ngroups
+    total = np.zeros((ngroups, values.shape[1]))
+    count = np.zeros((ngroups, values.shape[1]))
+    for t, block in _blocks(values, start, stop, chunk, nodata):
+        block_groups = groups[t - start:t - start + block.shape[0]]
+        for g in np.unique(block_groups):
+            _block = block[block_groups == g]
+            total[g] += np.nansum(_block, axis=0)
+            count[g] += np.sum(~np.isnan(_block), axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        data = np.where(count > 0, total / count, fill)
+    return to_raster(data, index, shape, fill)
+
+
+def percentile(fname, shape, q, start=0, stop=None, max_memory=2**28, nodata=-9999, fill=np.nan):
+    """Percentiles q (in %) of the records [start, stop) as (q, row, col), or (row, col) for a scalar q.
+    Percentiles need the full time series of a cell, so the cells are processed in blocks of at most max_memory bytes."""
+    values, index, shape = open_map(fname, shape)
+    start, stop = _period(values, start, stop)
+    q = np.asarray(q, dtype=np.float64)
+    data = np.full(q.shape + (values.shape[1],), fill)
+    ncell = max(1, int(max_memory // (8 * max(stop - start, 1))))
+    for c in range(0, values.shape[1], ncell):
+        block = np.array(values[start:stop, c:c + ncell])
+        if nodata is not None:
+            block[block == nodata] = np.nan
+        valid = np.any(~np.isnan(block), axis=0)
+        if np.any(valid):
+            data[..., c + np.flatnonzero(valid)] = np.nanpercentile(block[:, valid], q, axis=0)
+    return to_raster(data, index, shape, fill)
+
+
+stats = {'mean': mean, 'sum': total, 'climatology': climatology, 'percentile': percentile}
+
+
+def aggregate(fname, shape, stat='mean', **kwargs):
+    return stats[stat](fname, shape, **kwargs)
+
+
+def signature(fnames):
+    # [name, mtime, size] of each input file (None for missing files)
+    sig = []
+    for fname in fnames:
+        if os.path.exists(fname):
+            st = os.stat(fname)
+            sig.append([os.path.basename(fname), st.st_mtime_ns, st.st_size])
+        else:
+            sig.append([os.path.basename(fname), None, None])
+    return sig
+
+
+def up_to_date(product, fnames):
+    """True if product exists and was recorded (see record) from the same inputs"""
+    key = os.path.splitext(product)[0] + '.key'
+    if not (os.path.exists(product) and os.path.exists(key)):
+        return False
+    with open(key) as f:
+        return json.load(f) == signature(fnames)
+
+
+def record(product, fnames):
+    """Record the inputs of product, once it is written"""
+    with open(os.path.splitext(product)[0] + '.key', 'w') as f:
+        json.dump(signature(fnames), f)
+
+
+def cached(fname, shape, stat='mean', cache_path=None, **kwargs):
+    """Same as aggregate, but the result is kept in <report folder>/summaries/ and reused while the report is unchanged"""
+    cache_path = os.path.join(os.path.dirname(fname), 'summaries') if cache_path is None else cache_path
+    name = os.path.basename(fname).replace('.bin', '') + '_' + stat + '_' + hashlib.sha1(pickle.dumps(sorted(kwargs.items()))).hexdigest()[:12]
+    product = os.path.join(cache_path, name + '.npy')
+    if up_to_date(product, [fname]):
+        return np.load(product)
+    data = aggregate(fname, shape, stat, **kwargs)
+    os.makedirs(cache_path, exist_ok=True)
+    np.save(product, data)
+    record(product, [fname])
+    return data
+
+
+def _aggregate(args):
+    fname, shape, stat, cache, kwargs = args
+    if cache:
+        return cached(fname, shape, stat, **kwargs)
+    return aggregate(fname, shape, stat, **kwargs)
+
+
+def aggregate_files(fnames, shape, stat='mean', processes=None, cache=False, **kwargs):
+    """Aggregate several reports of the same grid, one file per process.
+    Returns {fname: result}"""
+    tasks = [(fname, shape, stat, cache, kwargs) for fname in fnames]
+    processes = min(cpu_count() if processes is None else processes, len(tasks))
+    if processes <= 1:
+        return {task[0]: _aggregate(task) for task in tasks}
+    with Pool(processes=processes) as pool:
+        return dict(zip(fnames, pool.map(_aggregate, tasks)))
@@ -0,0 +1,167 @@
+import os
+import json
+import zlib
+import numpy as np
+
+
+# Chunked, compressed store for GEM outputs
+# store_path/
+#   store.json              metadata of all variables (shape, dtype, chunk size, layout) and report_info.txt
+#   <var>/<k>.z             zlib-compressed chunk k along time
+#   map_index.z             raster index of the active cells (only for compact map reports)
+
+
+def read_report_info(output_path):
+    info = {}
+    with open(output_path + 'report_info.txt') as f:
+        for line in f.readlines():
+            line = line.split('#')[0].strip()
+            if '=' in line:
+                key, value = [s.strip() for s in line.split('=', 1)]
+                info[key] = float(value) if '.' in value or 'e' in value else int(value)
+    return info
+
+
+def report_map_format(output_path):
+    """map_format of the map reports in output_path (0: full raster; 1: active cells in the order of map_index.bin).
+    Folders without report_info.txt (collected before it was kept) fall back to the presence of map_index.bin."""
+    if os.path.exists(output_path + 'report_info.txt'):
+        return read_report_info(output_path).get('map_format', 0)
+    return 1 if os.path.exists(output_path + 'map_index.bin') else 0
+
+
+def _write_chunk(fname, data, level):
+    with open(fname, 'wb') as f:
+        f.write(zlib.compress(np.ascontiguousarray(data).tobytes(), level))
+
+
+def _read_chunk(fname, dtype, ncol):
+    with open(fname, 'rb') as f:
+        return np.frombuffer(zlib.decompress(f.read()), dtype=dtype).reshape(-1, ncol)
+
+
+def pack_outputs(output_path, store_path, float32=False, chunk_size=365, level=6):
+    """Pack the *_TS.bin and *_map.bin reports in output_path into a chunked store.
+    Records are appended along time if the variable already exists in the store."""
+    info = read_report_info(output_path)
+    os.makedirs(store_path, exist_ok=True)
+    meta = open_store(store_path).meta if os.path.exists(store_path + 'store.json') else {'attrs': info, 'vars': {}}
+    dtype = 'float32' if float32 else 'float64'
+
+    if info['map_format'] == 1 and os.path.exists(output_path + 'map_index.bin'):
+        index = np.fromfile(output_path + 'map_index.bin', dtype=np.int32)[3:]
+        _write_chunk(store_path + 'map_index.z', index, level)
+
+    for fname in sorted(os.listdir(output_path)):
+        if fname.endswith('_TS.bin'):
+            kind, ncol = 'TS', info['n_sites']
+        elif fname.endswith('_map.bin'):
+            kind = 'map'
+            ncol = info['n_cells'] if info['map_format'] == 1 else info['rows'] * info['cols']
+        else:
+            continue
+        var = fname[:-4]
+        # The report is memory-mapped and packed in slices of one chunk, so that only one chunk is held in memory
+        nrecord = os.path.getsize(output_path + fname) // (8 * ncol)
+        values = np.memmap(output_path + fname, dtype=np.float64, mode='r', shape=(nrecord, ncol)) if nrecord > 0 else np.zeros((0, ncol))
+        os.makedirs(store_path + var, exist_ok=True)
+
+        if var in meta['vars']:
+            # Complete the last (partial) chunk first
+            item = meta['vars'][var]
+            nchunk = -(-item['shape'][0] // item['chunk'])
+            last = item['shape'][0] - (nchunk - 1) * item['chunk'] if nchunk > 0 else 0
+            tail = np.zeros((0, ncol), dtype=item['dtype'])
+            if 0 < last < item['chunk']:
+                tail = _read_chunk(store_path + var + '/' + str(nchunk - 1) + '.z', item['dtype'], ncol)
+                nchunk -= 1
+            start = nchunk
+            item['shape'][0] = nchunk * item['chunk'] + tail.shape[0] + nrecord
+        else:
+            item = {'kind': kind, 'shape': [nrecord, ncol], 'dtype': dtype, 'chunk': chunk_size, 'compressor': 'zlib', 'level': level}
+            meta['vars'][var] = item
+            tail = np.zeros((0, ncol), dtype=dtype)
+            start = 0
+
+        t = 0
+        if tail.shape[0] > 0:
+            t = item['chunk'] - tail.shape[0]
+            _write_chunk(store_path + var + '/' + str(start) + '.z', np.concatenate([tail, values[:t].astype(item['dtype'])]), level)
+            start += 1
+        for k, t in enumerate(range(t, nrecord, item['chunk'])):
+            _write_chunk(store_path + var + '/' + str(start + k) + '.z', values[t:t+item['chunk']].astype(item['dtype']), level)
+        del values
+
+    with open(store_path + 'store.json', 'w') as f:
+        json.dump(meta, f, indent=1)
+
+
+class StoredArray:
+    """One variable of a store. Indexing along time only decompresses the chunks that are needed.
+    Maps are returned as (time, rows, cols); time series as (time, sites)."""
+    def __init__(self, store_path, var, item, attrs):
+        self.path = store_path + var + '/'
+        self.item = item
+        self.attrs = attrs
+        self.index = None
+        if item['kind'] == 'map':
+            if attrs['map_format'] == 1:
+                self.index = _read_chunk(store_path + 'map_index.z', np.int32, item['shape'][1])[0]
+            self.shape = (item['shape'][0], attrs['rows'], attrs['cols'])
+        else:
+            self.shape = tuple(item['shape'])
+
+    def __len__(self):
+        return self.shape[0]
+
+    def read(self, start=0, stop=None):
+        stop = self.shape[0] if stop is None else min(stop, self.shape[0])
+        chunk = self.item['chunk']
+        data = [_read_chunk(self.path + str(k) + '.z', self.item['dtype'], self.item['shape'][1])
+                for k in range(start // chunk, -(-stop // chunk))]
+        if len(data) == 0:
+            data = np.empty((0, self.item['shape'][1]), dtype=self.item['dtype'])
+        else:
+            data = np.concatenate(data)[start - (start // chunk) * chunk:][:stop - start]
+        if self.item['kind'] == 'map':
+            if self.index is not None:
+                full = np.full((data.shape[0], self.shape[1] * self.shape[2]), self.attrs['nodata'], dtype=data.dtype)
+                full[:, self.index] = data
+                data = full
+            data = data.reshape(-1, self.shape[1], self.shape[2])
+        return data
+
+    def __getitem__(self, key):
+        if not isinstance(key, tuple):
+            key = (key,)
+        t = key[0]
+        if isinstance(t, slice) and (t.step is None or t.step == 1):
+            start, stop, _ = t.indices(self.shape[0])
+            return self.read(start, max(start, stop))[(slice(None),) + key[1:]]
+        if isinstance(t, (int, np.integer)):
+            t = t + self.shape[0] if t < 0 else t
+            return self.read(t, t + 1)[0][key[1:]]
+        return self.read()[key]
+
+    def __array__(self, dtype=None):
+        data = self.read()
+        return data if dtype is None else data.astype(dtype)
+
+
+class Store:
+    def __init__(self, store_path):
+        self.path = store_path
+        with open(store_path + 'store.json') as f:
+            self.meta = json.load(f)
+        self.attrs = self.meta['attrs']
+        self.vars = list(self.meta['vars'].keys())
+
+    def __contains__(self, var):
+        return var in self.meta['vars']
+
+    def __getitem__(self, var):
+        return StoredArray(self.path, var, self.meta['vars'][var], self.attrs)
+
+
+def open_store(store_path):
+    return Store(store_path)
@@ -1,4 +1,6 @@
 import os
+import json
+import hashlib
 import shutil
 import numpy as np
 import subprocess
@@ -31,21 +33,134 @@ def save_to_ascii(data, path, ref_path):
         np.savetxt(f, data.astype(np.float64))
 
 
-def save_outputs(output_path, save_path):
+def _append_file(src, dst, chunk=2**26):
+    # Append src to dst inside the kernel (copy_file_range, else sendfile), without reading the data into Python
+    # Returns the offset of the appended block in dst and its size in bytes
+    src_fd = os.open(src, os.O_RDONLY)
+    dst_fd = os.open(dst, os.O_WRONLY | os.O_CREAT, 0o644)
+    try:
+        nbytes = os.fstat(src_fd).st_size
+        start = os.lseek(dst_fd, 0, os.SEEK_END)
+        copied = 0
+        while copied < nbytes:
+            count = min(chunk, nbytes - copied)
+            try:
+                n = os.copy_file_range(src_fd, dst_fd, count, copied, start + copied)
+            except (AttributeError, OSError):
+                os.lseek(dst_fd, start + copied, os.SEEK_SET)
+                n = os.sendfile(dst_fd, src_fd, copied, count)
+            if n == 0:
+                raise IOError('Incomplete copy of ' + src + ' to ' + dst)
+            copied += n
+    finally:
+        os.close(src_fd)
+        os.close(dst_fd)
+    return start, nbytes
+
+
+def read_manifest(save_path):
+    """Blocks of the collected outputs: {fname: [{'run', 'source', 'offset', 'nbytes'}, ...]}"""
+    if os.path.exists(save_path + 'manifest.json'):
+        with open(save_path + 'manifest.json') as f:
+            return json.load(f)
+    return {}
+
+
+def read_saved(save_path, fname, run=None):
+    """Values of fname collected by save_outputs; only the block of the given run if run is not None"""
+    if run is None:
+        return np.fromfile(save_path + fname)
+    for block in read_manifest(save_path)[fname]:
+        if block['run'] == run:
+            return np.fromfile(save_path + fname, offset=block['offset'], count=block['nbytes']//8)
+    raise KeyError('Run ' + str(run) + ' not found in ' + save_path + 'manifest.json for ' + fname)
+
+
+def save_outputs(output_path, save_path, store=False, float32=False, run_id=None, move=False):
+    # Collect the outputs of a run in save_path; outputs of later runs are appended to the same files
+    # manifest.json records the run, offset and size of each appended block (see read_saved)
+    # move=True moves new files instead of copying them, for outputs that are not read again in output_path
 
     os.makedirs(save_path, exist_ok=True)
 
+    if store:
+        # Chunked and compressed store (see GEM_store.py); read it with GEM_store.open_store(save_path)
+        import GEM_store
+        GEM_store.pack_outputs(output_path, save_path, float32=float32)
+        return
+
     fnames = [f for f in os.listdir(output_path) if f.endswith('bin')]
+    manifest = read_manifest(save_path)
 
-    for fname in fnames:
-        data = np.fromfile(output_path + fname)
-        if os.path.exists(save_path + fname):
-            with open(save_path + fname, 'ab+') as f:
-                data.tofile(f)
-        else:
-            with open(save_path + fname, 'w') as f:
-                data.tofile(f)
+    if os.path.exists(output_path + 'report_info.txt'):
+        # The layout of the reports (e.g., map_format) is the same for every run
+        shutil.copyfile(output_path + 'report_info.txt', save_path + 'report_info.txt')
 
+    for fname in fnames:
+        if fname == 'map_index.bin':
+            # The cell index of compact map reports is the same for every run
+            shutil.copyfile(output_path + fname, save_path + fname)
+            continue
+        blocks = manifest.setdefault(fname, [])
+        if len(blocks) == 0 and os.path.exists(save_path + fname):
+            # Collected before the manifest existed
+            blocks.append({'run':None, 'source':None, 'offset':0, 'nbytes':os.path.getsize(save_path + fname)})
+        run = len(blocks) if run_id is None else run_id
+        if move and not os.path.exists(save_path + fname):
+            try:
+                nbytes = os.path.getsize(output_path + fname)
+                os.rename(output_path + fname, save_path + fname)
+                blocks.append({'run':run, 'source':output_path, 'offset':0, 'nbytes':nbytes})
+                continue
+            except OSError:
+                pass  # different file systems
+        offset, nbytes = _append_file(output_path + fname, save_path + fname)
+        blocks.append({'run':run, 'source':output_path, 'offset':offset, 'nbytes':nbytes})
+
+    with open(save_path + 'manifest.json.tmp', 'w') as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(save_path + 'manifest.json.tmp', save_path + 'manifest.json')
+
+
+
+class CompactMaps:
+    """Map reports written with opt_report_map_format = 1 (active cells only).
+    Behaves like an array of (time, row, col); maps are scattered back to rasters only for the requested time steps."""
+    def __init__(self, fname, index_fname, nodata=-9999.0):
+        header = np.fromfile(index_fname, dtype=np.int32, count=3)
+        self.nrow, self.ncol, self.ncell = [int(i) for i in header]
+        self.index = np.fromfile(index_fname, dtype=np.int32, offset=3*4)
+        self.nodata = nodata
+        self.values = np.memmap(fname, dtype=np.float64, mode='r').reshape(-1, self.ncell)
+        self.shape = (self.values.shape[0], self.nrow, self.ncol)
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getitem__(self, key):
+        if not isinstance(key, tuple):
+            key = (key,)
+        values = self.values[key[0]]
+        data = np.full((np.atleast_2d(values).shape[0], self.nrow * self.ncol), self.nodata)
+        data[:, self.index] = np.atleast_2d(values)
+        data = data.reshape(-1, self.nrow, self.ncol)
+        if values.ndim == 1:
+            return data[0][key[1:]]
+        return data[(slice(None),) + key[1:]]
+
+    def __array__(self, dtype=None):
+        data = self[:]
+        return data if dtype is None else data.astype(dtype)
+
+
+def read_map(fname, shape):
+    """Read a *_map.bin report as (time, row, col).
+    Compact reports (map_format = 1 in report_info.txt next to the file) are returned as CompactMaps (scattered lazily)."""
+    import GEM_store
+    output_path = os.path.join(os.path.dirname(fname), '')
+    if GEM_store.report_map_format(output_path) == 1:
+        return CompactMaps(fname, output_path + 'map_index.bin')
+    return np.fromfile(fname).reshape(-1, shape[0], shape[1])
 
 
 def kge11(sim, obs):
@@ -156,6 +271,33 @@ def pbias(sim, obs):
     obs = obs[validIDX]
     return np.mean(np.abs((sim - obs)/obs))
 
+def kge_sites(sim, obs, valid=None):
+    """kge of each row of (site, time) arrays; same as kge applied row by row"""
+    if valid is None:
+        valid = np.logical_not( np.logical_or( np.isnan(sim), np.isnan(obs) ) ) & (obs!=-9999)
+    n = np.sum(valid, axis=1)
+    sim = np.where(valid, sim, 0.0)
+    obs = np.where(valid, obs, 0.0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        sim_mean = np.sum(sim, axis=1) / n
+        obs_mean = np.sum(obs, axis=1) / n
+        sim_anom = np.where(valid, sim - sim_mean[:, None], 0.0)
+        obs_anom = np.where(valid, obs - obs_mean[:, None], 0.0)
+        r_num = np.sum(sim_anom * obs_anom, axis=1)
+        r_den = np.sqrt(np.sum(sim_anom**2, axis=1) * np.sum(obs_anom**2, axis=1))
+        pearson_r = r_num / (r_den + 1e-10)
+        alpha = (np.sqrt(np.sum(sim_anom**2, axis=1) / n) / sim_mean) / (np.sqrt(np.sum(obs_anom**2, axis=1) / n) / obs_mean)
+        beta = sim_mean / obs_mean
+        return 1 - np.sqrt((pearson_r-1)**2 + (alpha-1)**2 + (beta-1)**2)
+
+def pbias_sites(sim, obs, valid=None):
+    """pbias of each row of (site, time) arrays; same as pbias applied row by row"""
+    if valid is None:
+        valid = np.logical_not( np.logical_or( np.isnan(sim), np.isnan(obs) ) ) & (obs!=-9999)
+    valid = valid & (obs!=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.sum(np.where(valid, np.abs((sim - obs)/obs), 0.0), axis=1) / np.sum(valid, axis=1)
+
 def nse(sim, obs):
     validIDX = np.logical_not( np.logical_or( np.isnan(sim), np.isnan(obs) ) )
     validIDX[obs==-9999] = False
@@ -249,115 +391,112 @@ def sort_directory(mode, Path, Cali, Output, catchment_list=None):
         
  
 
-def set_env(mode, Path, nchains, Output, catchment_list=None):
-    if mode == 'DREAM_cali' or mode=='cali_sep':
-        for i in range(nchains):
-            dir_for_each_chain = Path.work_path + '/chain_' +str(i) + '/'    # Working directory for each chain
-
-            for kk in range(Output.N_catchments):
-                catchment_path = dir_for_each_chain + str(Output.Catchment_ID[kk]) + '/'   # Working directory for each catchment
-                run_path =  catchment_path + '/run/'        # The path for model runs
-
-                if os.path.exists(run_path):  # Clean the run path
-                    shutil.rmtree(run_path)
-                os.mkdir(run_path)
-
-                # link the model
-                if not os.path.exists(run_path + Path.path_EXEC):
-                    os.symlink(Path.model_path + Path.path_EXEC, run_path + Path.path_EXEC)
-                # copy inputs
-                #shutil.copytree(Path.data_path+'catchment_info/'+str(Output.Catchment_ID[kk])+'/spatial/', run_path+'spatial/')
-                # copy configs
-                shutil.copyfile(Path.config_path+'config_cali.ini',  run_path+'config.ini')
-    
+# Config templates
+# The base configs are parsed once; the config.ini of each run folder is rendered from its base plus a few overrides
+# (prepended keys take precedence in the model, so overrides replace the first line of a key, or are prepended if missing)
+# and only written when its content changes, so that setting up the run folders again is cheap and idempotent
+_config_templates = {}
+_simul_end = {}
+
+
+def load_config_template(fname):
+    """Lines of a base config and the line of each key, parsed once per file version"""
+    st = os.stat(fname)
+    version = (st.st_mtime_ns, st.st_size)
+    if fname not in _config_templates or _config_templates[fname][0] != version:
+        with open(fname) as f:
+            lines = f.readlines()
+        keys = {}
+        for i, line in enumerate(lines):
+            key = line.split('#')[0].split('=')[0].strip()
+            if '=' in line.split('#')[0] and key not in keys:
+                keys[key] = i
+        _config_templates[fname] = (version, lines, keys)
+    return _config_templates[fname][1:]
+
+
+def render_config(fname, overrides):
+    """Text of the base config fname with overrides {key: value}"""
+    lines, keys = load_config_template(fname)
+    lines = list(lines)
+    head = []
+    for key, value in overrides.items():
+        line = key + ' = ' + str(value) + '\n'
+        if key in keys:
+            lines[keys[key]] = line
+        else:
+            head.append(line)
+    return ''.join(head + lines)
+
+
+def write_if_changed(fname, text):
+    """Write text to fname unless fname already has this content. Returns True if written"""
+    data = text.encode()
+    if os.path.exists(fname) and os.path.getsize(fname) == len(data):
+        with open(fname, 'rb') as f:
+            if hashlib.sha1(f.read()).digest() == hashlib.sha1(data).digest():
+                return False
+    with open(fname + '.tmp', 'wb') as f:
+        f.write(data)
+    os.replace(fname + '.tmp', fname)
+    return True
+
+
+def get_simul_end(Path, catchment_ID):
+    # Seconds from 1980-1-1 to the end of the observations, read once per catchment
+    if catchment_ID not in _simul_end:
+        _simul_end[catchment_ID] = int(np.loadtxt(Path.data_path + 'catchment_info/cali/'+str(catchment_ID)+'/obs/seconds_from_1980.txt'))
+    return _simul_end[catchment_ID]
+
+
+def get_config(mode, Path, catchment_ID):
+    """Base config and overrides of the runs of a catchment"""
+    if mode == 'forward_all':
+        return Path.config_path+'config_forward.ini', {
+            'Clim_Maps_Folder': Path.data_path + 'catchment_info/forward/'+str(catchment_ID)+'/climate/',
+            'Maps_Folder': Path.data_path + 'catchment_info/forward/'+str(catchment_ID)+'/spatial/'}
+    overrides = {'Clim_Maps_Folder': Path.data_path + 'catchment_info/cali/'+str(catchment_ID)+'/climate/',
+                 'Maps_Folder': Path.data_path + 'catchment_info/cali/'+str(catchment_ID)+'/spatial/'}
+    if mode == 'DREAM_cali' or mode == 'cali_sep' or mode == 'SA':
+        overrides['Simul_end'] = str(get_simul_end(Path, catchment_ID)) + ' # in second'
+        # Calibration and screening runs only need the gauge series
+        overrides['opt_report_profile'] = 1
+        return Path.config_path+'config_cali.ini', overrides
+    return Path.config_path+'config_forward.ini', overrides
+
+
+def get_run_paths(mode, Path, nchains, Output, catchment_list=None):
+    # [(catchment_ID, run_path)] of all run folders of a mode
+    if mode == 'DREAM_cali' or mode == 'cali_sep':
+        return [(catchment_ID, Path.work_path + '/chain_' + str(i) + '/' + str(catchment_ID) + '/run/')
+                for i in range(nchains) for catchment_ID in Output.Catchment_ID]
     elif mode == 'forward_all':
         if catchment_list is None:
             catchment_list = Output.Catchment_ID
-        for catchment_ID in catchment_list:
-            catchment_path = Path.work_path + '/' + mode + '/run/' + str(catchment_ID) + '/'
-            run_path =  catchment_path + '/run/'    # The path for model runs
-            # link the model
-            if not os.path.exists(run_path + Path.path_EXEC):
-                os.symlink(Path.model_path + Path.path_EXEC, run_path + Path.path_EXEC)
-            # copy inputs
-            #shutil.copytree(Path.data_path+'spatial/', run_path+'spatial/')
-            # copy configs
-            if mode == 'SA':
-                shutil.copyfile(Path.config_path+'config_cali.ini',  run_path+'config.ini')
-            else:
-                shutil.copyfile(Path.config_path+'config_forward.ini',  run_path+'config.ini')
-    
-    else:
-        for kk in range(Output.N_catchments):
-            catchment_path = Path.work_path + '/' + mode + '/' + str(Output.Catchment_ID[kk]) + '/'
-            run_path =  catchment_path + '/run/'    # The path for model runs
-            # link the model
-            if not os.path.exists(run_path + Path.path_EXEC):
-                os.symlink(Path.model_path + Path.path_EXEC, run_path + Path.path_EXEC)
-            # copy inputs
-            #shutil.copytree(Path.data_path+'spatial/', run_path+'spatial/')
-            # copy configs
-            if mode == 'SA':
-                shutil.copyfile(Path.config_path+'config_cali.ini',  run_path+'config.ini')
-            else:
-                shutil.copyfile(Path.config_path+'config_forward.ini',  run_path+'config.ini')
+        return [(catchment_ID, Path.work_path + '/' + mode + '/run/' + str(catchment_ID) + '/run/') for catchment_ID in catchment_list]
+    return [(catchment_ID, Path.work_path + '/' + mode + '/' + str(catchment_ID) + '/run/') for catchment_ID in Output.Catchment_ID]
+
+
+def set_env(mode, Path, nchains, Output, catchment_list=None):
+    for catchment_ID, run_path in get_run_paths(mode, Path, nchains, Output, catchment_list):
+        if mode == 'DREAM_cali' or mode == 'cali_sep':
+            # Clean the run path
+            if os.path.exists(run_path):
+                shutil.rmtree(run_path)
+            os.mkdir(run_path)
+        # link the model
+        if not os.path.exists(run_path + Path.path_EXEC):
+            os.symlink(Path.model_path + Path.path_EXEC, run_path + Path.path_EXEC)
+        # copy inputs
+        #shutil.copytree(Path.data_path+'catchment_info/'+str(catchment_ID)+'/spatial/', run_path+'spatial/')
+        # render configs
+        write_if_changed(run_path+'config.ini', render_config(*get_config(mode, Path, catchment_ID)))
 
 
 def set_config(mode, Path, Cali, Output, catchment_list=None):
-    if mode == 'DREAM_cali' or mode == 'cali_sep':
-        for i in range(Cali.nchains):
-            dir_for_each_chain = Path.work_path + '/chain_' +str(i) + '/'    # Working directory for each chain
-            for kk in range(Output.N_catchments):
-                catchment_path = dir_for_each_chain + str(Output.Catchment_ID[kk]) + '/'   # Working directory for each catchment
-                run_path =  catchment_path + '/run/'        # The path for model runs
-                with open(run_path+'config.ini', 'r') as f:
-                    lines = np.array(f.readlines())
-                    lines = np.append('Clim_Maps_Folder = ' + Path.data_path + 'catchment_info/cali/'+str(Output.Catchment_ID[kk])+'/climate/\n', lines)
-                    lines = np.append('Maps_Folder = ' + Path.data_path + 'catchment_info/cali/'+str(Output.Catchment_ID[kk])+'/spatial/\n', lines)
-                    seconds_since_1980 = np.loadtxt( Path.data_path + 'catchment_info/cali/'+str(Output.Catchment_ID[kk])+'/obs/seconds_from_1980.txt')
-                    lines = np.append('Simul_end = '+str(int(seconds_since_1980))+' # in second  # Seconds from 1980-1-1 to 2024-12-31\n', lines)
-
-                with open(run_path+'config.ini', 'w') as f:
-                    f.writelines(lines)
-    elif mode == 'forward_all':
-        if catchment_list is None:
-            catchment_list = Output.Catchment_ID
-        for catchment_ID in catchment_list:
-            catchment_path = Path.work_path + '/' + mode + '/run/' + str(catchment_ID) + '/'
-            run_path =  catchment_path + '/run/'    # The path for model runs
-            with open(run_path+'config.ini', 'r') as f:
-                lines = np.array(f.readlines())
-
-                #lines = np.append('Maps_Folder = ' + Path.data_path + 'catchment_info/forward/'+str(Output.Catchment_ID[kk])+'/spatial/\n', lines)
-                #lines = np.append('Clim_Maps_Folder = ' + Path.data_path + 'catchment_info/forward/'+str(Output.Catchment_ID[kk])+'/climate/\n', lines)
-                lines = np.append('Maps_Folder = ' + Path.data_path + 'catchment_info/forward/'+str(catchment_ID)+'/spatial/\n', lines) # todo
-                lines = np.append('Clim_Maps_Folder = ' + Path.data_path + 'catchment_info/forward/'+str(catchment_ID)+'/climate/\n', lines)
-                for line in lines:
-                    if 'path_EXEC = ' in line:
-                        lines[i] = "    path_EXEC = 'gEcoHydro_forward'\n"
-
-                if mode == 'SA':
-                    seconds_since_1980 = np.loadtxt( Path.data_path + 'catchment_info/cali/'+str(catchment_ID)+'/obs/seconds_from_1980.txt')
-                    lines = np.append('Simul_end = '+str(int(seconds_since_1980))+' # in second  # Seconds from 1980-1-1 to 2024-12-31\n', lines)
-            with open(run_path+'config.ini', 'w') as f:
-                f.writelines(lines)
-    
-    else:
-        for kk in range(Output.N_catchments):
-            catchment_path = Path.work_path + '/' + mode + '/' + str(Output.Catchment_ID[kk]) + '/'
-            run_path =  catchment_path + '/run/'    # The path for model runs
-            with open(run_path+'config.ini', 'r') as f:
-                lines = np.array(f.readlines())
-
-                #lines = np.append('Maps_Folder = ' + Path.data_path + 'catchment_info/forward/'+str(Output.Catchment_ID[kk])+'/spatial/\n', lines)
-                #lines = np.append('Clim_Maps_Folder = ' + Path.data_path + 'catchment_info/forward/'+str(Output.Catchment_ID[kk])+'/climate/\n', lines)
-                lines = np.append('Maps_Folder = ' + Path.data_path + 'catchment_info/cali/'+str(Output.Catchment_ID[kk])+'/spatial/\n', lines) # todo
-                lines = np.append('Clim_Maps_Folder = ' + Path.data_path + 'catchment_info/cali/'+str(Output.Catchment_ID[kk])+'/climate/\n', lines)
-                if mode == 'SA':
-                    seconds_since_1980 = np.loadtxt( Path.data_path + 'catchment_info/cali/'+str(Output.Catchment_ID[kk])+'/obs/seconds_from_1980.txt')
-                    lines = np.append('Simul_end = '+str(int(seconds_since_1980))+' # in second  # Seconds from 1980-1-1 to 2024-12-31\n', lines)
-            with open(run_path+'config.ini', 'w') as f:
-                f.writelines(lines)  
+    # The configs are rendered from the base configs, so calling this again leaves the run folders unchanged
+    for catchment_ID, run_path in get_run_paths(mode, Path, Cali.nchains, Output, catchment_list):
+        write_if_changed(run_path+'config.ini', render_config(*get_config(mode, Path, catchment_ID)))
 
 def get_restart_param(Path, Cali, param_N, total_iterations):
     starts = []
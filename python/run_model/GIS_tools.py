@@ -1,14 +1,40 @@
-
-
-def from_catchment_to_EU(upper_left_coord, mask_small, arr_large, arr_small):
-
-    # upper_left_coord: Coordinates of upper left corner [row, col]
-    # mask: mask != nodata will be regarded as valid grid cells
-    # arr_large: European raster
-    # arr_small: catchment raster
-
-    for r in range(mask_small.shape[0]):
-        for c in range(mask_small.shape[1]):
-            if mask_small[r,c]:
-                arr_large[r + upper_left_coord[0], c + upper_left_coord[1]] = arr_small[r,c]
-    return arr_large
\ No newline at end of file
+import numpy as np
+
+
+def from_catchment_to_EU(upper_left_coord, mask_small, arr_large, arr_small):
+
+    # upper_left_coord: Coordinates of upper left corner [row, col]
+    # mask: mask != nodata will be regarded as valid grid cells
+    # arr_large: European raster
+    # arr_small: catchment raster
+
+    r0, c0 = int(upper_left_coord[0]), int(upper_left_coord[1])
+    window = arr_large[r0:r0 + mask_small.shape[0], c0:c0 + mask_small.shape[1]]
+    window[mask_small] = np.asarray(arr_small)[mask_small]
+    return arr_large
+
+
+class Mosaic:
+    """Paste catchment rasters into the European grid.
+    The window (offset and shape) and the valid cell mask of each catchment are read once and reused for all variables."""
+    def __init__(self, catchment_path, nodata=-9999):
+        # catchment_path: folder with one <catchment_ID>/spatial/ subfolder per catchment
+        self.catchment_path = catchment_path
+        self.nodata = nodata
+        self.windows = {}
+
+    def window(self, catchment_ID):
+        if catchment_ID not in self.windows:
+            spatial_path = self.catchment_path + str(catchment_ID) + '/spatial/'
+            r0, c0 = np.loadtxt(spatial_path + 'upper_left_coord.txt').astype(np.int64)
+            mask_small = np.loadtxt(spatial_path + 'dem.asc', skiprows=6) != self.nodata
+            self.windows[catchment_ID] = ((slice(r0, r0 + mask_small.shape[0]), slice(c0, c0 + mask_small.shape[1])), mask_small)
+        return self.windows[catchment_ID]
+
+    def shape(self, catchment_ID):
+        return self.window(catchment_ID)[1].shape
+
+    def paste(self, arr_large, catchment_ID, arr_small):
+        slices, mask_small = self.window(catchment_ID)
+        arr_large[slices][mask_small] = np.asarray(arr_small)[mask_small]
+        return arr_large
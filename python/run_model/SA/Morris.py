@@ -17,38 +17,23 @@ def AAT_sampling(xmins, xmaxs, xdistribution, nsample):
 
 # One at a time sampling
 def OAT_sampling(xmins, xmaxs, xdistribution, nsample, des_type):
-    from numpy.matlib import repmat
 
     nparam = len(xmins)
 
     X_AAT = AAT_sampling(xmins, xmaxs, xdistribution, 2*nsample)  # dim = nsample*2, nparam
-    
-    X = np.full((nsample*(nparam+1), nparam), np.nan)
-
-    counter = 0
-    for i in range(nsample):  # repeat for nsample times
-        a = X_AAT[i*2, :]
-        b = X_AAT[i*2+1, :]
-        
-        X[counter, :] = a
-        counter += 1
-
-        x = repmat(a, nparam, 1) # dim = nparam, nparam; repeat base array a for M times (pertubate M times later - once for each param)
-
-        if des_type == 'radial':
-            for j in range(nparam):
-                x[j, j] = b[j]
-                X[counter, :] = x[j, :]
-                counter += 1
-
-        elif des_type == 'trajectory':
-            for j in range(nparam):
-                x[j, 0:j+1] = b[0:j+1]
-                X[counter, :] = x[j, :]
-                counter += 1
-        else:
-            raise ValueError('"des_type" must be one among ["radial", "trajectory"]')
-        
+    a = X_AAT[0::2, :]  # base points
+    b = X_AAT[1::2, :]  # perturbed points
+
+    if des_type == 'radial':
+        pertub = np.eye(nparam, dtype=bool)  # row j: only param j is perturbed
+    elif des_type == 'trajectory':
+        pertub = np.tri(nparam, dtype=bool)  # row j: params 0..j are perturbed
+    else:
+        raise ValueError('"des_type" must be one among ["radial", "trajectory"]')
+
+    x = np.where(pertub[None, :, :], b[:, None, :], a[:, None, :])  # dim = nsample, nparam, nparam
+    X = np.concatenate([a[:, None, :], x], axis=1).reshape(nsample*(nparam+1), nparam)
+
     return X
 
 # Calculate the Morris indices
@@ -60,44 +45,39 @@ def EE_indices(nsample, xmins, xmaxs, X, Y, design_type, filterPercentage):
     """
 
     nparam = len(xmins)
-
-    EE = np.full((nsample, nparam), np.nan)
-    k = 0
-    ki = 0
-
-    for i in range(nsample):
-        for j in range(nparam):
-            if design_type == 'radial':
-                EE[i, j] = (Y[k+1]-Y[ki]) / (X[k+1, j]-X[ki, j]) * (xmaxs[j] - xmins[j])
-            elif design_type == 'trajectory':
-                idx = abs(X[k+1, :]-X[k, :]) > 0
-                if sum(idx) != 1:
-                    raise ValueError('X[%d,:] and X[%d,:] differ in more ' % (k, k+1) +
-                                     'than one component, or are equivalent')
-                EE[i, idx] = (Y[k+1]-Y[k]) / (X[k+1, idx]-X[k, idx]) * (xmaxs[idx] - xmins[idx])
-
-            else:
-                raise ValueError('"design_type" must be one among ["radial",  "trajectory"]')
-
-            k += 1
-        k += 1
-        ki += k
-    
+    xrange = np.asarray(xmaxs) - np.asarray(xmins)
+
+    X = np.asarray(X)[:nsample*(nparam+1)].reshape(nsample, nparam+1, nparam)
+    Y = np.asarray(Y)[:nsample*(nparam+1)].reshape(nsample, nparam+1)
+
+    if design_type == 'radial':
+        # Each row is compared to the base point of its block
+        dX = np.diagonal(X[:, 1:, :] - X[:, :1, :], axis1=1, axis2=2)  # dim = nsample, nparam
+        EE = (Y[:, 1:] - Y[:, :1]) / dX * xrange
+    elif design_type == 'trajectory':
+        # Each row is compared to the previous row, which differs in exactly one param
+        dX = np.diff(X, axis=1)  # dim = nsample, nparam (steps), nparam
+        changed = np.abs(dX) > 0
+        if np.any(np.sum(changed, axis=2) != 1):
+            i, s = np.argwhere(np.sum(changed, axis=2) != 1)[0]
+            k = i * (nparam+1) + s
+            raise ValueError('X[%d,:] and X[%d,:] differ in more ' % (k, k+1) +
+                             'than one component, or are equivalent')
+        idx = np.argmax(changed, axis=2)  # param changed at each step
+        EE = np.full((nsample, nparam), np.nan)
+        rows = np.repeat(np.arange(nsample)[:, None], nparam, axis=1)
+        EE[rows, idx] = np.diff(Y, axis=1) / np.take_along_axis(dX, idx[:, :, None], axis=2)[:, :, 0] * xrange[idx]
+    else:
+        raise ValueError('"design_type" must be one among ["radial",  "trajectory"]')
 
     # exclude the abnormal sets
     filteredIDX = int(filterPercentage * EE.shape[0])
     if filteredIDX==0:
         EE_filtered = EE
     else:
-        dim_tmp = EE.shape[0] - filteredIDX*2
-        
-        EE_filtered = np.full((dim_tmp, EE.shape[1]), np.nan)
-
-        for i in range(EE.shape[1]):        
-            idx_tmp = np.argsort(EE[:,i])[filteredIDX:-filteredIDX]
-            EE_filtered[:, i] = EE[idx_tmp, i]
+        EE_filtered = np.sort(EE, axis=0)[filteredIDX:-filteredIDX, :]
 
     mi = np.nanmean(abs(EE_filtered), axis=0) # mean absolute value of EE (excluding NaNs)
     sigma = np.nanstd(EE_filtered, axis=0) # std of EE (excluding NaNs)
       
-    return mi, sigma, EE_filtered
\ No newline at end of file
+    return mi, sigma, EE_filtered
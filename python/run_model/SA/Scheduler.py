@@ -0,0 +1,83 @@
+import os
+import numpy as np
+from mpi4py import MPI
+
+
+# Master/worker scheduling of independent model runs over MPI ranks
+# Rank 0 hands out one task at a time to the first idle worker, so that slow runs do not hold back the others
+# Every finished task is appended to a progress file as (task, result); tasks found in it are skipped when the job is restarted
+# An optional callback(task, result) on rank 0 sees every result as it arrives (including the ones of a restarted job) and may stop the job by returning True
+
+TAG_TASK = 1
+TAG_RESULT = 2
+
+
+def load_progress(progress_fname, ntask):
+    # Results of the finished tasks (nan for the others) and the mask of finished tasks
+    results = np.full(ntask, np.nan)
+    done = np.full(ntask, False)
+    if os.path.exists(progress_fname):
+        records = np.fromfile(progress_fname)
+        records = records[:records.size//2*2].reshape(-1, 2)  # drop an incomplete record of a crashed job
+        idx = records[:, 0].astype(np.int64)
+        results[idx] = records[:, 1]
+        done[idx] = True
+    return results, done
+
+
+def _save_progress(f, task, result):
+    np.array([task, result], dtype=np.float64).tofile(f)
+    f.flush()
+
+
+def run_tasks(comm, ntask, run_task, progress_fname, callback=None):
+    """Run run_task(task) -> float for all tasks in range(ntask).
+    With a single rank, rank 0 runs all tasks itself; otherwise rank 0 only schedules.
+    Returns the results of all tasks on rank 0 (nan for the tasks not run after a stop) and None on the other ranks."""
+    rank = comm.Get_rank()
+    size = comm.Get_size()
+
+    if rank == 0:
+        results, done = load_progress(progress_fname, ntask)
+        todo = [int(task) for task in np.flatnonzero(~done)]
+        print('Tasks finished : ' + str(np.sum(done)) + '   to run : ' + str(len(todo)), flush=True)
+
+        stop = False
+        if callback is not None:
+            for task in np.flatnonzero(done):
+                stop = callback(int(task), results[task]) or stop
+        if stop:
+            todo = []
+
+        with open(progress_fname, 'ab') as f:
+            if size == 1:
+                for task in todo:
+                    results[task] = run_task(task)
+                    _save_progress(f, task, results[task])
+                    if callback is not None and callback(task, results[task]):
+                        break
+                return results
+
+            status = MPI.Status()
+            nworker = size - 1
+            while nworker > 0:
+                message = comm.recv(source=MPI.ANY_SOURCE, tag=TAG_RESULT, status=status)
+                if message is not None:
+                    task, result = message
+                    results[task] = result
+                    _save_progress(f, task, result)
+                    if callback is not None and callback(task, result):
+                        todo = []
+                task = todo.pop(0) if len(todo) > 0 else None
+                comm.send(task, dest=status.Get_source(), tag=TAG_TASK)
+                if task is None:
+                    nworker -= 1
+        return results
+
+    else:
+        comm.send(None, dest=0, tag=TAG_RESULT)  # ready
+        while True:
+            task = comm.recv(source=0, tag=TAG_TASK)
+            if task is None:
+                return None
+            comm.send((task, run_task(task)), dest=0, tag=TAG_RESULT)
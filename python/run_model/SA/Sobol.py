@@ -0,0 +1,96 @@
+import numpy as np
+from SA import Morris
+
+
+# Variance-based sensitivity (Sobol first-order and total-order indices)
+# Samples are arranged in blocks of nparam+2 rows: A, B, AB_1, ..., AB_nparam, where AB_j is A with param j taken from B
+# Estimators: Saltelli et al. (2010) for the first order, Jansen (1999) for the total order
+
+# Saltelli sampling
+def Saltelli_sampling(xmins, xmaxs, xdistribution, nsample):
+
+    nparam = len(xmins)
+
+    # A and B are two independent Latin hypercube samples
+    X_AAT = Morris.AAT_sampling(np.concatenate([xmins, xmins]), np.concatenate([xmaxs, xmaxs]), np.concatenate([xdistribution, xdistribution]), nsample)
+    a = X_AAT[:, :nparam]
+    b = X_AAT[:, nparam:]
+
+    pertub = np.eye(nparam, dtype=bool)  # row j: only param j is taken from B
+    ab = np.where(pertub[None, :, :], b[:, None, :], a[:, None, :])  # dim = nsample, nparam, nparam
+    X = np.concatenate([a[:, None, :], b[:, None, :], ab], axis=1).reshape(nsample*(nparam+2), nparam)
+
+    return X
+
+
+class SobolEstimator:
+    """Streaming Sobol indices. Results can be added in any order (add); a block enters the estimates once all its rows are known.
+    Blocks with non-finite results (failed runs) are skipped."""
+    def __init__(self, nparam):
+        self.nparam = nparam
+        self.partial = {}   # incomplete blocks
+        self.blocks = []    # complete blocks, kept for the bootstrap
+        self.n = 0
+        self.nskip = 0
+        self.sum_f = 0.0
+        self.sum_f2 = 0.0
+        self.sum_S = np.zeros(nparam)
+        self.sum_ST = np.zeros(nparam)
+
+    def add(self, row, y):
+        i, k = divmod(row, self.nparam+2)
+        block = self.partial.setdefault(i, np.full(self.nparam+2, np.nan))
+        block[k] = y
+        if np.sum(~np.isnan(block)) == self.nparam+2:
+            self._update(self.partial.pop(i))
+
+    def _update(self, y):
+        if not np.all(np.isfinite(y)):
+            self.nskip += 1
+            return
+        fA, fB, fAB = y[0], y[1], y[2:]
+        self.n += 1
+        self.sum_f += fA + fB
+        self.sum_f2 += fA**2 + fB**2
+        self.sum_S += fB * (fAB - fA)
+        self.sum_ST += (fA - fAB)**2
+        self.blocks.append(y)
+
+    def indices(self):
+        # First-order (S) and total-order (ST) indices of each param
+        if self.n < 2:
+            return np.full(self.nparam, np.nan), np.full(self.nparam, np.nan)
+        V = self.sum_f2 / (2*self.n) - (self.sum_f / (2*self.n))**2
+        return self.sum_S / self.n / V, 0.5 * self.sum_ST / self.n / V
+
+    def bootstrap(self, nboot=500, alpha=0.05, seed=None):
+        # Bootstrap confidence intervals of S and ST, each as (2, nparam): lower and upper bounds
+        if self.n < 2:
+            ci = np.full((2, self.nparam), np.nan)
+            return ci, ci.copy()
+        Y = np.array(self.blocks)
+        rng = np.random.default_rng(seed)
+        S = np.full((nboot, self.nparam), np.nan)
+        ST = np.full((nboot, self.nparam), np.nan)
+        nchunk = max(1, int(2**24 // (self.n * self.nparam)))  # resamples per chunk, to bound the memory
+        for k in range(0, nboot, nchunk):
+            idx = rng.integers(0, self.n, (min(nchunk, nboot-k), self.n))
+            fA, fB, fAB = Y[idx, 0], Y[idx, 1], Y[idx, 2:]  # dim = nchunk, n (, nparam)
+            V = np.var(np.concatenate([fA, fB], axis=1), axis=1)[:, None]
+            S[k:k+idx.shape[0]] = np.mean(fB[:, :, None] * (fAB - fA[:, :, None]), axis=1) / V
+            ST[k:k+idx.shape[0]] = 0.5 * np.mean((fA[:, :, None] - fAB)**2, axis=1) / V
+        q = [100*alpha/2, 100*(1-alpha/2)]
+        return np.nanpercentile(S, q, axis=0), np.nanpercentile(ST, q, axis=0)
+
+    def converged(self, tol, nmin=10, **kwargs):
+        # True once the widest confidence interval of all indices is below tol
+        if self.n < nmin:
+            return False
+        S_ci, ST_ci = self.bootstrap(**kwargs)
+        return np.nanmax([np.max(S_ci[1]-S_ci[0]), np.max(ST_ci[1]-ST_ci[0])]) < tol
+
+    def save(self, fname, **kwargs):
+        S, ST = self.indices()
+        S_ci, ST_ci = self.bootstrap(**kwargs)
+        header = 'blocks = %d  skipped = %d\nS S_low S_high ST ST_low ST_high' % (self.n, self.nskip)
+        np.savetxt(fname, np.column_stack([S, S_ci[0], S_ci[1], ST, ST_ci[0], ST_ci[1]]), header=header)
@@ -8,6 +8,8 @@ from mpi4py import MPI
 import os
 import numpy as np
 from SA import Morris
+from SA import Scheduler
+from SA import Sobol
 import GEM_tools
 
 
@@ -18,6 +20,12 @@ parser.add_option("--catchment_ID",dest="catchment_ID",metavar="catchment_ID",
                   help="Switch ('DREAM_cali','test')")
 parser.add_option("--def_py",dest="def_py",metavar="def_py",
                   help="Configuration file for GEM Protocol")
+parser.add_option("--method",dest="method",metavar="method",default="Morris",
+                  help="Switch ('Morris','Sobol')")
+parser.add_option("--nsample",dest="nsample",metavar="nsample",type="int",default=50,
+                  help="Number of trajectories (Morris) or Saltelli blocks (Sobol)")
+parser.add_option("--tol",dest="tol",metavar="tol",type="float",default=0.0,
+                  help="Sobol: stop once all confidence intervals are narrower than tol (0: run all samples)")
 (options, args) = parser.parse_args()
 
 mode = 'SA'
@@ -45,20 +53,39 @@ param_N = GEM_tools.get_param_N(Info, Param)
 catchment_ID = str(options.catchment_ID)
 
 # === Preprocessing (only rank 0) ===
+save_path = Path.work_path + mode + '/outputs/SA/' + catchment_ID + '/'
+if options.method == 'Sobol':
+    save_path += 'Sobol/'
+progress_fname = save_path + 'likeli_progress.bin'
 if rank == 0:
     os.chdir('/home/wusongj/GEM/GEM_generic_ecohydrological_model/python/development')
     os.system('python3 develop.py')
     GEM_tools.sort_directory(mode, Path, Cali, Output)
     GEM_tools.set_env(mode, Path, Cali, Output)
     GEM_tools.set_config(mode, Path, Cali, Output)
-    params = Morris.OAT_sampling(
-        xmins=np.full(param_N, 0.0),
-        xmaxs=np.full(param_N, 1.0),
-        xdistribution=np.full(param_N, 'uniform'),
-        nsample=50,
-        des_type='trajectory'
-    )
-    os.makedirs(Path.work_path + mode + '/outputs/SA/' + catchment_ID + '/', exist_ok=True)
+    os.makedirs(save_path, exist_ok=True)
+    if os.path.exists(progress_fname) and os.path.exists(save_path + 'param.bin'):
+        # Resume a crashed job with the same samples
+        params = np.fromfile(save_path + 'param.bin').reshape(-1, param_N)
+    else:
+        if options.method == 'Sobol':
+            params = Sobol.Saltelli_sampling(
+                xmins=np.full(param_N, 0.0),
+                xmaxs=np.full(param_N, 1.0),
+                xdistribution=np.full(param_N, 'uniform'),
+                nsample=options.nsample
+            )
+        else:
+            params = Morris.OAT_sampling(
+                xmins=np.full(param_N, 0.0),
+                xmaxs=np.full(param_N, 1.0),
+                xdistribution=np.full(param_N, 'uniform'),
+                nsample=options.nsample,
+                des_type='trajectory'
+            )
+        params.tofile(save_path + 'param.bin')
+        if os.path.exists(progress_fname):
+            os.remove(progress_fname)
 else:
     params = None
 
@@ -68,18 +95,13 @@ if os.path.exists(run_path):
     shutil.rmtree(run_path)
 shutil.copytree(Path.work_path + mode + '/' + str(catchment_ID) + '/run/', run_path)
 
-
-# Divide param jobs by rank
-param_indices = list(range(len(params)))
-local_indices = [i for i in param_indices if i % size == rank]
-local_likelihood = []
-
 Output.Catchment_ID = np.char.strip(np.char.replace(np.array(Output.Catchment_ID).astype(str), "'", ''))
 kk = np.where(Output.Catchment_ID == catchment_ID)[0][0]
 print(kk, flush=True)
 
-# === Loop through the assigned parameter for each rank ===
-for gg in local_indices:
+
+def run_param(gg):
+    # Likelihood of the parameter set gg
     param = params[gg]
     GEM_tools.gen_param(run_path, Info, Param, param)
     GEM_tools.gen_no3_addtion(run_path, Info)
@@ -112,16 +134,28 @@ for gg in local_indices:
             err += (1 - GEM_tools.kge_modified(sim, obs)) * dict['weights'][kk][i] * len(Output.Catchment_ID)
 
     log_err = -np.inf if np.isnan(err) else np.log(err) * (-100)
-    local_likelihood.append((gg, log_err))
-    #print(f"[Rank {rank}] Param {gg} Likelihood: {log_err:.2f}", gg, len(local_indices), flush=True)
+    #print(f"[Rank {rank}] Param {gg} Likelihood: {log_err:.2f}", flush=True)
+    return log_err
+
+
+# === Sobol: indices are updated as results arrive; partial results are saved every 10 blocks ===
+callback = None
+if options.method == 'Sobol' and rank == 0:
+    estimator = Sobol.SobolEstimator(param_N)
+
+    def callback(task, result):
+        n = estimator.n + estimator.nskip
+        estimator.add(task, result)
+        if estimator.n + estimator.nskip == n or estimator.n % 10 != 0:
+            return False
+        estimator.save(save_path + 'sobol_indices.txt')
+        return options.tol > 0 and estimator.converged(options.tol)
+
 
-# === Gather results across ranks ===
-gathered = comm.gather(local_likelihood, root=0)
+# === Run all parameter sets; idle ranks get the next set from rank 0 ===
+full_likelihood = Scheduler.run_tasks(comm, len(params), run_param, progress_fname, callback)
 
 if rank == 0:
-    full_likelihood = np.full(len(params), -np.inf)
-    for group in gathered:
-        for idx, val in group:
-            full_likelihood[idx] = val
-    full_likelihood.tofile(Path.work_path + mode + '/outputs/SA/' + catchment_ID + '/likeli.bin')
-    params.tofile(Path.work_path + mode + '/outputs/SA/' + catchment_ID + '/param.bin')
+    full_likelihood.tofile(save_path + 'likeli.bin')
+    if options.method == 'Sobol':
+        estimator.save(save_path + 'sobol_indices.txt')
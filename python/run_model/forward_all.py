@@ -1,5 +1,7 @@
 import os
+import json
 import shutil
+import subprocess
 import GEM_tools
 import sys
 from optparse import OptionParser
@@ -10,47 +12,88 @@ import post_plot
 import GIS_tools
 from def_GEM import *
 
-def foward_run(catchment_list, chainID_list):
+# Forward runs of all chains x catchments
+# Task table (outputs/cali/task_table.json): status of each <catchment>/<chainID> task ('running', 'done' or 'failed')
+# Finished tasks are not run again; tasks left 'running' by an interrupted job and failed tasks are run again
+# Each task runs in its own scratch copy of the catchment run folder, so that tasks of the same catchment never share param.ini or outputs
+
+def load_task_table(table_fname):
+    if os.path.exists(table_fname):
+        with open(table_fname) as f:
+            return json.load(f)
+    return {}
+
+def save_task_table(table, table_fname):
+    # Write to a temporary file first, so that an interruption never leaves a broken table
+    with open(table_fname + '.tmp', 'w') as f:
+        json.dump(table, f, indent=1)
+    os.replace(table_fname + '.tmp', table_fname)
+
+
+def foward_run(catchment_list, chainID_list, processes=40):
 
     nchains = 40
-    replace = True
 
     # Model structure update
     os.chdir('/home/wusongj/GEM/GEM_generic_ecohydrological_model/python/development')
     os.system('python3 develop.py')  # todo
+    os.chdir(current_path)
     param_N = GEM_tools.get_param_N(Info, Param)
     _param = np.fromfile('/data/scratch/wusongj/paper4/cali/best_param_all.bin').reshape(nchains,-1)
 
+    table_fname = Path.work_path + mode + '/outputs/cali/task_table.json'
+    os.makedirs(os.path.dirname(table_fname), exist_ok=True)
+    table = load_task_table(table_fname)
 
-    
-
+    tasks = []
     for chainID in chainID_list:
-        tasks = []
-        param = _param[chainID, :]
         for catchment_ID in catchment_list:
+            key = str(catchment_ID) + '/' + str(chainID)
+            if table.get(key, {}).get('status') == 'done':
+                continue
             run_path = Path.work_path + mode + '/run/' + str(catchment_ID) + '/run/'
+            scratch_path = Path.work_path + mode + '/run/' + str(catchment_ID) + '/scratch/' + str(chainID) + '/'
             save_path = Path.work_path + mode + '/outputs/cali/' + str(catchment_ID) + '/' + str(chainID) + '/'
-            tasks.append((catchment_ID, run_path, save_path, param.copy()))
-        # Use multiprocessing pool to run in parallel
-        with Pool(processes=min(cpu_count(), 40)) as pool:
-            pool.starmap(foward_run_parallel, tasks)
-
-def foward_run_parallel(catchment_ID, run_path, save_path, param):
-    # set the env
-    #GEM_tools.sort_directory(mode, Path, Cali, Output, catchment_list=catchment_list)
-    #GEM_tools.set_env(mode, Path, Cali, Output, catchment_list=catchment_list)
-    #GEM_tools.set_config(mode, Path, Cali, Output, catchment_list=catchment_list)  
-    if os.path.exists(save_path):
-        shutil.rmtree(save_path)
-    os.makedirs(save_path, exist_ok=True)
-    GEM_tools.gen_param(run_path, Info, Param, param)
-    GEM_tools.gen_no3_addtion(run_path, Info)
-    # Model run
-    os.chdir(run_path)           
-    os.system('./gEcoHydro')
-    os.chdir(current_path)
-    # Save outputs for each catchment
-    GEM_tools.save_outputs(run_path+'outputs/', save_path)
+            tasks.append((key, run_path, scratch_path, save_path, _param[chainID, :].copy()))
+            table[key] = {'status':'running', 'start':time.time()}
+    save_task_table(table, table_fname)
+    print('Forward runs to do : ' + str(len(tasks)) + '   already done : ' + str(len(table) - len(tasks)), flush=True)
+
+    # One pool for all tasks; the table is updated as soon as a task finishes
+    if len(tasks) > 0:
+        with Pool(processes=min(cpu_count(), processes, len(tasks))) as pool:
+            for key, status, message in pool.imap_unordered(foward_run_parallel, tasks):
+                table[key].update({'status':status, 'end':time.time(), 'message':message})
+                save_task_table(table, table_fname)
+                if status == 'failed':
+                    print(key, '  went wrong!', message, flush=True)
+
+    failed = [key for key in table if table[key]['status'] == 'failed']
+    print('Forward runs failed : ' + str(len(failed)), flush=True)
+
+def foward_run_parallel(task):
+    key, run_path, scratch_path, save_path, param = task
+    try:
+        # Scratch copy of the run folder (the model is a symlink, outputs are created empty)
+        if os.path.exists(scratch_path):
+            shutil.rmtree(scratch_path)
+        shutil.copytree(run_path, scratch_path, symlinks=True, ignore=shutil.ignore_patterns('outputs'))
+        os.makedirs(scratch_path + 'outputs/', exist_ok=True)
+        GEM_tools.gen_param(scratch_path, Info, Param, param)
+        GEM_tools.gen_no3_addtion(scratch_path, Info)
+        # Model run
+        returncode = subprocess.run('./gEcoHydro', cwd=scratch_path, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode
+        if returncode != 0:
+            return key, 'failed', 'gEcoHydro exit code ' + str(returncode)
+        # Save outputs for each catchment
+        if os.path.exists(save_path):
+            shutil.rmtree(save_path)
+        os.makedirs(save_path, exist_ok=True)
+        GEM_tools.save_outputs(scratch_path+'outputs/', save_path, store=True, float32=True)
+        shutil.rmtree(scratch_path)
+    except Exception as e:
+        return key, 'failed', repr(e)
+    return key, 'done', ''
 
 
 def forward_post_performance(mode, catchment_list):
@@ -7,6 +7,7 @@ import numpy as np
 import time
 import post_plot
 import GIS_tools
+import GEM_aggregate
 
 
 
@@ -493,7 +494,7 @@ elif mode == 'forward_sep':
             os.chdir(current_path)
 
             # Save outputs for each catchment
-            GEM_tools.save_outputs(run_path+'outputs/', Path.work_path + mode +'/outputs/cali_sep/' + catchment_ID + '/')
+            GEM_tools.save_outputs(run_path+'outputs/', Path.work_path + mode +'/outputs/cali_sep/' + catchment_ID + '/', run_id=chainID)
             # Plot performance
 
         param_all.tofile(Path.work_path + mode +'/outputs/cali_sep/' + catchment_ID + '/param.bin')
@@ -572,7 +573,7 @@ elif mode == 'forward_cross':
             os.chdir(current_path)
 
             # Save outputs for each catchment
-            GEM_tools.save_outputs(run_path+'outputs/', Path.work_path + mode +'/outputs/cali_sep_cross/' + catchment_ID + '/')
+            GEM_tools.save_outputs(run_path+'outputs/', Path.work_path + mode +'/outputs/cali_sep_cross/' + catchment_ID + '/', run_id=kk)
         """
         post_plot.plot_performance_all(Path.work_path + mode +'/outputs/cali_sep_cross/' + catchment_ID + '/','/data/scratch/wusongj/paper4/data/catchment_info/cali/'+catchment_ID+'/obs/',
                                        Path.work_path+'/plots/', catchment_ID, param_all.shape[0], plot_each_chain=True)
@@ -670,12 +671,10 @@ elif mode == 'bbb':
     fnames = [f for f in os.listdir(output_path) if '_map.bin' in f]
 
     ref_data = np.loadtxt(ref_asc, skiprows=6)
+    data = GEM_aggregate.aggregate_files([output_path + fname for fname in fnames], ref_data.shape, 'mean', start=2, nodata=None, fill=-9999)
     for fname in fnames:
-        print(fname)
-        data = np.fromfile(output_path + fname).reshape(-1, ref_data.shape[0], ref_data.shape[1])
-        data = np.mean(data[2:,:,:], axis=0)
         print(output_path+fname.split('.')[0]+'.asc')
-        GEM_tools.create_asc(data, output_path+fname.split('.')[0]+'.asc', ref_asc)
+        GEM_tools.create_asc(data[output_path + fname], output_path+fname.split('.')[0]+'.asc', ref_asc)
 
 
     pass
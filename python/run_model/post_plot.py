@@ -5,6 +5,8 @@ from def_GEM import Path, Info, Cali, Param, Output
 import GEM_tools
 import pandas as pd
 import GIS_tools
+import GEM_aggregate
+import GEM_store
 
 
 nodata = Info.nodata
@@ -38,6 +40,124 @@ def IMGtoVideo(save_path, plot_path, output_name):
     cv2.destroyAllWindows()
 
 
+_animation = {}
+
+def _init_animation(output_path, spatial_path, Vars, ylims, weights, nrow, ncol, scale):
+    # Build the figure of a worker once; frames only update the image data
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    chanmask = np.loadtxt(spatial_path + '/chnwidth.asc', skiprows=6)
+    mask = np.full(chanmask.shape, np.nan)
+    tmp = np.loadtxt(spatial_path + '/dem.asc', skiprows=6)
+    mask[tmp>0] = 1
+
+    fig = Figure(figsize=(16,25), dpi=300)
+    FigureCanvasAgg(fig)
+    ax = fig.subplots(nrow, ncol)
+    fig.subplots_adjust(left=0.05, bottom=0.05, right=0.97, top=0.99, wspace=0.01, hspace=0.08)
+    layers = []
+    for i in range(len(Vars)):
+        values = None
+        if Vars[i] != None and os.path.exists(output_path + Vars[i] + '_map.bin'):
+            try:
+                values, index, shape = GEM_aggregate.open_map(output_path + Vars[i] + '_map.bin', mask.shape)
+            except ValueError:
+                print('Skipped (size does not match the map):    ', output_path + Vars[i] + '_map.bin')
+        if values is None:
+            ax[i//ncol, i%ncol].axis('off')
+            continue
+        ax[i//ncol, i%ncol].imshow(mask, cmap='Purples_r', alpha=0.1, zorder=0, label='1')
+        im = ax[i//ncol, i%ncol].imshow(np.full(shape, np.nan), cmap='viridis', zorder=1, label='1')
+        if ylims[i] is not None:
+            im.set_clim(ylims[i][0], ylims[i][1])
+        ax[i//ncol, i%ncol].set_frame_on(False)
+        ax[i//ncol, i%ncol].set_xticks([])
+        ax[i//ncol, i%ncol].set_yticks([])
+
+        tmp = ax[i//ncol, i%ncol].get_position()
+        fig.colorbar(im, ax=ax[i//ncol, i%ncol], cax=fig.add_axes([tmp.x1-0.02, tmp.y0+0.005, 0.01, 0.03]), format='%0.2f')
+
+        title_hgt = 1.02
+        hgt_gradient = 0.11
+        ax[i//ncol, i%ncol].text(0.05, title_hgt - hgt_gradient * 0, Vars[i], fontsize=15, weight='bold', horizontalalignment='left', verticalalignment='center', transform=ax[i//ncol, i%ncol].transAxes)
+        layers.append([im, values, index, shape, weights[i], ylims[i] is None])
+
+    _animation.update({'fig':fig, 'layers':layers, 'scale':scale})
+
+
+def _render_frames(tts):
+    import cv2
+
+    frames = []
+    fig = _animation['fig']
+    for tt in tts:
+        for im, values, index, shape, weight, autoscale in _animation['layers']:
+            if tt >= values.shape[0]:
+                # Report shorter than the animation
+                im.set_data(np.full(shape, np.nan))
+                continue
+            data = GEM_aggregate.to_raster(np.array(values[tt]), index, shape, np.nan)
+            data[data==nodata] = np.nan
+            data *= weight
+            data[data==0.0] = np.nan
+            im.set_data(data)
+            if autoscale and np.any(np.isfinite(data)):
+                im.set_clim(np.nanmin(data), np.nanmax(data))
+        fig.canvas.draw()
+        frame = cv2.cvtColor(np.asarray(fig.canvas.buffer_rgba()), cv2.COLOR_RGBA2BGR)
+        frames.append(cv2.resize(frame, (0,0), fx = _animation['scale'], fy = _animation['scale']))
+    return frames
+
+
+def animate_maps(output_path, output_name, spatial_path, Vars, ylims, weights, nrow, ncol, save_path=None, processes=None, frames_per_task=4, scale=0.5):
+    """Animate the map reports of Vars into <save_path><output_name>.mp4 (40 s long).
+    Each report is memory-mapped once per worker; workers render frames in order and the frames are written to the video without intermediate images.
+    At most two tasks per worker are in flight, so that rendered frames do not pile up when the video is written slower than it is rendered."""
+    import cv2
+    from collections import deque
+    from multiprocessing import Pool, cpu_count
+
+    save_path = output_path if save_path is None else save_path
+    video_name = save_path + output_name + '.mp4'
+    inputs = [output_path + var + '_map.bin' for var in Vars if var is not None] + [spatial_path + '/chnwidth.asc', spatial_path + '/dem.asc']
+    if GEM_aggregate.up_to_date(video_name, inputs):
+        return
+
+    shape = np.loadtxt(spatial_path + '/dem.asc', skiprows=6).shape
+    ntimestep = 0
+    for fname in inputs[:-2]:
+        if os.path.exists(fname):
+            try:
+                ntimestep = max(ntimestep, GEM_aggregate.open_map(fname, shape)[0].shape[0])
+            except ValueError:
+                pass
+    tasks = [range(tt, min(tt + frames_per_task, ntimestep)) for tt in range(0, ntimestep, frames_per_task)]
+
+    video = None
+    def write(frames):
+        nonlocal video
+        for frame in frames:
+            if video is None:
+                video = cv2.VideoWriter(video_name, cv2.VideoWriter_fourcc(*'mp4v'), ntimestep / 40, (frame.shape[1], frame.shape[0]))
+            video.write(frame)
+
+    processes = max(1, min(cpu_count() if processes is None else processes, len(tasks)))
+    with Pool(processes=processes, initializer=_init_animation, initargs=(output_path, spatial_path, Vars, ylims, weights, nrow, ncol, scale)) as pool:
+        # The oldest task is written before a new one is submitted once the window is full (frames stay in order)
+        pending = deque()
+        for task in tasks:
+            if len(pending) >= 2 * processes:
+                write(pending.popleft().get())
+            pending.append(pool.apply_async(_render_frames, (task,)))
+        while len(pending) > 0:
+            write(pending.popleft().get())
+    if video is not None:
+        video.release()
+        GEM_aggregate.record(video_name, inputs)
+        print('Video saved at:     ', video_name)
+
+
 def plot_hydrology(output_path, output_name, spatial_path, catchment_ID=None, if_average=False):
     Vars = ['canopy_storage', 'snow_depth','pond', None, None, None]
     Vars.extend(['SMC_layer1', 'SMC_layer2', 'SMC_layer3', 'vadose', 'groundwater_storage', None])
@@ -73,6 +193,13 @@ def plot_hydrology(output_path, output_name, spatial_path, catchment_ID=None, if
     nrow = 8
     ncol = 6
 
+    # The figures are only regenerated when the outputs have changed
+    figures = [output_path + output_name + '_Ts.png', output_path + output_name + '_map.png']
+    inputs = [output_path + var + '_TS.bin' for var in Vars if var is not None] + [output_path + var + '_map.bin' for var in Vars if var is not None]
+    inputs.extend([Path.data_path + 'discharge_obs.bin', spatial_path + '/chnwidth.asc', spatial_path + '/dem.asc'])
+    if not if_average and all([GEM_aggregate.up_to_date(figure, inputs) for figure in figures]):
+        return
+
 
     fig, ax = plt.subplots(nrow, ncol, figsize=(30,18), dpi=300)
     plt.subplots_adjust(left=0.05, bottom=0.05, right=0.98, top=0.99, wspace=0.2, hspace=0.2)
@@ -110,6 +237,7 @@ def plot_hydrology(output_path, output_name, spatial_path, catchment_ID=None, if
                     ax[i//ncol, i%ncol].axis('off')
         if valid_subplots>2:
             fig.savefig(output_path + output_name + '_Ts.png')
+            GEM_aggregate.record(figures[0], inputs)
         #print('Plot saved at :  ', output_path + '999_All_in_Ts.png')
 
 
@@ -129,17 +257,14 @@ def plot_hydrology(output_path, output_name, spatial_path, catchment_ID=None, if
                     tmp = tmp>0
                     mask[tmp] = 1 
         
-                    data = (np.fromfile(output_path + Vars[i] + '_map.bin').reshape(-1, mask.shape[0], mask.shape[1]))[2:, :, :] # Skip first two years
-                    data[data==nodata] = np.nan
+                    data = GEM_aggregate.cached(output_path + Vars[i] + '_map.bin', mask.shape, 'mean', start=2, nodata=nodata) # Skip first two years
                     data *= weights[i]
                     
                     print(Vars[i], data.shape, np.nanmean(data[:]))  # todo
 
                     if ('discharge' in Vars[i]) or ('_toChn' in Vars[i]) or ('chanS' in Vars[i]):
-                        for kk in range(data.shape[0]):
-                            data[kk,:,:][ ~chanmask] = np.nan
+                        data[~chanmask] = np.nan
 
-                    data = np.nanmean(data, axis=0)
                     data[data==0.0] = np.nan
 
                     ax[i//ncol, i%ncol].imshow(mask, cmap='Purples_r', alpha=0.1, zorder=0, label='1')
@@ -166,63 +291,12 @@ def plot_hydrology(output_path, output_name, spatial_path, catchment_ID=None, if
                     #ax[i//ncol, i%ncol].axis('off')
         if valid_subplots > 0:
             fig.savefig(output_path + output_name +'_map.png')
+            GEM_aggregate.record(figures[1], inputs)
             #print('Plot saved at :  ', output_path + output_name +'_Ts.png')
 
 
     else:
-        chanmask = np.loadtxt(spatial_path + '/chnwidth.asc', skiprows=6)
-        ntimestep = (np.fromfile(output_path + Vars[0] + '_map.bin').reshape(-1, chanmask.shape[0], chanmask.shape[1])).shape[0]
-        os.makedirs(output_path + 'tmp_plots_for_animation', exist_ok=True)
-        for tt in range(ntimestep):
-            fig, ax = plt.subplots(nrow, ncol, figsize=(16,25), dpi=300)
-            plt.subplots_adjust(left=0.05, bottom=0.05, right=0.97, top=0.99, wspace=0.01, hspace=0.08)
-            valid_subplots = 0
-            for i in range(len(Vars)):
-                if Vars[i] == None:
-                    pass
-                    ax[i//ncol, i%ncol].axis('off')
-                else:
-                    try:
-                        chanmask = np.loadtxt(spatial_path + '/chnwidth.asc', skiprows=6)
-                        chanmask = chanmask>0
-                        mask = np.full(chanmask.shape, np.nan)
-                        tmp = np.loadtxt(spatial_path + '/dem.asc', skiprows=6)
-                        tmp = tmp>0
-                        mask[tmp] = 1 
-                        
-                        data = (np.fromfile(output_path + Vars[i] + '_map.bin').reshape(-1, mask.shape[0], mask.shape[1]))
-                        data = data[tt, :, :]
-                        data[data==nodata] = np.nan
-                        data *= weights[i]
-                        data[data==0.0] = np.nan
-
-                        ax[i//ncol, i%ncol].imshow(mask, cmap='Purples_r', alpha=0.1, zorder=0, label='1')
-                        if ylims[i] is None:
-                            im = ax[i//ncol, i%ncol].imshow(data, cmap='viridis', zorder=1, label='1')
-                        else:
-                            im = ax[i//ncol, i%ncol].imshow(data, cmap='viridis', vmin=ylims[i][0], vmax=ylims[i][1], zorder=1, label='1')
-
-                        ax[i//ncol, i%ncol].set_frame_on(False)
-                        ax[i//ncol, i%ncol].set_xticks([])
-                        ax[i//ncol, i%ncol].set_yticks([])
-
-                        tmp = ax[i//ncol, i%ncol].get_position()
-            
-                        fig.colorbar(im, ax=ax[i//ncol, i%ncol], cax=fig.add_axes([tmp.x1-0.02, tmp.y0+0.005, 0.01, 0.03]), format='%0.2f')
-                        #fig.colorbar(im, ax=ax[i//ncol, i%ncol], cax=fig.add_axes([tmp.x1-0.02, tmp.y0+0.005, 0.01, 0.03]), format='%.0e')
-
-                        title_hgt = 1.02
-                        hgt_gradient = 0.11
-                        
-                        ax[i//ncol, i%ncol].text(0.05, title_hgt - hgt_gradient * 0, Vars[i], fontsize=15, weight='bold', horizontalalignment='left', verticalalignment='center', transform=ax[i//ncol, i%ncol].transAxes)
-                        valid_subplots += 1
-                    except Exception as e:
-                        print(Vars[i], e)
-                        ax[i//ncol, i%ncol].axis('off')
-                        pass
-            if valid_subplots > 0:
-                fig.savefig(output_path + 'tmp_plots_for_animation/' + output_name + '_' + str(int(1980+tt)) + '_map.png')
-                #print('Plot saved at :  ', output_path + output_name +'_Ts.png')
+        animate_maps(output_path, output_name, spatial_path, Vars, ylims, weights, nrow, ncol)
 
 
 def plot_tracking(output_path, output_name, spatial_path, catchment_ID=None, if_average=False):
@@ -257,6 +331,13 @@ def plot_tracking(output_path, output_name, spatial_path, catchment_ID=None, if_
     nrow = 8
     ncol = 6
 
+    # The figures are only regenerated when the outputs have changed
+    figures = [output_path + output_name + '_Ts.png', output_path + output_name + '_map.png']
+    inputs = [output_path + var + '_TS.bin' for var in Vars if var is not None] + [output_path + var + '_map.bin' for var in Vars if var is not None]
+    inputs.extend([Path.data_path + 'discharge_obs.bin', spatial_path + '/chnwidth.asc', spatial_path + '/dem.asc'])
+    if all([GEM_aggregate.up_to_date(figure, inputs) for figure in figures]):
+        return
+
 
     fig, ax = plt.subplots(nrow, ncol, figsize=(30,18), dpi=300)
     plt.subplots_adjust(left=0.05, bottom=0.05, right=0.98, top=0.99, wspace=0.2, hspace=0.2)
@@ -296,6 +377,7 @@ def plot_tracking(output_path, output_name, spatial_path, catchment_ID=None, if_
                 ax[i//ncol, i%ncol].axis('off')
     if valid_subplots > 2:
         fig.savefig(output_path + output_name + '_Ts.png')
+        GEM_aggregate.record(figures[0], inputs)
     #print('Plot saved at :  ', output_path + '999_All_in_Ts_tracking.png')
 
 
@@ -311,17 +393,15 @@ def plot_tracking(output_path, output_name, spatial_path, catchment_ID=None, if_
                 chanmask = np.loadtxt(spatial_path + '/chnwidth.asc', skiprows=6)
                 chanmask = chanmask>0
 
-                data = (np.fromfile(output_path + Vars[i] + '_map.bin').reshape(-1, chanmask.shape[0], chanmask.shape[1]))[:, :, :]
-                data[data==nodata] = np.nan
+                data = GEM_aggregate.cached(output_path + Vars[i] + '_map.bin', chanmask.shape, 'mean', nodata=nodata)
                 data *= weights[i]
                
                 if ('discharge' in Vars[i]) or ('_toChn' in Vars[i]) or ('_chanS' in Vars[i]) or ('river' in Vars[i]):
-                    for kk in range(data.shape[0]):
-                        data[kk,:,:][ ~chanmask] = np.nan
+                    data[~chanmask] = np.nan
                 if ylims[i] is not None:
-                    im = ax[i//ncol, i%ncol].imshow(np.nanmean(data, axis=0), vmin=ylims[i][0], vmax=ylims[i][1], cmap='viridis', zorder=1, label='1')
+                    im = ax[i//ncol, i%ncol].imshow(data, vmin=ylims[i][0], vmax=ylims[i][1], cmap='viridis', zorder=1, label='1')
                 else:
-                    im = ax[i//ncol, i%ncol].imshow(np.nanmean(data, axis=0), cmap='viridis', zorder=1, label='1')
+                    im = ax[i//ncol, i%ncol].imshow(data, cmap='viridis', zorder=1, label='1')
                 ax[i//ncol, i%ncol].set_frame_on(False)
                 ax[i//ncol, i%ncol].set_xticks([])
                 ax[i//ncol, i%ncol].set_yticks([])
@@ -342,6 +422,7 @@ def plot_tracking(output_path, output_name, spatial_path, catchment_ID=None, if_
             
     if valid_subplots > 0:
         fig.savefig(output_path + output_name + '_map.png')
+        GEM_aggregate.record(figures[1], inputs)
 
 def plot_performance(sim_path, obs_path, output_path, catchment_ID, chainID):
 
@@ -351,6 +432,15 @@ def plot_performance(sim_path, obs_path, output_path, catchment_ID, chainID):
     nrow = 10
     ncol = 4
 
+    # The figure is only regenerated when the outputs have changed
+    figure = output_path+'performance_'+catchment_ID+'_'+str(chainID)+'.png'
+    inputs = []
+    for key, value in Output.sim.items():
+        if len(value['sim_idx'][catchment_idx]) > 0:
+            inputs.extend([sim_path+value['sim_file'], obs_path+value['obs_file']])
+    if GEM_aggregate.up_to_date(figure, inputs):
+        return
+
     fig, ax = plt.subplots(nrow, ncol, figsize=(12,8), dpi=300)
     tindex = pd.date_range('1980-1-1', '2024-12-31')[Info.spin_up:]
 
@@ -386,7 +476,8 @@ def plot_performance(sim_path, obs_path, output_path, catchment_ID, chainID):
 
                 counter += 1
 
-    fig.savefig(output_path+'performance_'+catchment_ID+'_'+str(chainID)+'.png', transparent=False)
+    fig.savefig(figure, transparent=False)
+    GEM_aggregate.record(figure, inputs)
 
 def plot_performance_all(sim_path, obs_path, output_path, catchment_ID, nchains, plot_each_chain=False):
 
@@ -615,30 +706,59 @@ def plot_param_valid():
     fig.savefig('999_param_valid_sorted.png')
 
 
-def merge_spatial_results_EU(mode, catchment_list, vars, replace=False):
+def _mean_map_chain(args):
+    # Time mean of a *_map report of one chain, from a GEM_store (chunk by chunk) or from the raw report
+    catchment_ID, sim_path, var, shape = args
+    if os.path.exists(sim_path+'store.json'):
+        data = GEM_store.open_store(sim_path)[var+'_map']
+        total = np.zeros(data.shape[1:])
+        for t in range(0, len(data), data.item['chunk']):
+            total += np.sum(data.read(t, t + data.item['chunk']), axis=0, dtype=np.float64)
+        return catchment_ID, var, total / max(len(data), 1)
+    return catchment_ID, var, np.asarray(GEM_aggregate.mean(sim_path+var+'_map.bin', shape, nodata=None), dtype=np.float64)
+
+
+def merge_spatial_results_EU(mode, catchment_list, vars, replace=False, processes=None):
+    from multiprocessing import Pool, cpu_count
 
     mask_large = np.loadtxt(Path.data_path+'catchment_info/land_mask_3035.asc', skiprows=6)
     mask_large = mask_large>0
 
-    os.makedirs(Path.work_path + mode +'/outputs/cali_merged/', exist_ok=True)
-    
+    merged_path = Path.work_path + mode +'/outputs/cali_merged/'
+    os.makedirs(merged_path, exist_ok=True)
+
+    vars = [var for var in vars if replace or not os.path.exists(merged_path+var+'.asc')]
+    if len(vars) == 0:
+        return
+    data_large = {var:np.full(mask_large.shape, np.nan) for var in vars}
+    mosaic = GIS_tools.Mosaic(Path.data_path+'catchment_info/forward/')
+
+    # Time mean of each chain (<catchment>/<chainID>/, see _chain_paths), then mean over the chains
+    tasks = []
+    n_chain = {}
+    for catchment_ID in catchment_list:
+        save_path = Path.work_path + mode +'/outputs/cali/' + str(catchment_ID) + '/'
+        for chainID, sim_path in _chain_paths(save_path):
+            if os.path.exists(sim_path+'store.json') or os.path.exists(sim_path+vars[0]+'_map.bin'):
+                tasks += [(catchment_ID, sim_path, var, mosaic.shape(catchment_ID)) for var in vars]
+                n_chain[catchment_ID] = n_chain.get(catchment_ID, 0) + 1
+
+    # The chain means are summed as they arrive; a catchment is pasted (and its sum dropped) once all of its chains are in
+    total = {}
+    with Pool(processes=max(1, min(cpu_count() if processes is None else processes, len(tasks)))) as pool:
+        for catchment_ID, var, result in pool.imap_unordered(_mean_map_chain, tasks):
+            if (catchment_ID, var) in total:
+                total[(catchment_ID, var)][0] += result
+                total[(catchment_ID, var)][1] += 1
+            else:
+                total[(catchment_ID, var)] = [result, 1]
+            if total[(catchment_ID, var)][1] == n_chain[catchment_ID]:
+                data_sum, count = total.pop((catchment_ID, var))
+                mosaic.paste(data_large[var], catchment_ID, data_sum / count)
+
     for var in vars:
-        if os.path.exists(Path.work_path + mode +'/outputs/cali_merged/'+var+'.asc') and not replace:
-            continue
-        data_large = np.full(mask_large.shape, np.nan)
-        #counter = 0
-        for catchment_ID in catchment_list:
-            save_path = Path.work_path + mode +'/outputs/cali/' + str(catchment_ID) + '/'
-            upper_left_coord = (np.loadtxt(Path.data_path+'catchment_info/forward/'+str(catchment_ID)+'/spatial/upper_left_coord.txt')).astype(np.int64)
-            mask_small = np.loadtxt(Path.data_path+'catchment_info/forward/'+str(catchment_ID)+'/spatial/dem.asc', skiprows=6)
-            mask_small = mask_small!=-9999
-            data_small = np.fromfile(save_path+'/'+var+'_map.bin').reshape(-1, mask_small.shape[0], mask_small.shape[1])
-            data_small = np.mean(data_small, axis=0)
-            data_large = GIS_tools.from_catchment_to_EU(upper_left_coord, mask_small, data_large, data_small)
-            #print(var, counter, len(catchment_list))
-            #counter += 1
-        GEM_tools.create_asc(data_large, Path.work_path + mode +'/outputs/cali_merged/'+var+'.asc', Path.data_path+'catchment_info/land_mask_3035.asc')
-        print(var + '  merged and saved at : ' + Path.work_path + mode +'/outputs/cali_merged/'+var+'.asc')
+        GEM_tools.create_asc(data_large[var], merged_path+var+'.asc', Path.data_path+'catchment_info/land_mask_3035.asc')
+        print(var + '  merged and saved at : ' + merged_path+var+'.asc')
         
 
 
@@ -755,64 +875,98 @@ def plot_spatial_results_EU(mode, vars, replace=False):
     
 
 
-def merge_performance(mode, catchment_list):
-    import pickle
+# [name, simulated report, observation file]
+performance_vars = [['discharge', 'discharge_TS', 'discharge'],
+                    ['isotope', 'd18o_chanS_TS', 'd18o_stream'],
+                    ['nitrate', 'no3_chanS_TS', 'no3_stream']]
 
-    vars = ['discharge', 'isotope', 'nitrate']
-    sim_vars = ['discharge_TS', 'd18o_chanS_TS', 'no3_chanS_TS']
-    obs_vars = ['discharge', 'd18o_stream', 'no3_stream']
 
-    os.makedirs(Path.work_path + mode +'/outputs/cali/performance/', exist_ok=True)
+def _chain_paths(save_path):
+    # forward_all saves each chain in <catchment>/<chainID>/; older runs are saved in <catchment>/ directly (chain -1)
+    chains = sorted([int(f) for f in os.listdir(save_path) if f.isdigit() and os.path.isdir(save_path+f)]) if os.path.exists(save_path) else []
+    if len(chains) > 0:
+        return [(chainID, save_path+str(chainID)+'/') for chainID in chains]
+    return [(-1, save_path)]
 
-    for kk in range(len(vars)):
-        site_info = pd.read_csv(Path.data_path+'catchment_info/site_info_'+vars[kk]+'.csv', index_col='site')
-        KGEs = []
-        pbias = []
-        site_ids = []
-        site_r = []
-        site_c = []
-        lats = []
-        lons = []
-        df = pd.DataFrame([])
-        for catchment_ID in catchment_list:
-            
-            save_path = Path.work_path + mode +'/outputs/cali/' + str(catchment_ID) + '/'
-            obs_path = Path.data_path+'catchment_info/forward/'+str(catchment_ID)+'/obs/'
 
-            if not os.path.exists(save_path+'age_canopy_storage_map.bin'):
-                continue
+def _read_sim_TS(sim_path, sim_var, nstep_obs):
+    # (site, time) array of a *_TS report, from a GEM_store or from the raw report
+    if os.path.exists(sim_path+'store.json'):
+        return np.asarray(GEM_store.open_store(sim_path)[sim_var][:], dtype=np.float64).T
+    data = np.fromfile(sim_path+sim_var+'.bin')
+    if os.path.exists(sim_path+'report_info.txt'):
+        n_sites = GEM_store.read_report_info(sim_path)['n_sites']
+    else:
+        # The simulation covers the spin-up and the observed period
+        n_sites = data.size // (Info.spin_up + nstep_obs)
+    if n_sites == 0 or data.size % n_sites != 0:
+        raise ValueError('Cannot derive the number of sites of ' + sim_path+sim_var+'.bin')
+    return data.reshape(-1, n_sites).T
 
-            keys = pickle.load(open(obs_path+vars[kk]+'_gauge_list', 'rb'))
-            sites = pickle.load(open(obs_path+vars[kk]+'_site_list', 'rb'))
-            
-            if len(keys) > 0:
-                _sim = (np.fromfile(save_path+sim_vars[kk]+'.bin').reshape(16437, -1).T)[:, Info.spin_up:]
-                _obs = np.fromfile(obs_path+obs_vars[kk]+'_obs.bin').reshape(len(keys), -1)
+
+def _merge_performance_catchment(mode, catchment_ID):
+    # KGE and PBIAS of all sites and chains of one catchment, as a long table
+    import pickle
+
+    save_path = Path.work_path + mode +'/outputs/cali/' + str(catchment_ID) + '/'
+    obs_path = Path.data_path+'catchment_info/forward/'+str(catchment_ID)+'/obs/'
+    dfs = []
+
+    for chainID, sim_path in _chain_paths(save_path):
+        if not (os.path.exists(sim_path+'store.json') or os.path.exists(sim_path+'age_canopy_storage_map.bin')):
+            continue
+        for var, sim_var, obs_var in performance_vars:
+            keys = pickle.load(open(obs_path+var+'_gauge_list', 'rb'))
+            sites = pickle.load(open(obs_path+var+'_site_list', 'rb'))
+            if len(keys) == 0:
+                continue
+            try:
+                _obs = np.fromfile(obs_path+obs_var+'_obs.bin').reshape(len(keys), -1)
+                _sim = _read_sim_TS(sim_path, sim_var, _obs.shape[1])[np.asarray(keys), Info.spin_up:]
+                valid = np.logical_not(np.logical_or(np.isnan(_sim), np.isnan(_obs))) & (_obs!=-9999)
                 _sim += 0.1
                 _obs += 0.1
-                for i in range(len(keys)):
-                    try:
-                        site_r.append(site_info.loc[sites[i],:]['idx_row'])
-                        site_c.append(site_info.loc[sites[i],:]['idx_col'])
-                        lats.append(site_info.loc[sites[i],:]['latitude'])
-                        lons.append(site_info.loc[sites[i],:]['longitude'])
-                        KGEs.append(GEM_tools.kge(_sim[keys[i],:], _obs[i,:]))
-                        pbias.append(GEM_tools.pbias(_sim[keys[i],:], _obs[i,:]))
-                        site_ids.append(sites[i])
-                        #print(keys, i, _sim.shape, _obs.shape)
-                    except:
-                        print(sites[i], '  went wrong!')
-
-        
-        df['site'] = site_ids
-        df['site_r'] = site_r
-        df['site_c'] = site_c
-        df['latitude'] = lats
-        df['longitude'] = lons
-        df['kge'] = KGEs
-        df['pbias'] = pbias
-        df.set_index(df['site'], drop=True)
-        df.to_csv(Path.work_path + mode +'/outputs/cali/performance/performance_'+vars[kk]+'.csv')
+                dfs.append(pd.DataFrame({'var':var, 'catchment':str(catchment_ID), 'chain':chainID, 'site':list(sites[:len(keys)]),
+                                         'kge':GEM_tools.kge_sites(_sim, _obs, valid), 'pbias':GEM_tools.pbias_sites(_sim, _obs, valid)}))
+            except Exception as e:
+                print(catchment_ID, chainID, var, '  went wrong!', e)
+
+    return pd.concat(dfs, ignore_index=True) if len(dfs) > 0 else None
+
+
+def merge_performance(mode, catchment_list, processes=None):
+    from multiprocessing import Pool, cpu_count
+
+    performance_path = Path.work_path + mode +'/outputs/cali/performance/'
+    os.makedirs(performance_path, exist_ok=True)
+
+    # Map over catchments
+    tasks = [(mode, catchment_ID) for catchment_ID in catchment_list]
+    with Pool(processes=max(1, min(cpu_count() if processes is None else processes, len(tasks)))) as pool:
+        dfs = [df for df in pool.starmap(_merge_performance_catchment, tasks) if df is not None]
+    columns = ['var', 'catchment', 'chain', 'site', 'kge', 'pbias']
+    df = pd.concat(dfs, ignore_index=True) if len(dfs) > 0 else pd.DataFrame(columns=columns)
+
+    # Site information
+    df_all = []
+    for var, _, _ in performance_vars:
+        site_info = pd.read_csv(Path.data_path+'catchment_info/site_info_'+var+'.csv', index_col='site')
+        _df = df[df['var']==var]
+        known = _df['site'].isin(site_info.index)
+        for site in _df['site'][~known].unique():
+            print(site, '  went wrong!')
+        _df = _df[known].copy()
+        info = site_info.loc[_df['site']]
+        for column, info_column in [['site_r', 'idx_row'], ['site_c', 'idx_col'], ['latitude', 'latitude'], ['longitude', 'longitude']]:
+            _df[column] = info[info_column].values
+        df_all.append(_df)
+
+        # One row per site (median over chains)
+        _df = _df.groupby('site', sort=False).agg({'site_r':'first', 'site_c':'first', 'latitude':'first', 'longitude':'first', 'kge':'median', 'pbias':'median'}).reset_index()
+        _df.to_csv(performance_path+'performance_'+var+'.csv')
+
+    df_all = pd.concat(df_all, ignore_index=True)[['var', 'catchment', 'chain', 'site', 'site_r', 'site_c', 'latitude', 'longitude', 'kge', 'pbias']]
+    df_all.to_csv(performance_path+'performance_all.csv', index=False)
 
 
 def plot_performance_EU(mode):
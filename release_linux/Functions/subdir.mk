@@ -7,18 +7,21 @@ CPP_SRCS += \
 ../codes/Functions/Sort_datetime.cpp \
 ../codes/Functions/Sort_percolation_travel_time.cpp \
 ../codes/Functions/Sort_root_fraction.cpp \
+../codes/Functions/Sort_routing_coefficient.cpp \
 
 
 OBJS += \
 ./Functions/Sort_datetime.o \
 ./Functions/Sort_percolation_travel_time.o \
 ./Functions/Sort_root_fraction.o \
+./Functions/Sort_routing_coefficient.o \
 
 
 CPP_DEPS += \
 ./Functions/Sort_datetime.d \
 ./Functions/Sort_percolation_travel_time.d \
 ./Functions/Sort_root_fraction.d \
+./Functions/Sort_routing_coefficient.d \
 
 
 # Each subdirectory must supply rules for building sources it contributes
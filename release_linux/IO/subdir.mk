@@ -10,6 +10,7 @@ CPP_SRCS += \
 ../codes/IO/readConfigFile.cpp \
 ../codes/IO/readParamFile.cpp \
 ../codes/IO/report.cpp \
+../codes/IO/checkpoint.cpp \
 
 
 OBJS += \
@@ -19,6 +20,7 @@ OBJS += \
 ./IO/readConfigFile.o \
 ./IO/readParamFile.o \
 ./IO/report.o \
+./IO/checkpoint.o \
 
 
 CPP_DEPS += \
@@ -28,6 +30,7 @@ CPP_DEPS += \
 ./IO/readConfigFile.d \
 ./IO/readParamFile.d \
 ./IO/report.d \
+./IO/checkpoint.d \
 
 
 # Each subdirectory must supply rules for building sources it contributes
@@ -6,6 +6,8 @@
 CPP_SRCS += \
 ../codes/Spatial/grid.cpp \
 ../codes/Spatial/sortGridLDD.cpp \
+../codes/Spatial/sortGridLevel.cpp \
+../codes/Spatial/pruneGridGauge.cpp \
 ../codes/Spatial/sortTSmask.cpp \
 ../codes/Spatial/parameterisation.cpp \
 
@@ -13,6 +15,8 @@ CPP_SRCS += \
 OBJS += \
 ./Spatial/grid.o \
 ./Spatial/sortGridLDD.o \
+./Spatial/sortGridLevel.o \
+./Spatial/pruneGridGauge.o \
 ./Spatial/sortTSmask.o \
 ./Spatial/parameterisation.o \
 
@@ -20,6 +24,8 @@ OBJS += \
 CPP_DEPS += \
 ./Spatial/grid.d \
 ./Spatial/sortGridLDD.d \
+./Spatial/sortGridLevel.d \
+./Spatial/pruneGridGauge.d \
 ./Spatial/sortTSmask.d \
 ./Spatial/parameterisation.d \
 
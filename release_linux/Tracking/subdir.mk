@@ -10,6 +10,7 @@ CPP_SRCS += \
 ../codes/Tracking/Fractionation.cpp \
 ../codes/Tracking/Mixing_canopy_tracking.cpp \
 ../codes/Tracking/Mixing.cpp \
+../codes/Tracking/Mixing_fused.cpp \
 ../codes/Tracking/Mixing_GW_tracking.cpp \
 ../codes/Tracking/Mixing_routing_tracking.cpp \
 ../codes/Tracking/Mixing_soil_profile_tracking.cpp \
@@ -23,6 +24,7 @@ OBJS += \
 ./Tracking/Fractionation.o \
 ./Tracking/Mixing_canopy_tracking.o \
 ./Tracking/Mixing.o \
+./Tracking/Mixing_fused.o \
 ./Tracking/Mixing_GW_tracking.o \
 ./Tracking/Mixing_routing_tracking.o \
 ./Tracking/Mixing_soil_profile_tracking.o \
@@ -36,6 +38,7 @@ CPP_DEPS += \
 ./Tracking/Fractionation.d \
 ./Tracking/Mixing_canopy_tracking.d \
 ./Tracking/Mixing.d \
+./Tracking/Mixing_fused.d \
 ./Tracking/Mixing_GW_tracking.d \
 ./Tracking/Mixing_routing_tracking.d \
 ./Tracking/Mixing_soil_profile_tracking.d \